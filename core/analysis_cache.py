@@ -0,0 +1,253 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: analysis_cache.py
+#
+# __brief__: Whole reports cached on disk, in SQLite. An entry is keyed by a hash of the file's path and
+#            content, the settings the detectors run with (the same dict they are handed), the registered
+#            detectors and ANALYZER_VERSION, so a file that didn't change is answered from the cache and anything
+#            that could change the report is a different key. The cache is bounded in bytes (least
+#            recently used reports go first) and every operation is its own transaction on its own
+#            connection, so worker processes of a batch can share it.
+#
+# TO RUN: python core/analysis_cache.py stats | clear
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from typing import Optional
+
+from core.constants import ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_MAX_BYTES
+from core.detectors import DETECTORS, _report_settings
+from utils.logger import setup_logger
+
+# ==========
+analysis_cache_logger = setup_logger(name="analysis_cache.py_logger", log_file="analysis_cache.log")
+# ==========
+
+analysis_cache_logger.info("analysis_cache_logger")
+
+# bump when a detector changes what it reports, every cached report becomes a miss
+ANALYZER_VERSION = 1
+
+# seconds a connection waits for another process's write before giving up
+_BUSY_TIMEOUT = 30.0
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS reports (
+        key TEXT PRIMARY KEY,
+        file TEXT,
+        code_smells TEXT NOT NULL,
+        report TEXT,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        accessed REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS reports_accessed ON reports (accessed)",
+    "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+)
+
+
+class AnalysisCache:
+    """_summary_
+
+    Note:
+        Nothing touches the disk until the first lookup. Reports are stored as the JSON written
+        to data/report/, so a cached report is the dict a fresh run would have saved.
+    """
+
+    def __init__(self, path: str = ANALYSIS_CACHE_PATH, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES):
+        """_summary_
+
+        Args:
+            path (str, optional): SQLite file. Defaults to ANALYSIS_CACHE_PATH.
+            max_bytes (int, optional): most bytes of reports kept. Defaults to ANALYSIS_CACHE_MAX_BYTES.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """_summary_
+
+        Note:
+            WAL lets readers go on while another process writes, writers queue on the busy timeout.
+            Connections are never shared, so a forked worker doesn't inherit an open one.
+
+        Returns:
+            sqlite3.Connection: connection in autocommit mode, transactions are explicit
+        """
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+        # a report lost to a power cut is only a miss, no fsync on every commit
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if not self._ready:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._ready = True
+        return connection
+
+    @staticmethod
+    def key(source_code: str, file_name: str = None, settings: dict = None) -> str:
+        """_summary_
+
+        Note:
+            The readable report stored with an entry is written for one file, so the path is part
+            of the key too. Two files with the same content are two entries.
+
+        Args:
+            source_code (str): contents of the file
+            file_name (str, optional): file the report is for. Defaults to None.
+            settings (dict, optional): what the detectors run with, @see _report_settings().
+                                       Defaults to None (read now).
+
+        Returns:
+            str: hash of the content and of everything else the report depends on
+        """
+        settings = {
+            "file": os.path.abspath(file_name) if file_name else None,
+            "version": ANALYZER_VERSION,
+            "settings": _report_settings() if settings is None else settings,
+            "detectors": list(DETECTORS),
+        }
+        digest = hashlib.blake2b(source_code.encode("utf-8"), digest_size=20)
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _count(self, connection: sqlite3.Connection, name: str) -> None:
+        connection.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str) -> Optional[tuple]:
+        """_summary_
+
+        Args:
+            key (str): @see key()
+
+        Returns:
+            Optional[tuple]: (code_smells, readable report path or None), None on a miss
+        """
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT code_smells, report FROM reports WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE reports SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._count(connection, "hits" if row is not None else "misses")
+            connection.execute("COMMIT")
+
+        if row is None:
+            return None
+        analysis_cache_logger.info(f"[hit] {key[:12]}")
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, code_smells: dict, file_name: str = None, report: str = None) -> None:
+        """_summary_
+
+        Note:
+            Least recently used reports are dropped in the same transaction until the cache fits
+            max_bytes again, a report bigger than that on its own is not stored.
+
+        Args:
+            key (str): @see key()
+            code_smells (dict): the report, @see find_code_smells()
+            file_name (str, optional): file the report is for, for stats. Defaults to None.
+            report (str, optional): readable report written for it. Defaults to None.
+        """
+        value = json.dumps(code_smells, default=str)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            analysis_cache_logger.warning(f"[put] {file_name}: {size} byte report is over the cache size, not cached")
+            return
+
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO reports (key, file, code_smells, report, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, file_name, value, report, size, now, now),
+            )
+            evicted = connection.execute(
+                "DELETE FROM reports WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER "
+                "(ORDER BY accessed DESC, key) AS running FROM reports) WHERE running > ?)",
+                (self.max_bytes,),
+            ).rowcount
+            if evicted:
+                connection.execute(
+                    "INSERT INTO counters (name, value) VALUES ('evictions', ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (evicted,),
+                )
+            connection.execute("COMMIT")
+
+        analysis_cache_logger.info(f"[put] {file_name}, {size} byte/s, {evicted} evicted")
+
+    def stats(self) -> dict:
+        """_summary_
+
+        Returns:
+            dict: {"path", "entries", "bytes", "max_bytes", "hits", "misses", "evictions", "hit_rate"}
+        """
+        with closing(self._connect()) as connection:
+            entries, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM reports").fetchone()
+            counters = dict(connection.execute("SELECT name, value FROM counters").fetchall())
+
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def clear(self) -> None:
+        """_summary_
+
+        Drops every report and resets the counters.
+        """
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM reports")
+            connection.execute("DELETE FROM counters")
+            connection.execute("COMMIT")
+        analysis_cache_logger.info(f"[clear] {self.path}")
+
+    def __len__(self) -> int:
+        return self.stats()["entries"]
+
+
+# shared by find_code_smells() and the batch workers
+ANALYSIS_CACHE = AnalysisCache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analysis cache")
+    parser.add_argument("command", choices=["stats", "clear"], help="show the cache stats or empty the cache")
+    parser.add_argument("--path", default=ANALYSIS_CACHE_PATH, help="cache file")
+
+    args = parser.parse_args()
+    cache = AnalysisCache(args.path)
+
+    if args.command == "clear":
+        cache.clear()
+    for name, value in cache.stats().items():
+        print(f"{name:<10} {value}")
@@ -0,0 +1,340 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: ast_hash.py
+#
+# __brief__: Structural (Merkle) hashing of AST subtrees. Every node gets an id built bottom-up from
+#            its type, its abstracted fields (identifiers -> VAR, literals -> STR/NUM/...) and the ids
+#            of its children, so equal ids mean equal subtrees up to renaming. One traversal groups
+#            every statement into Type 1 / Type 2 clone classes.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import ast
+
+from core.constants import AST_CLONE_MIN_NODES
+from core.token_stream import _ast_tokens
+from utils.logger import setup_logger
+
+# ==========
+ast_hash_logger = setup_logger(name="ast_hash.py_logger", log_file="ast_hash.log")
+# ==========
+
+ast_hash_logger.info("ast_hash_logger")
+
+# fields that don't change what the code does
+_IGNORED_FIELDS = {"type_comment", "kind"}
+
+
+def _abstract_constant(value) -> str:
+    """_summary_
+
+    Note:
+        Same buckets as the AST tokens, @see token_stream._ast_tokens()
+
+    Args:
+        value (Any): value of an ast.Constant
+
+    Returns:
+        str: STR, NUM, None, or the type name for anything else (bytes, Ellipsis, ...)
+    """
+    if isinstance(value, str):
+        return "STR"
+    if isinstance(value, (int, float)):
+        return "NUM"
+    if value is None:
+        return "None"
+    return type(value).__name__
+
+
+def _subtree_ids(tree: ast.AST) -> tuple:
+    """_summary_
+
+    Note:
+        Hash consing instead of a real hash function: every distinct (type, fields, child ids)
+        key gets the next small int, so two subtrees share an id if and only if they are equal.
+        Iterative post-order, deep trees don't hit the recursion limit.
+
+    Args:
+        tree (ast.AST): root node
+
+    Returns:
+        tuple: (node -> abstract id (Type 2), node -> concrete id (Type 1),
+                node -> subtree size in nodes, node -> parent node)
+    """
+    abstract_ids, concrete_ids, sizes, parents = {}, {}, {}, {}
+    abstract_table, concrete_table = {}, {}
+
+    stack = [(tree, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if not children_done:
+            stack.append((node, True))
+            for child in ast.iter_child_nodes(node):
+                parents[child] = node
+                stack.append((child, False))
+            continue
+
+        abstract_key = [type(node).__name__]
+        concrete_key = [type(node).__name__]
+        size = 1
+        for name in node._fields:
+            if name in _IGNORED_FIELDS:
+                continue
+            value = getattr(node, name, None)
+            if isinstance(value, ast.AST):
+                abstract_key.append(abstract_ids[value])
+                concrete_key.append(concrete_ids[value])
+                size += sizes[value]
+            elif isinstance(value, list):
+                abstract_items, concrete_items = [], []
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        abstract_items.append(abstract_ids[item])
+                        concrete_items.append(concrete_ids[item])
+                        size += sizes[item]
+                    else:
+                        abstract_items.append("VAR" if isinstance(item, str) else item)
+                        concrete_items.append(item)
+                abstract_key.append(tuple(abstract_items))
+                concrete_key.append(tuple(concrete_items))
+            elif isinstance(node, ast.Constant) and name == "value":
+                abstract_key.append(_abstract_constant(value))
+                concrete_key.append((type(value).__name__, value))
+            else:
+                abstract_key.append("VAR" if isinstance(value, str) else value)
+                concrete_key.append(value)
+
+        abstract_ids[node] = abstract_table.setdefault(tuple(abstract_key), len(abstract_table))
+        concrete_ids[node] = concrete_table.setdefault(tuple(concrete_key), len(concrete_table))
+        sizes[node] = size
+
+    return abstract_ids, concrete_ids, sizes, parents
+
+
+def _enclosing_statement(node: ast.AST, parents: dict):
+    """_summary_
+
+    Args:
+        node (ast.AST): any node
+        parents (dict): @see _subtree_ids()
+
+    Returns:
+        ast.stmt | None: nearest statement strictly above the node
+    """
+    node = parents.get(node)
+    while node is not None and not isinstance(node, ast.stmt):
+        node = parents.get(node)
+    return node
+
+
+def _ast_clone_classes(tree: ast.AST, min_nodes: int = AST_CLONE_MIN_NODES) -> list:
+    """_summary_
+
+    Note:
+        Only maximal classes are kept, a class is dropped when every one of its members sits
+        directly inside a statement that is itself a clone (it's implied by the bigger one).
+
+    Args:
+        tree (ast.AST): parsed file
+        min_nodes (int, optional): smallest statement subtree worth reporting. Defaults to AST_CLONE_MIN_NODES.
+
+    Returns:
+        list: list of {"members", "size", "clone_type"} dicts, members sorted by line,
+              classes sorted by their first member
+    """
+    abstract_ids, concrete_ids, sizes, parents = _subtree_ids(tree)
+
+    groups = {}
+    for node, node_id in abstract_ids.items():
+        if isinstance(node, ast.stmt) and sizes[node] >= min_nodes:
+            groups.setdefault(node_id, []).append(node)
+
+    cloned = {node for members in groups.values() if len(members) > 1 for node in members}
+
+    classes = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        if all(_enclosing_statement(node, parents) in cloned for node in members):
+            continue
+        members.sort(key=lambda n: (n.lineno, n.col_offset))
+        classes.append(
+            {
+                "members": members,
+                "size": sizes[members[0]],
+                "clone_type": 1 if len({concrete_ids[n] for n in members}) == 1 else 2,
+            }
+        )
+
+    classes.sort(key=lambda c: (c["members"][0].lineno, c["members"][0].col_offset))
+    return classes
+
+
+def _find_ast_clones(source_code: str, min_nodes: int = AST_CLONE_MIN_NODES) -> list:
+    """_summary_
+
+    Args:
+        source_code (str): source code to analyze
+        min_nodes (int, optional): smallest statement subtree reported. Defaults to AST_CLONE_MIN_NODES.
+
+    Returns:
+        list: duplicate pairs in the same shape as the Jaccard engine, plus "clone_class",
+              "clone_type" (1 = identical, 2 = identical up to renaming / literals) and "end_line"
+    """
+    ast_hash_logger.info("[starting] _find_ast_clones()")
+
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError as e:
+        ast_hash_logger.warning(f"could not parse source, no AST clones reported: {e}")
+        return []
+
+    lines = source_code.splitlines()
+    classes = _ast_clone_classes(tree, min_nodes)
+
+    order = sorted(
+        (node for clone_class in classes for node in clone_class["members"]),
+        key=lambda n: (n.lineno, n.col_offset),
+    )
+    index = {node: i for i, node in enumerate(order)}
+
+    def describe(node: ast.stmt) -> dict:
+        return {
+            "index": index[node],
+            "text": "\n".join(lines[node.lineno - 1 : node.end_lineno]),
+            "type": "code",
+            "tokens": _ast_tokens(node),
+            "line_number": node.lineno,
+            "end_line": node.end_lineno,
+        }
+
+    duplicates = []
+    for class_id, clone_class in enumerate(classes):
+        members = clone_class["members"]
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                duplicates.append(
+                    {
+                        "block1": describe(members[x]),
+                        "block2": describe(members[y]),
+                        "similarity": 1.0,
+                        "threshold": 1.0,
+                        "clone_class": class_id,
+                        "clone_type": clone_class["clone_type"],
+                    }
+                )
+
+    ast_hash_logger.info(
+        f"[done], found {len(classes)} clone class/es, {len(duplicates)} pair/s."
+    )
+    return duplicates
+
+
+def _local_names(func: ast.FunctionDef) -> set:
+    """_summary_
+
+    Args:
+        func (ast.FunctionDef): function
+
+    Returns:
+        set: names bound inside the function (parameters and assignment targets)
+    """
+    names = {arg.arg for arg in ast.walk(func.args) if isinstance(arg, ast.arg)}
+    for node in ast.walk(func):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+    return names
+
+
+def _consistent_renaming(func1: ast.FunctionDef, func2: ast.FunctionDef) -> bool:
+    """_summary_
+
+    Note:
+        Structurally equal isn't enough to merge two functions: "a - b" and "b - a" hash the
+        same. Here local names must map one to one, and everything else (globals, attributes,
+        literals other than the docstring) must match exactly.
+
+    Args:
+        func1 (ast.FunctionDef): function
+        func2 (ast.FunctionDef): function with the same abstract id
+
+    Returns:
+        bool: True if func2 is func1 with its locals renamed
+    """
+    locals1, locals2 = _local_names(func1), _local_names(func2)
+    forward, backward = {}, {}
+    docstrings = {
+        func.body[0].value
+        for func in (func1, func2)
+        if ast.get_docstring(func, clean=False) is not None
+    }
+
+    nodes1 = [n for n in ast.walk(func1) if n is not func1]
+    nodes2 = [n for n in ast.walk(func2) if n is not func2]
+    for node1, node2 in zip(nodes1, nodes2):
+        if isinstance(node1, ast.Constant):
+            if node1 in docstrings and node2 in docstrings:
+                continue
+            if type(node1.value) is not type(node2.value) or node1.value != node2.value:
+                return False
+            continue
+
+        for name in node1._fields:
+            value1, value2 = getattr(node1, name, None), getattr(node2, name, None)
+            if not isinstance(value1, str):
+                continue
+            is_local = isinstance(node1, (ast.Name, ast.arg)) and value1 in locals1
+            if is_local != (isinstance(node2, (ast.Name, ast.arg)) and value2 in locals2):
+                return False
+            if not is_local:
+                if value1 != value2:
+                    return False
+            elif forward.setdefault(value1, value2) != value2 or backward.setdefault(value2, value1) != value1:
+                return False
+    return True
+
+
+def _function_clone_groups(source_code: str) -> list:
+    """_summary_
+
+    Note:
+        Only top-level functions, the same ones DuplicateRefactorer can rewrite.
+
+    Args:
+        source_code (str): source code to analyze
+
+    Returns:
+        list: list of function name groups, every function in a group is the first one with
+              its locals renamed, @see _consistent_renaming()
+    """
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError as e:
+        ast_hash_logger.warning(f"could not parse source, no function clones reported: {e}")
+        return []
+
+    abstract_ids, _, _, _ = _subtree_ids(tree)
+
+    by_id = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            by_id.setdefault(abstract_ids[node], []).append(node)
+
+    groups = []
+    for funcs in by_id.values():
+        while len(funcs) > 1:
+            first, rest = funcs[0], funcs[1:]
+            group = [first] + [f for f in rest if _consistent_renaming(first, f)]
+            if len(group) > 1:
+                groups.append([f.name for f in group])
+            funcs = [f for f in rest if f not in group]
+
+    ast_hash_logger.info(f"[functions] {len(groups)} function clone group/s: {groups}")
+    return groups
@@ -0,0 +1,191 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: ast_segmenter.py
+#
+# __brief__: Block boundaries from the syntax tree instead of from keywords at the start of a line.
+#            One walk over the parsed file collects where blocks start: every top level statement,
+#            every compound statement (with its decorators) and clause (elif / else / except /
+#            finally / case). Blocks are the line ranges between consecutive starts, the same cuts
+#            the line splitter aims for, but a string that happens to contain "if " or a closing
+#            bracket at column 0 no longer cuts a block in two.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import ast
+import re
+from typing import List, Optional, Tuple
+
+from utils.logger import setup_logger
+
+# ==========
+ast_segmenter_logger = setup_logger(name="ast_segmenter.py_logger", log_file="ast_segmenter.log")
+# ==========
+
+ast_segmenter_logger.info("ast_segmenter_logger")
+
+# try / except*, ast.TryStar only exists on 3.11+, on 3.10 this is ast.Try twice
+TRY = (ast.Try, getattr(ast, "TryStar", ast.Try))
+
+COMPOUND = (
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.If,
+    ast.With,
+    ast.AsyncWith,
+    *TRY,
+    ast.Match,
+)
+
+# line breaks str.splitlines() splits on besides "\n", the parser counts some of them differently
+FOREIGN_LINE_BREAK = re.compile(r"[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def _first_line(node: ast.stmt) -> int:
+    """_summary_
+
+    Args:
+        node (ast.stmt): statement
+
+    Returns:
+        int: first line of the statement, decorators included
+    """
+    decorators = getattr(node, "decorator_list", None)
+    return min([node.lineno] + [d.lineno for d in decorators]) if decorators else node.lineno
+
+
+def _clause_line(lines: List[str], after: int, before: int, keyword: str) -> Optional[int]:
+    """_summary_
+
+    Args:
+        lines (List[str]): lines of the source
+        after (int): last line of the previous clause
+        before (int): first line of the clause body
+        keyword (str): "else" or "finally"
+
+    Returns:
+        Optional[int]: line of the clause header, the tree has no node for it
+    """
+    for line_number in range(after + 1, before + 1):
+        if lines[line_number - 1].lstrip().startswith(keyword):
+            return line_number
+    return None
+
+
+def _block_starts(tree: ast.Module, lines: List[str]) -> List[int]:
+    """_summary_
+
+    Args:
+        tree (ast.Module): parsed source
+        lines (List[str]): lines of the source
+
+    Returns:
+        List[int]: sorted lines where a block starts
+    """
+    starts = set()
+
+    def visit(body: list, top_level: bool) -> None:
+        for node in body:
+            if top_level or isinstance(node, COMPOUND):
+                starts.add(_first_line(node))
+            if isinstance(node, COMPOUND):
+                visit_compound(node)
+
+    def clause(after: int, body: list, keyword: str) -> None:
+        if body:
+            line_number = _clause_line(lines, after, body[0].lineno, keyword)
+            if line_number is not None:
+                starts.add(line_number)
+
+    def visit_compound(node: ast.stmt) -> None:
+        if isinstance(node, ast.Match):
+            for case in node.cases:
+                starts.add(case.pattern.lineno)
+                visit(case.body, False)
+            return
+
+        visit(node.body, False)
+        if isinstance(node, TRY):
+            for handler in node.handlers:
+                starts.add(handler.lineno)
+                visit(handler.body, False)
+            last = (node.handlers[-1] if node.handlers else node.body[-1]).end_lineno
+            clause(last, node.orelse, "else")
+            visit(node.orelse, False)
+            clause((node.orelse or node.handlers or node.body)[-1].end_lineno, node.finalbody, "finally")
+            visit(node.finalbody, False)
+        elif getattr(node, "orelse", None):
+            # an "elif" is an If alone in orelse, its header is the If itself
+            first = node.orelse[0]
+            if not (isinstance(first, ast.If) and lines[first.lineno - 1].lstrip().startswith("elif")):
+                clause(node.body[-1].end_lineno, node.orelse, "else")
+            visit(node.orelse, False)
+
+    visit(tree.body, True)
+    return sorted(starts)
+
+
+def _parse_source(source_code: str) -> Optional[ast.Module]:
+    """_summary_
+
+    Args:
+        source_code (str): dedented source without comments
+
+    Returns:
+        Optional[ast.Module]: the tree, None if the source doesn't parse or has line breaks the
+                              parser counts differently than the line splitter
+    """
+    if FOREIGN_LINE_BREAK.search(source_code):
+        return None
+    try:
+        return ast.parse(source_code)
+    except (SyntaxError, ValueError):
+        return None
+
+
+def _ast_block_spans(source_code: str, tree: ast.Module = None) -> Optional[List[Tuple[int, int]]]:
+    """_summary_
+
+    Note:
+        One walk over the tree. Spans with fewer than two non-blank lines are dropped, like the
+        line splitter does.
+
+    Args:
+        source_code (str): dedented source without comments
+        tree (ast.Module, optional): the source already parsed, @see _parse_source(). Defaults
+                                     to None (parsed here).
+
+    Returns:
+        Optional[List[Tuple[int, int]]]: (first line, last line) of every block, None if the
+                                         source doesn't parse (the caller falls back to the lines)
+    """
+    if tree is None:
+        tree = _parse_source(source_code)
+        if tree is None:
+            return None
+
+    lines = source_code.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    starts = _block_starts(tree, lines)
+
+    spans = []
+    for start, next_start in zip(starts, starts[1:] + [len(lines) + 1]):
+        end = next_start - 1
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        if sum(1 for line in lines[start - 1 : end] if line.strip()) >= 2:
+            spans.append((start, end))
+
+    ast_segmenter_logger.debug(f"[spans] {len(spans)} block/s from {len(starts)} start/s")
+    return spans
@@ -0,0 +1,130 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: block_index.py
+#
+# __brief__: "Find clones of this selection". The blocks of a file are tokenized and fingerprinted
+#            once into an inverted n-gram index, a query only tokenizes the snippet and counts, per
+#            block, the n-grams it shares with it. Blocks sharing none are never touched, and the
+#            counts give the exact Jaccard similarity without comparing fingerprints.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import numpy as np
+
+from core.constants import BLOCK_QUERY_TOP_K
+from core.duplicated_finder import (
+    _split_into_blocks,
+    _tokenize_valid_blocks,
+    _tokenize_block,
+    _normalize_indentation,
+    _valid_tokens,
+)
+from core.fingerprint import _ngram_fingerprint
+from utils.logger import setup_logger
+
+# ==========
+block_index_logger = setup_logger(name="block_index.py_logger", log_file="block_index.log")
+# ==========
+
+block_index_logger.info("block_index_logger")
+
+
+class BlockIndex:
+    """_summary_
+
+    Note:
+        Built from the raw source (comments included, the tokenizer drops them), so line numbers
+        are the lines of the file and not of the comment-free copy the report uses.
+    """
+
+    def __init__(self, source_code: str):
+        """_summary_
+
+        Args:
+            source_code (str): file to index
+        """
+        blocks = _split_into_blocks(source_code) if source_code.strip() else []
+        self.blocks = []
+        fingerprints = []
+        for tokens, block, line_num in _tokenize_valid_blocks(blocks, source_code):
+            fingerprint = _ngram_fingerprint(tokens)
+            if fingerprint.size == 0:
+                continue
+            self.blocks.append({"text": block, "line_number": line_num, "end_line": line_num + block.count("\n")})
+            fingerprints.append(fingerprint)
+
+        self.sizes = np.fromiter((fp.size for fp in fingerprints), dtype=np.int64, count=len(fingerprints))
+        grams = np.concatenate(fingerprints) if fingerprints else np.empty(0, dtype=np.uint64)
+        owners = np.repeat(np.arange(len(fingerprints), dtype=np.int64), self.sizes)
+        order = np.argsort(grams, kind="stable")
+        self._grams, self._owners = grams[order], owners[order]
+
+        block_index_logger.info(f"[index] {len(self.blocks)} block/s, {len(self._grams)} posting/s")
+
+    def _overlaps(self, fingerprint: np.ndarray) -> np.ndarray:
+        """_summary_
+
+        Args:
+            fingerprint (np.ndarray): n-grams of the query, @see _ngram_fingerprint()
+
+        Returns:
+            np.ndarray: number of n-grams every block shares with the query
+        """
+        left = np.searchsorted(self._grams, fingerprint, side="left")
+        right = np.searchsorted(self._grams, fingerprint, side="right")
+        owners = [self._owners[lo:hi] for lo, hi in zip(left.tolist(), right.tolist()) if hi > lo]
+        if not owners:
+            return np.zeros(len(self.blocks), dtype=np.int64)
+        return np.bincount(np.concatenate(owners), minlength=len(self.blocks))
+
+    def query(self, text: str, k: int = BLOCK_QUERY_TOP_K, exclude: tuple = None) -> list:
+        """_summary_
+
+        Args:
+            text (str): snippet to look for, any indentation, tokenized like the indexed blocks
+                        (comments dropped, docstrings kept)
+            k (int, optional): most results. Defaults to BLOCK_QUERY_TOP_K.
+            exclude (tuple, optional): (first, last) line of the snippet in the indexed file, blocks
+                                       overlapping it aren't reported. Defaults to None.
+
+        Returns:
+            list: up to k {"index", "text", "line_number", "end_line", "similarity"} dicts, most
+                  similar first, only blocks that share at least one n-gram with the snippet
+        """
+        snippet = _normalize_indentation(text)
+        tokens = _tokenize_block(snippet) if snippet.strip() else []
+        if not _valid_tokens(tokens) or not self.blocks:
+            return []
+
+        fingerprint = _ngram_fingerprint(tokens)
+        overlaps = self._overlaps(fingerprint)
+        candidates = np.flatnonzero(overlaps)
+        if exclude is not None:
+            first, last = exclude
+            candidates = [
+                n for n in candidates.tolist()
+                if self.blocks[n]["end_line"] < first or self.blocks[n]["line_number"] > last
+            ]
+            candidates = np.asarray(candidates, dtype=np.int64)
+
+        shared = overlaps[candidates]
+        similarities = shared / (fingerprint.size + self.sizes[candidates] - shared)
+        best = np.lexsort((candidates, -similarities))[:k]
+
+        block_index_logger.info(
+            f"[query] {len(tokens)} token/s, {len(candidates)} of {len(self.blocks)} block/s share an n-gram"
+        )
+        return [
+            {"index": int(candidates[r]), **self.blocks[candidates[r]], "similarity": float(similarities[r])}
+            for r in best.tolist()
+        ]
+
+    def __len__(self) -> int:
+        return len(self.blocks)
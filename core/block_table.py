@@ -0,0 +1,140 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: block_table.py
+#
+# __brief__: One table of blocks per analysis. A block is a row of ints (offsets into the analyzed
+#            source, first / last line, token count), duplicate records point at rows by id, and the
+#            text of a block is only sliced out of the source when something asks for it.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import re
+from array import array
+
+from utils.logger import setup_logger
+
+# ==========
+block_table_logger = setup_logger(name="block_table.py_logger", log_file="block_table.log")
+# ==========
+
+block_table_logger.info("block_table_logger")
+
+NEWLINE = re.compile("\n")
+
+
+class BlockTable:
+    """_summary_
+
+    Note:
+        Columns are typed arrays (8 bytes per value), not a dict per block, and the source is
+        held once, however many duplicate records reference a block.
+    """
+
+    def __init__(self, source: str):
+        """_summary_
+
+        Args:
+            source (str): text the line numbers of the blocks refer to, lines split on "\\n"
+        """
+        self.source = source
+        self.starts = array("q")
+        self.ends = array("q")
+        self.lines = array("q")
+        self.end_lines = array("q")
+        self.token_counts = array("q")
+        self._line_starts = None
+
+    def _line_start(self, line_number: int) -> int:
+        """_summary_
+
+        Args:
+            line_number (int): 1-based line, one past the last line is the end of the source
+
+        Returns:
+            int: offset of the first character of the line
+        """
+        if self._line_starts is None:
+            self._line_starts = array("q", [0])
+            self._line_starts.extend(match.end() for match in NEWLINE.finditer(self.source))
+        if line_number - 1 < len(self._line_starts):
+            return self._line_starts[line_number - 1]
+        return len(self.source) + 1
+
+    def add(self, line_number: int, end_line: int, token_count: int) -> int:
+        """_summary_
+
+        Args:
+            line_number (int): first line of the block
+            end_line (int): last line of the block
+            token_count (int): number of tokens of the block
+
+        Returns:
+            int: id of the new block
+        """
+        self.starts.append(self._line_start(line_number))
+        self.ends.append(self._line_start(end_line + 1) - 1)
+        self.lines.append(line_number)
+        self.end_lines.append(end_line)
+        self.token_counts.append(token_count)
+        return len(self.lines) - 1
+
+    def text(self, block_id: int) -> str:
+        """_summary_
+
+        Args:
+            block_id (int): block
+
+        Returns:
+            str: text of the block, sliced out of the source now
+        """
+        return self.source[self.starts[block_id] : self.ends[block_id]].rstrip()
+
+    def span(self, block_id: int) -> dict:
+        """_summary_
+
+        Args:
+            block_id (int): block
+
+        Returns:
+            dict: first and last line of the block
+        """
+        return {"line_number": self.lines[block_id], "end_line": self.end_lines[block_id]}
+
+    def record(self, block_id: int) -> dict:
+        """_summary_
+
+        Args:
+            block_id (int): block
+
+        Returns:
+            dict: the row of the block, json ready
+        """
+        return {
+            "id": block_id,
+            "start": self.starts[block_id],
+            "end": self.ends[block_id],
+            **self.span(block_id),
+            "token_count": self.token_counts[block_id],
+        }
+
+    def to_json(self, block_ids=None) -> list:
+        """_summary_
+
+        Args:
+            block_ids (iterable, optional): rows to export. Defaults to None (every row).
+
+        Returns:
+            list: one record per block, @see record()
+        """
+        block_ids = range(len(self)) if block_ids is None else sorted(set(block_ids))
+        return [self.record(block_id) for block_id in block_ids]
+
+    def __len__(self) -> int:
+        return len(self.lines)
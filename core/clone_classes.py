@@ -0,0 +1,178 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: clone_classes.py
+#
+# __brief__: Groups duplicate pairs into clone classes. Ten copies of a block are 45 pairs, each one
+#            carrying the text and tokens of both blocks, a union-find over the pairs turns them into
+#            one class with one representative and ten member spans, so reports grow with the number
+#            of clones instead of its square.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+from typing import List
+
+from core.block_table import BlockTable
+from utils.logger import setup_logger
+
+# ==========
+clone_classes_logger = setup_logger(
+    name="clone_classes.py_logger", log_file="clone_classes.log"
+)
+# ==========
+
+clone_classes_logger.info("clone_classes_logger")
+
+
+def _find_root(parent: list, x: int) -> int:
+    """_summary_
+
+    Note:
+        Path halving, every lookup also shortens the path for the next one.
+
+    Args:
+        parent (list): union-find parent of every block
+        x (int): block
+
+    Returns:
+        int: representative of the set x belongs to
+    """
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def _block_key(block: dict) -> tuple:
+    """_summary_
+
+    Args:
+        block (dict): one side of a duplicate pair, @see _find_duplicated_code()
+
+    Returns:
+        tuple: identity of the block, the same block in two pairs gets the same key
+    """
+    return (block.get("file"), block["index"], block["line_number"], _end_line(block))
+
+
+def _end_line(block: dict) -> int:
+    """_summary_
+
+    Args:
+        block (dict): one side of a duplicate pair
+
+    Returns:
+        int: last line of the block, from its text when the engine didn't report it
+    """
+    if "end_line" in block:
+        return block["end_line"]
+    return block["line_number"] + block.get("text", "").count("\n")
+
+
+def _member_span(block: dict) -> dict:
+    """_summary_
+
+    Args:
+        block (dict): one side of a duplicate pair
+
+    Returns:
+        dict: where the block is, without its text or tokens
+    """
+    span = {"line_number": block["line_number"], "end_line": _end_line(block)}
+    for key in ("file", "id"):
+        if key in block:
+            span[key] = block[key]
+    return span
+
+
+def _table_block(table: BlockTable, block_id: int) -> dict:
+    """_summary_
+
+    Args:
+        table (BlockTable): blocks of the analysis
+        block_id (int): block
+
+    Returns:
+        dict: the block in the shape of one side of a duplicate pair, text sliced out now
+    """
+    return {"id": block_id, "index": block_id, "text": table.text(block_id), "type": "code", **table.span(block_id)}
+
+
+def _clone_classes(duplicates: List[dict], table: BlockTable = None) -> List[dict]:
+    """_summary_
+
+    Note:
+        Connected pairs end up in the same class, so with a Jaccard threshold a class can hold two
+        blocks that are only similar through a third one, "similarity" keeps the lowest and highest
+        pair score to show how tight the class is.
+
+    Args:
+        duplicates (List[dict]): duplicate pairs from any engine, @see _find_duplicated_code(),
+                                 or records pointing into table, @see _find_duplicate_records()
+        table (BlockTable, optional): blocks the records point into, only the text of the
+                                      representatives is read from it. Defaults to None.
+
+    Returns:
+        List[dict]: list of {"clone_class", "representative", "members", "pairs", "similarity"} dicts,
+                    the representative is the first member (text and line), members are sorted
+                    spans, classes are sorted by their first member
+    """
+    keys, blocks, parent = {}, [], []
+
+    def node(block) -> int:
+        if table is not None:
+            block = {"id": block, "index": block, **table.span(block)}
+        key = _block_key(block)
+        if key not in keys:
+            keys[key] = len(blocks)
+            blocks.append(block)
+            parent.append(keys[key])
+        return keys[key]
+
+    edges = []
+    for dup in duplicates:
+        a, b = node(dup["block1"]), node(dup["block2"])
+        edges.append((a, dup["similarity"]))
+        root_a, root_b = _find_root(parent, a), _find_root(parent, b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    members, stats = {}, {}
+    for n in range(len(blocks)):
+        members.setdefault(_find_root(parent, n), []).append(n)
+    for a, sim in edges:
+        root = _find_root(parent, a)
+        count, low, high = stats.get(root, (0, sim, sim))
+        stats[root] = (count + 1, min(low, sim), max(high, sim))
+
+    def position(n: int) -> tuple:
+        return (blocks[n].get("file") or "", blocks[n]["line_number"], _end_line(blocks[n]))
+
+    groups = sorted((sorted(group, key=position) for group in members.values()), key=lambda g: position(g[0]))
+
+    classes = []
+    for class_id, group in enumerate(groups):
+        first = blocks[group[0]] if table is None else _table_block(table, blocks[group[0]]["id"])
+        count, low, high = stats[_find_root(parent, group[0])]
+        representative = {key: first[key] for key in ("file", "text", "type") if key in first}
+        representative.update(_member_span(first))
+        classes.append(
+            {
+                "clone_class": class_id,
+                "representative": representative,
+                "members": [_member_span(blocks[n]) for n in group],
+                "pairs": count,
+                "similarity": {"min": low, "max": high},
+            }
+        )
+
+    clone_classes_logger.info(
+        f"[done] {len(duplicates)} pair/s -> {len(classes)} clone class/es over {len(blocks)} block/s"
+    )
+    return classes
@@ -0,0 +1,289 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: clone_index.py
+#
+# __brief__: Project-level (cross-file) clone detection. Every block of every file is fingerprinted
+#            once and stored in an on-disk index keyed by file path and content hash, so a re-scan
+#            only has to re-tokenize the files that actually changed.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from core.constants import DUPS_THRESHOLD, DUPS_SEGMENTER, CLONE_INDEX_PATH, CLONE_INDEX_EXCLUDE
+from core.duplicated_finder import (
+    _remove_comments,
+    _split_into_blocks,
+    _tokenize_valid_blocks,
+    _generate_ngrams,
+)
+from core.lsh_index import (
+    _crc32_ngram_hashes,
+    _make_permutations,
+    _minhash_signature,
+    _optimal_lsh_params,
+    _lsh_candidate_pairs,
+)
+from utils.logger import setup_logger
+
+# ==========
+clone_index_logger = setup_logger(
+    name="clone_index.py_logger", log_file="clone_index.log"
+)
+# ==========
+
+clone_index_logger.info("clone_index_logger")
+
+# bump when blocks are cut or tokenized differently, every indexed file is fingerprinted again
+# (2: tokens from the token stream, AST segmenter)
+CLONE_INDEX_VERSION = 2
+
+
+def _iter_python_files(root_dir: str):
+    """_summary_
+
+    Args:
+        root_dir (str): directory to scan
+
+    Yields:
+        Path: every *.py file under root_dir, skipping CLONE_INDEX_EXCLUDE directories
+    """
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in CLONE_INDEX_EXCLUDE)
+        for name in sorted(filenames):
+            if name.endswith(".py"):
+                yield Path(dirpath, name).resolve()
+
+
+def _fingerprint_source(source_code: str, segmenter: str = None) -> list:
+    """_summary_
+
+    Args:
+        source_code (str): contents of one file
+        segmenter (str, optional): "ast" or "lines", @see _split_into_blocks(). Defaults to None
+                                   (DUPS_SEGMENTER).
+
+    Returns:
+        list: one dict per block -> {"line_number", "end_line", "ngrams"}, where "ngrams" is the
+              sorted list of 32 bit n-gram hashes, @see lsh_index._crc32_ngram_hashes()
+    """
+    cleaned_code = _remove_comments(source_code)
+    if not cleaned_code.strip():
+        return []
+
+    fingerprints = []
+    for tokens, block, line_num in _tokenize_valid_blocks(_split_into_blocks(cleaned_code, segmenter), cleaned_code):
+        hashes = _crc32_ngram_hashes(_generate_ngrams(tokens))
+        fingerprints.append(
+            {
+                "line_number": line_num,
+                "end_line": line_num + len(block.splitlines()) - 1,
+                "ngrams": sorted(set(int(h) for h in hashes)),
+            }
+        )
+    return fingerprints
+
+
+def _load_clone_index(index_path: str) -> dict:
+    """_summary_
+
+    Args:
+        index_path (str): path of the JSON index
+
+    Note:
+        The header records the version and the segmenter the blocks were cut with, an index
+        written under either one different is dropped instead of mixing old and new blocks.
+
+    Returns:
+        dict: the index, or an empty one if it is missing, unreadable, from another version or
+              from another segmenter
+    """
+    empty = {"version": CLONE_INDEX_VERSION, "segmenter": DUPS_SEGMENTER, "files": {}}
+    if not os.path.exists(index_path):
+        return empty
+
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        clone_index_logger.warning(f"could not load clone index {index_path}, starting over: {e}")
+        return empty
+
+    if index.get("version") != CLONE_INDEX_VERSION:
+        clone_index_logger.info(f"clone index version changed, starting over: {index_path}")
+        return empty
+    if index.get("segmenter") != DUPS_SEGMENTER:
+        clone_index_logger.info(f"clone index segmenter changed to {DUPS_SEGMENTER}, starting over: {index_path}")
+        return empty
+    return index
+
+
+def _save_clone_index(index: dict, index_path: str) -> str:
+    """_summary_
+
+    Args:
+        index (dict): the index
+        index_path (str): where to write it
+
+    Returns:
+        str: index_path
+    """
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+    clone_index_logger.info(f"clone index saved to: {index_path}")
+    return index_path
+
+
+def _is_under(path: str, root_dir: str) -> bool:
+    """_summary_
+
+    Args:
+        path (str): absolute file path
+        root_dir (str): directory
+
+    Returns:
+        bool: True if path lives somewhere under root_dir
+    """
+    root = str(Path(root_dir).resolve())
+    return os.path.commonpath([path, root]) == root
+
+
+def _update_clone_index(root_dir: str, index: dict) -> dict:
+    """_summary_
+
+    Note:
+        Only files whose content hash changed (or that are new) get re-tokenized.
+
+    Args:
+        root_dir (str): directory to scan
+        index (dict): index to update in place, @see _load_clone_index()
+
+    Returns:
+        dict: stats -> {"scanned", "fingerprinted", "reused", "removed"}
+    """
+    stats = {"scanned": 0, "fingerprinted": 0, "reused": 0, "removed": 0}
+    seen = set()
+
+    for path in _iter_python_files(root_dir):
+        key = str(path)
+        seen.add(key)
+        stats["scanned"] += 1
+
+        try:
+            raw = path.read_bytes()
+        except OSError as e:
+            clone_index_logger.warning(f"could not read {key}: {e}")
+            continue
+
+        digest = hashlib.sha256(raw).hexdigest()
+        entry = index["files"].get(key)
+        if entry is not None and entry["hash"] == digest:
+            stats["reused"] += 1
+            continue
+
+        index["files"][key] = {
+            "hash": digest,
+            "blocks": _fingerprint_source(raw.decode("utf-8", errors="ignore"), index["segmenter"]),
+        }
+        stats["fingerprinted"] += 1
+
+    for key in [k for k in index["files"] if k not in seen and _is_under(k, root_dir)]:
+        del index["files"][key]
+        stats["removed"] += 1
+
+    clone_index_logger.info(f"[update] {root_dir}: {stats}")
+    return stats
+
+
+def _find_cross_file_duplicates(index: dict, root_dir: str, threshold: float = DUPS_THRESHOLD) -> list:
+    """_summary_
+
+    Args:
+        index (dict): an up to date index, @see _update_clone_index()
+        root_dir (str): only files under this directory are compared
+        threshold (float, optional): Jaccard threshold. Defaults to DUPS_THRESHOLD.
+
+    Returns:
+        list: duplicate pairs where both blocks live in different files
+    """
+    refs, ngram_sets, signatures = [], [], []
+    perms = _make_permutations()
+    for file_path in sorted(index["files"]):
+        if not _is_under(file_path, root_dir):
+            continue
+        for block_idx, block in enumerate(index["files"][file_path]["blocks"]):
+            refs.append((file_path, block_idx, block))
+            ngram_sets.append(frozenset(block["ngrams"]))
+            signatures.append(_minhash_signature(np.asarray(block["ngrams"], dtype=np.uint64), perms))
+
+    bands, rows = _optimal_lsh_params(threshold)
+
+    duplicates = []
+    for i, j in _lsh_candidate_pairs(signatures, bands, rows):
+        file_i, idx_i, block_i = refs[i]
+        file_j, idx_j, block_j = refs[j]
+        if file_i == file_j:
+            continue
+
+        union = len(ngram_sets[i] | ngram_sets[j])
+        sim = len(ngram_sets[i] & ngram_sets[j]) / union if union else 0.0
+        if sim >= threshold:
+            duplicates.append(
+                {
+                    "block1": {
+                        "file": file_i,
+                        "index": idx_i,
+                        "line_number": block_i["line_number"],
+                        "end_line": block_i["end_line"],
+                    },
+                    "block2": {
+                        "file": file_j,
+                        "index": idx_j,
+                        "line_number": block_j["line_number"],
+                        "end_line": block_j["end_line"],
+                    },
+                    "similarity": sim,
+                    "threshold": threshold,
+                }
+            )
+
+    clone_index_logger.info(f"[done] found {len(duplicates)} cross-file duplicate pair/s")
+    return duplicates
+
+
+def find_project_duplicates(
+    root_dir: str, index_path: str = CLONE_INDEX_PATH, threshold: float = DUPS_THRESHOLD
+) -> list:
+    """_summary_
+
+    Note:
+        Abstract the details from the client
+
+    Args:
+        root_dir (str): directory to scan for *.py files
+        index_path (str, optional): where the fingerprint index lives. Defaults to CLONE_INDEX_PATH.
+        threshold (float, optional): Jaccard threshold. Defaults to DUPS_THRESHOLD.
+
+    Returns:
+        list: @see _find_cross_file_duplicates()
+    """
+    index = _load_clone_index(index_path)
+    _update_clone_index(root_dir, index)
+    _save_clone_index(index, index_path)
+
+    return _find_cross_file_duplicates(index, root_dir, threshold)
@@ -17,6 +17,7 @@ import re
 
 from utils.logger import setup_logger
 from utils.utility import _read_file_contents
+from core.parsed_source import ParsedSource
 
 # ==========
 code_metrics_logger = setup_logger(
@@ -137,7 +138,7 @@ def _calculate_code_metrics(info_dict: dict) -> dict:
     return metrics
 
 
-def fetch_code_metrics(file_name: str) -> dict:
+def fetch_code_metrics(file_name: str, source: ParsedSource = None) -> dict:
     """_summary_
 
     Note:
@@ -145,12 +146,13 @@ def fetch_code_metrics(file_name: str) -> dict:
 
     Args:
         file_name (str): Name of the file to analyze.
+        source (ParsedSource, optional): the file, already read. Defaults to None (read it here).
     Returns:
         _type_: @see _calculate_code_metrics()
     """
     code_metrics_logger.info(f"Fetching metrics for file: {file_name}")
 
-    raw_code = _read_file_contents(file_name)
+    raw_code = source.text if source is not None else _read_file_contents(file_name)
     code_metrics_logger.debug(f"Read {len(raw_code.splitlines())} lines from file.")
 
     classified_lines = _classify_lines_of_code(raw_code)
@@ -12,16 +12,17 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # =========
-from typing import Tuple, Dict
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, Tuple
 
 from utils.logger import setup_logger
-from utils.utility import _read_file_contents, _save_to_json, _generate_readable_report
+from utils.utility import _save_to_json, _generate_readable_report
 
-from core.duplicated_finder import _find_duplicated_code
-from core.method_length import _find_long_method
-from core.param_length import _find_long_parameter_list
-from core.code_metrics import fetch_code_metrics
-from core.halstead import fetch_halstead_metrics
+from core.constants import BATCH_WORKERS, DETECTOR_POOL
+from core.parsed_source import ParsedSource
+from core.detectors import _report_settings, _run_detectors
+from core.analysis_cache import ANALYSIS_CACHE
 
 # ==========
 code_smells_logger = setup_logger(
@@ -32,11 +33,20 @@ code_smells_logger = setup_logger(
 code_smells_logger.info("code_smells_logger")
 
 
-def find_code_smells(file_name: str) -> Tuple[Dict, str]:
+def find_code_smells(file_name: str, pool: str = DETECTOR_POOL, use_cache: bool = True) -> Tuple[Dict, str]:
     """_summary_
 
+    Note:
+        The file is read once into a ParsedSource and every registered detector works off of it,
+        @see core.parsed_source, @see core.detectors. They run one after another unless a pool is
+        asked for. A file analyzed before with the same content and settings is answered from
+        ANALYSIS_CACHE without running anything or writing another report, @see core.analysis_cache.
+        The entry is per path, a copy of the file elsewhere gets a report of its own.
+
     Args:
         file_name (str): name of the file
+        pool (str, optional): where the heavy detectors run, @see _run_detectors(). Defaults to DETECTOR_POOL.
+        use_cache (bool, optional): go through ANALYSIS_CACHE. Defaults to True.
 
     Raises:
         TypeError: raised when the file could not be read
@@ -44,23 +54,118 @@ def find_code_smells(file_name: str) -> Tuple[Dict, str]:
     Returns:
         dict: summary of all code smells
     """
-    source_code = _read_file_contents(file_name)
-
-    if source_code is not None:
-        code_smells_logger.info(f"read file: {file_name}, got {len(source_code)} lines")
-
+    source = ParsedSource.from_file(file_name)
+    code_smells_logger.info(f"read file: {file_name}, got {len(source)} lines")
+
+    settings = _report_settings()
+    key = ANALYSIS_CACHE.key(source.text, file_name, settings) if use_cache else None
+    cached = ANALYSIS_CACHE.get(key) if use_cache else None
+    if cached is not None:
+        code_smells, readable_report_path = cached
+        if readable_report_path and os.path.exists(readable_report_path):
+            code_smells_logger.info(f"cached report for {file_name}: {readable_report_path}")
+            return code_smells, readable_report_path
+        # the report files were cleaned up since, write them again from the cached result
     else:
-        code_smells_logger.error(f"could not read file: {file_name}")
-        raise TypeError(f"could not read file: {file_name}")
-
-    code_smells = {"long_parameter_list": _find_long_parameter_list(source_code),
-                   "long_method": _find_long_method(source_code), "duplicated_code": _find_duplicated_code(source_code),
-                   "code_metrics": fetch_code_metrics(file_name), "halstead_metrics": fetch_halstead_metrics(file_name)}
+        code_smells = _run_detectors(source, pool=pool, settings=settings)
 
     raw_json = _save_to_json(code_smells, file_name)
     readable_report_path = _generate_readable_report(raw_json)
+    if use_cache:
+        ANALYSIS_CACHE.put(key, code_smells, file_name, readable_report_path)
 
     code_smells_logger.info(f"found code smells: {code_smells}")
     code_smells_logger.info(f"json ready: {raw_json}")
 
     return code_smells, readable_report_path
+
+
+def _analyze_file(file_name: str, use_cache: bool = True) -> dict:
+    """_summary_
+
+    Note:
+        Runs in a worker process, the detectors run serially there (the files are the parallelism).
+        Any error is caught and sent back as text, an exception might not pickle.
+
+    Args:
+        file_name (str): name of the file
+        use_cache (bool, optional): @see find_code_smells(). Defaults to True.
+
+    Returns:
+        dict: {"file", "code_smells", "report", "error"}, @see find_code_smells_many()
+    """
+    try:
+        code_smells, report = find_code_smells(file_name, pool="serial", use_cache=use_cache)
+        return {"file": file_name, "code_smells": code_smells, "report": report, "error": None}
+    except Exception as e:
+        code_smells_logger.error(f"[batch] {file_name} failed: {e}")
+        return {"file": file_name, "code_smells": None, "report": None, "error": traceback.format_exc()}
+
+
+def _file_size(file_name: str) -> int:
+    """_summary_
+
+    Args:
+        file_name (str): name of the file
+
+    Returns:
+        int: size in bytes, 0 if it can't be read (the worker reports the error)
+    """
+    try:
+        return os.path.getsize(file_name)
+    except OSError:
+        return 0
+
+
+def find_code_smells_many(
+    paths: Iterable[str], workers: int = BATCH_WORKERS, ordered: bool = False, use_cache: bool = True
+) -> Iterator[dict]:
+    """_summary_
+
+    Note:
+        Files are handed to the pool largest first, so one big file picked up last doesn't keep
+        the batch waiting after everything else is done. A file that fails (unreadable, no code,
+        a crashed worker) is yielded with its error, the rest of the batch carries on.
+
+    Args:
+        paths (Iterable[str]): files to analyze, @see find_code_smells()
+        workers (int, optional): worker processes, 1 analyzes the files here one by one.
+                                 Defaults to BATCH_WORKERS.
+        ordered (bool, optional): yield in the order of paths instead of as files finish.
+                                  Defaults to False.
+        use_cache (bool, optional): unchanged files come from ANALYSIS_CACHE, which every worker
+                                    shares. Defaults to True.
+
+    Yields:
+        dict: {"file", "code_smells", "report", "error"} per file, error is None on success and
+              the traceback otherwise
+    """
+    paths = [str(path) for path in paths]
+    schedule = sorted(range(len(paths)), key=lambda n: -_file_size(paths[n]))
+    code_smells_logger.info(f"[batch] {len(paths)} file/s, {workers} worker/s, {'ordered' if ordered else 'as completed'}")
+
+    if workers <= 1:
+        for n in (range(len(paths)) if ordered else schedule):
+            yield _analyze_file(paths[n], use_cache)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(_analyze_file, paths[n], use_cache): n for n in schedule}
+        results, next_index = {}, 0
+        for future in as_completed(futures):
+            n = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # the worker died (BrokenProcessPool), not the analysis
+                result = {"file": paths[n], "code_smells": None, "report": None, "error": repr(e)}
+            if not ordered:
+                yield result
+                continue
+            results[n] = result
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+    finally:
+        # a caller that stops early doesn't wait for the files nobody will read
+        executor.shutdown(cancel_futures=True)
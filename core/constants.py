@@ -74,6 +74,67 @@ PARAMS_THRESHOLD: int = 3
 LENGTH_THRESHOLD: int = 15
 DUPS_THRESHOLD: float = 0.76  # 0.75
 
+# Which duplicate engine _find_duplicated_code() runs: "jaccard" (blocks), "suffix" (token runs),
+# "ast" (structurally equal statements), "winnow" (winnowed k-gram fingerprints) or "tfidf"
+# (TF-IDF weighted cosine of the block n-grams) or "hierarchical" (blocks of similar functions)
+DUPS_ENGINE: str = "jaccard"
+# How blocks are cut: "ast" (statement boundaries from the syntax tree, @see core.ast_segmenter) or
+# "lines" (keywords at the start of a line and indentation), "ast" falls back to "lines" on a syntax error
+DUPS_SEGMENTER: str = "ast"
+SUFFIX_MIN_TOKENS: int = 30
+AST_CLONE_MIN_NODES: int = 20
+
+# Winnowing: k-gram size, the run length that is always detected (window = guarantee - k + 1), and
+# how many locations a fingerprint may have before it's treated as boilerplate and skipped
+WINNOW_K: int = 12
+WINNOW_GUARANTEE: int = 30
+WINNOW_MAX_POSTINGS: int = 100
+
+# Re-analysis cache for duplicated code (block tokens / fingerprints, and pair scores), LRU bounded
+DUPS_CACHE_BLOCKS: int = 20_000
+DUPS_CACHE_PAIRS: int = 500_000
+
+# Lines tokenized / parsed at once when streaming a file through the duplicate finder
+STREAM_CHUNK_LINES: int = 2_000
+
+# Process pool for scoring block pairs, below DUPS_PARALLEL_MIN_PAIRS pairs the pool isn't worth starting
+DUPS_WORKERS: int = os.cpu_count() or 1
+DUPS_PARALLEL_MIN_PAIRS: int = 500_000
+
+# TF-IDF engine: lowest weighted cosine reported, and (row, other row) scores computed per tile
+TFIDF_THRESHOLD: float = 0.8
+TFIDF_TILE_CELLS: int = 1 << 22
+
+# Hierarchical search: blocks of two functions are only compared when the functions' n-gram signatures
+# are at least this similar, @see core.hierarchical
+HIER_FUNCTION_BOUND: float = 0.3
+# with more than 1 / HIER_JOIN_RATIO of the block pairs left, they go through the similarity join first
+HIER_JOIN_RATIO: int = 3
+
+# Threshold sweep: lowest similarity scored once, and the spacing of the default precision table
+SWEEP_FLOOR: float = 0.5
+SWEEP_STEP: float = 0.02
+
+# Most blocks a "find similar" query returns, @see core.block_index
+BLOCK_QUERY_TOP_K: int = 5
+
+# Report detectors: where the CPU-heavy ones run ("serial", "thread" or "process") and how many at once.
+# Serial by default, the pools barely overlap pure-Python detectors on one file, @see core.detectors
+DETECTOR_POOL: str = "serial"
+DETECTOR_WORKERS: int = 2
+
+# Processes analyzing files side by side in find_code_smells_many(), @see core.code_smells
+BATCH_WORKERS: int = os.cpu_count() or 1
+
+# SimHash first-pass filter: blocks within this many differing bits (of 64) are near-duplicate candidates
+SIMHASH_RADIUS: int = 8
+
+# MinHash + banded LSH candidate stage for duplicated code
+LSH_NUM_PERM: int = 128
+LSH_TARGET_RECALL: float = 0.99
+LSH_MIN_BLOCKS: int = 500  # below this, all-pairs is cheap enough
+LSH_SEED: int = 4260
+
 LOG_COLORS = {
     "DEBUG": "cyan",
     "INFO": "green",
@@ -84,6 +145,19 @@ LOG_COLORS = {
 
 JSON_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data/json/"))
 
+# Project-wide clone index (fingerprints of every block, keyed by file path + content hash)
+CLONE_INDEX_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../data/index/clone_index.json")
+)
+CLONE_INDEX_EXCLUDE = {".git", "__pycache__", "__MACOSX", ".venv", "venv"}
+
+# On-disk cache of whole reports (keyed by file content, thresholds and analyzer version), and the most
+# bytes of reports it keeps before the least recently used ones are dropped, @see core.analysis_cache
+ANALYSIS_CACHE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../data/index/analysis_cache.sqlite3")
+)
+ANALYSIS_CACHE_MAX_BYTES: int = 64 << 20
+
 # Set to false when being graded
 i_am_local = False
 
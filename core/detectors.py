@@ -0,0 +1,315 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: detectors.py
+#
+# __brief__: The detectors of a report, as a registry instead of a dict literal. Every detector and
+#            every shared input (raw text, AST, function metrics, duplicate blocks) declares
+#            what it is built from and whether it is CPU-heavy. The scheduler builds each input once
+#            and runs the nodes in dependency order, serially by default. The heavy nodes can go to a
+#            thread or process pool instead, but they are pure Python (threads take turns on the GIL)
+#            and a process pool pickles their inputs, so on one file that saves little or nothing.
+#            A new detector is one register_detector() call, code_smells.py doesn't change.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Tuple
+
+import core.constants as constants
+from core.constants import DETECTOR_POOL, DETECTOR_WORKERS
+from core.clone_classes import _clone_classes
+from core.code_metrics import fetch_code_metrics
+from core.duplicated_finder import _duplicate_settings, _engine_options, _find_duplicate_records
+from core.function_metrics import _function_metrics, _long_methods, _long_parameter_lists
+from core.halstead import _calculate_halstead_metrics, _extract_operators_and_operands
+from core.method_length import _find_long_method
+from core.param_length import _find_long_parameter_list
+from core.parsed_source import ParsedSource
+from utils.logger import setup_logger
+
+# ==========
+detectors_logger = setup_logger(name="detectors.py_logger", log_file="detectors.log")
+# ==========
+
+detectors_logger.info("detectors_logger")
+
+# name -> {"func", "inputs", "heavy"}, inputs are only built when a detector needs them
+INPUTS = {}
+# name -> {"func", "inputs", "heavy"}, in report order
+DETECTORS = {}
+
+# values handed to every run instead of built by a node, @see _run_detectors()
+SEEDS = ("source", "settings", "pool")
+
+
+def _register(registry: dict, name: str, inputs: Tuple[str, ...], heavy: bool) -> Callable:
+    """_summary_
+
+    Args:
+        registry (dict): INPUTS or DETECTORS
+        name (str): key of the node, and of its value in the report
+        inputs (Tuple[str, ...]): "source" (the ParsedSource), "settings" (@see _report_settings()),
+                                  "pool" (@see _run_detectors()), inputs or other detectors, in the
+                                  order the function takes them
+        heavy (bool): run in the pool instead of inline
+
+    Returns:
+        Callable: decorator registering the function
+    """
+    def decorator(func: Callable) -> Callable:
+        registry[name] = {"func": func, "inputs": tuple(inputs), "heavy": heavy}
+        detectors_logger.debug(f"[register] {name} <- {', '.join(inputs) or '-'}{' (heavy)' if heavy else ''}")
+        return func
+
+    return decorator
+
+
+def register_input(name: str, inputs: Tuple[str, ...] = ("source",), heavy: bool = False) -> Callable:
+    """_summary_
+
+    Note:
+        A shared input is built at most once per file, however many detectors use it, and only
+        if one of them runs.
+
+    Args:
+        name (str): name detectors ask for it by
+        inputs (Tuple[str, ...], optional): what it is built from. Defaults to ("source",).
+        heavy (bool, optional): CPU-heavy, built in the pool. Defaults to False.
+
+    Returns:
+        Callable: decorator, @see _register()
+    """
+    return _register(INPUTS, name, inputs, heavy)
+
+
+def register_detector(name: str, inputs: Tuple[str, ...] = ("text",), heavy: bool = False) -> Callable:
+    """_summary_
+
+    Note:
+        Heavy detectors may run in another process (DETECTOR_POOL = "process"), their function has
+        to be a module level function and their inputs and result have to pickle.
+
+    Args:
+        name (str): key of the result in the report
+        inputs (Tuple[str, ...], optional): @see _register(). Defaults to ("text",).
+        heavy (bool, optional): CPU-heavy, run in the pool. Defaults to False.
+
+    Returns:
+        Callable: decorator, @see _register()
+    """
+    return _register(DETECTORS, name, inputs, heavy)
+
+
+def _node(name: str) -> dict:
+    """_summary_
+
+    Args:
+        name (str): input or detector
+
+    Raises:
+        ValueError: if nothing is registered under the name
+
+    Returns:
+        dict: the registered node
+    """
+    if name in INPUTS:
+        return INPUTS[name]
+    if name in DETECTORS:
+        return DETECTORS[name]
+    raise ValueError(f"Unknown detector or input: '{name}'. Registered: {sorted(INPUTS) + list(DETECTORS)}")
+
+
+def _resolve(names: Iterable[str]) -> list:
+    """_summary_
+
+    Args:
+        names (Iterable[str]): detectors to run
+
+    Raises:
+        ValueError: on an unknown name or a dependency cycle
+
+    Returns:
+        list: the detectors and every input they need, each after its own inputs
+    """
+    order, seen = [], set()
+
+    def add(name: str, path: tuple) -> None:
+        if name in SEEDS or name in seen:
+            return
+        if name in path:
+            raise ValueError(f"Detector dependency cycle: {' -> '.join(path + (name,))}")
+        for dependency in _node(name)["inputs"]:
+            add(dependency, path + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for name in names:
+        add(name, ())
+    return order
+
+
+def _report_settings() -> dict:
+    """_summary_
+
+    Note:
+        Read once per report and handed to the detectors, which pass every threshold on
+        explicitly, so a report runs with exactly these values. The analysis cache hashes the
+        same dict, @see AnalysisCache.key().
+
+    Returns:
+        dict: name -> value of every setting a report depends on
+    """
+    return {
+        "PARAMS_THRESHOLD": constants.PARAMS_THRESHOLD,
+        "LENGTH_THRESHOLD": constants.LENGTH_THRESHOLD,
+        **_duplicate_settings(),
+    }
+
+
+def _run_detectors(
+    source: ParsedSource,
+    names: Iterable[str] = None,
+    pool: str = DETECTOR_POOL,
+    workers: int = DETECTOR_WORKERS,
+    settings: dict = None,
+) -> dict:
+    """_summary_
+
+    Note:
+        Serial runs every node inline in dependency order. With a pool, ready heavy nodes are
+        submitted first, then one ready light node runs inline, and only when nothing is left to
+        run inline does the scheduler wait for the pool; the duplicate finder then scores its pairs
+        in that worker instead of starting processes of its own. An exception in a detector is
+        raised here, like it was when they ran one after another.
+
+    Args:
+        source (ParsedSource): the file, @see core.parsed_source
+        names (Iterable[str], optional): detectors to run. Defaults to None (all of them).
+        pool (str, optional): "serial", "thread" or "process". Defaults to DETECTOR_POOL.
+        workers (int, optional): heavy nodes running at once. Defaults to DETECTOR_WORKERS.
+        settings (dict, optional): @see _report_settings(). Defaults to None (read now).
+
+    Raises:
+        ValueError: if the pool is unknown, @see _resolve()
+
+    Returns:
+        dict: detector name -> result, in the order asked for (registry order by default)
+    """
+    if pool not in ("thread", "process", "serial"):
+        raise ValueError(f"Unknown detector pool: '{pool}'. Use 'thread', 'process' or 'serial'.")
+    names = list(DETECTORS) if names is None else list(names)
+    pending = _resolve(names)
+    values = {"source": source, "settings": _report_settings() if settings is None else settings, "pool": pool}
+
+    pooled = pool != "serial" and any(_node(name)["heavy"] for name in pending)
+    executor = None
+    if pooled:
+        executor = (ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor)(max_workers=workers)
+
+    start = time.perf_counter()
+    running = {}
+    try:
+        while pending or running:
+            ready = [name for name in pending if all(d in values for d in _node(name)["inputs"])]
+            for name in ready:
+                node = _node(name)
+                if pooled and node["heavy"]:
+                    pending.remove(name)
+                    running[executor.submit(node["func"], *(values[d] for d in node["inputs"]))] = name
+
+            inline = next((name for name in ready if name in pending), None)
+            if inline is not None:
+                node = _node(inline)
+                pending.remove(inline)
+                values[inline] = node["func"](*(values[d] for d in node["inputs"]))
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                values[running.pop(future)] = future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    detectors_logger.info(
+        f"[run] {len(names)} detector/s on {source.file_name} in {time.perf_counter() - start:.3f}s ({pool})"
+    )
+    return {name: values[name] for name in names}
+
+
+# ================================================= INPUTS =================================================
+
+
+@register_input("text")
+def _text(source: ParsedSource) -> str:
+    return source.text
+
+
+@register_input("tree")
+def _tree(source: ParsedSource):
+    return source.tree
+
+
+@register_input("functions", inputs=("tree",))
+def _functions(tree):
+    # None when the file doesn't parse, the detectors fall back to the line scanners
+    return _function_metrics(tree) if tree is not None else None
+
+
+@register_input("blocks", inputs=("text", "settings", "pool"), heavy=True)
+def _blocks(text: str, settings: dict, pool: str) -> tuple:
+    # already in a pool, no scoring processes of its own (forking next to running threads)
+    workers = None if pool == "serial" else 1
+    return _find_duplicate_records(text, **_engine_options(settings, workers))
+
+
+# ================================================ DETECTORS ===============================================
+
+
+@register_detector("long_parameter_list", inputs=("functions", "text", "settings"))
+def _detect_long_parameter_list(functions, text: str, settings: dict) -> list:
+    threshold = settings["PARAMS_THRESHOLD"]
+    if functions is not None:
+        return _long_parameter_lists(functions, threshold)
+    return _find_long_parameter_list(text, threshold)
+
+
+@register_detector("long_method", inputs=("functions", "text", "settings"))
+def _detect_long_method(functions, text: str, settings: dict) -> list:
+    threshold = settings["LENGTH_THRESHOLD"]
+    return _long_methods(functions, threshold) if functions is not None else _find_long_method(text, threshold)
+
+
+@register_detector("duplicated_code", inputs=("blocks",))
+def _detect_duplicated_code(blocks: tuple) -> list:
+    table, records = blocks
+    return _clone_classes(records, table)
+
+
+@register_detector("duplicate_blocks", inputs=("blocks", "duplicated_code"))
+def _detect_duplicate_blocks(blocks: tuple, clone_classes: list) -> list:
+    table, _ = blocks
+    return table.to_json(m["id"] for c in clone_classes for m in c["members"])
+
+
+@register_detector("code_metrics", inputs=("source",))
+def _detect_code_metrics(source: ParsedSource) -> dict:
+    return fetch_code_metrics(source.file_name, source)
+
+
+@register_detector("halstead_metrics", inputs=("text",), heavy=True)
+def _detect_halstead_metrics(text: str) -> dict:
+    return _calculate_halstead_metrics(_extract_operators_and_operands(text))
+
+
+@register_detector("function_metrics", inputs=("functions",))
+def _detect_function_metrics(functions) -> list:
+    return functions or []
@@ -0,0 +1,175 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: dup_cache.py
+#
+# __brief__: In-memory cache for re-analyzing the same file after small edits. Blocks are keyed by a
+#            hash of their (normalized) text and keep their tokens and n-gram fingerprint, pair scores
+#            are keyed by the two block hashes. Both tables are bounded LRUs with hit/miss counters.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import hashlib
+from collections import OrderedDict
+
+from core.constants import DUPS_CACHE_BLOCKS, DUPS_CACHE_PAIRS
+from utils.logger import setup_logger
+
+# ==========
+dup_cache_logger = setup_logger(name="dup_cache.py_logger", log_file="dup_cache.log")
+# ==========
+
+dup_cache_logger.info("dup_cache_logger")
+
+
+class LRUCache:
+    """_summary_
+
+    Bounded mapping that evicts the least recently used key, and counts hits and misses.
+    """
+
+    def __init__(self, max_size: int):
+        """_summary_
+
+        Args:
+            max_size (int): most entries kept at once
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """_summary_
+
+        Args:
+            key (Hashable): key to look up
+            default (Any, optional): returned on a miss. Defaults to None.
+
+        Returns:
+            Any: cached value (now the most recently used), or default
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key, default=None):
+        """_summary_
+
+        Note:
+            For reading back what a run already looked up, the counters and the LRU order are
+            left alone, so they only reflect the lookups that decided whether to recompute.
+
+        Args:
+            key (Hashable): key to look up
+            default (Any, optional): returned if the key isn't cached. Defaults to None.
+
+        Returns:
+            Any: cached value, or default
+        """
+        return self._data.get(key, default)
+
+    def put(self, key, value) -> None:
+        """_summary_
+
+        Args:
+            key (Hashable): key to store
+            value (Any): value to store
+        """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """_summary_
+
+        Drops every entry and resets the counters.
+        """
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+
+class DuplicateCache:
+    """_summary_
+
+    Note:
+        Only raw similarities are memoized, never the duplicate / not duplicate decision, so the
+        cache stays valid when DUPS_THRESHOLD changes between runs.
+    """
+
+    def __init__(self, max_blocks: int = DUPS_CACHE_BLOCKS, max_pairs: int = DUPS_CACHE_PAIRS):
+        """_summary_
+
+        Args:
+            max_blocks (int, optional): most blocks kept. Defaults to DUPS_CACHE_BLOCKS.
+            max_pairs (int, optional): most pair scores kept. Defaults to DUPS_CACHE_PAIRS.
+        """
+        self.blocks = LRUCache(max_blocks)
+        self.pairs = LRUCache(max_pairs)
+
+    @staticmethod
+    def block_key(block: str) -> str:
+        """_summary_
+
+        Args:
+            block (str): block text, @see _split_into_blocks()
+
+        Returns:
+            str: content hash of the block
+        """
+        return hashlib.blake2b(block.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def pair_key(key1: str, key2: str) -> tuple:
+        """_summary_
+
+        Args:
+            key1 (str): block hash
+            key2 (str): block hash
+
+        Returns:
+            tuple: order independent key of the pair
+        """
+        return (key1, key2) if key1 <= key2 else (key2, key1)
+
+    def stats(self) -> dict:
+        """_summary_
+
+        Returns:
+            dict: size, hits and misses of both tables
+        """
+        return {
+            name: {"size": len(table), "hits": table.hits, "misses": table.misses}
+            for name, table in (("blocks", self.blocks), ("pairs", self.pairs))
+        }
+
+    def clear(self) -> None:
+        """_summary_
+
+        Empties both tables and resets the counters.
+        """
+        self.blocks.clear()
+        self.pairs.clear()
+        dup_cache_logger.info("[cleared] duplicate cache")
+
+
+# shared by every _find_duplicated_code() call of the process (the GUI re-analyzes the same file)
+DUPLICATE_CACHE = DuplicateCache()
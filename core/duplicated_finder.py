@@ -17,12 +17,57 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import re
 import ast
 import io
+import hashlib
 import tokenize
 import textwrap
 import json
 from collections import defaultdict
 
-from core.constants import DUPS_THRESHOLD
+import core.constants as constants
+from core.constants import (
+    DUPS_THRESHOLD,
+    DUPS_ENGINE,
+    LSH_MIN_BLOCKS,
+    STREAM_CHUNK_LINES,
+    SIMHASH_RADIUS,
+    TFIDF_THRESHOLD,
+    HIER_FUNCTION_BOUND,
+    HIER_JOIN_RATIO,
+    DUPS_SEGMENTER,
+)
+from core.lsh_index import _find_candidate_pairs
+from core.similarity_join import _similarity_join
+from core.simhash import _simhash, SimHashIndex
+from core.tfidf import _cosine_pairs
+from core.ast_segmenter import _ast_block_spans, _parse_source
+from core.hierarchical import (
+    _function_spans,
+    _group_blocks,
+    _similar_groups,
+    _allowed_pairs,
+    _hierarchical_pairs,
+)
+from core.fingerprint import (
+    _ngram_fingerprint,
+    _ngram_hashes,
+    _fingerprint_similarity,
+    FingerprintStack,
+)
+from core.token_stream import (
+    _normalize_token,
+    _ast_tokens,
+    _line_token_table,
+    _slice_line_tokens,
+    _statement_index,
+    _chunked_statement_index,
+    _block_module,
+)
+from core.suffix_clones import _find_suffix_clones
+from core.ast_hash import _find_ast_clones
+from core.winnowing import _find_winnow_clones
+from core.dup_cache import DUPLICATE_CACHE
+from core.block_table import BlockTable
+from core.parallel_scoring import _pair_similarities, _row_similarity_arrays
 from utils.logger import setup_logger
 
 
@@ -34,6 +79,97 @@ duplicated_code_logger = setup_logger(
 
 duplicated_code_logger.info("duplicated_code_logger")
 
+# blocks starting with one of these never parse on their own (the rest of the statement is another block)
+CLAUSE_START = re.compile(r"(try|else|elif|except|finally)\b")
+
+# "def name" of a block that starts a function, decorators may come first
+FUNC_HEADER = re.compile(r"^\s*(?:async\s+)?def\s+([a-zA-Z_][a-zA-Z0-9_]*)", re.MULTILINE)
+
+# every line boundary str.splitlines() splits on
+LINE_BREAK = re.compile(r"\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# constants that change which duplicates are reported (not how fast), @see _duplicate_settings()
+DUPLICATE_SETTINGS = (
+    "DUPS_THRESHOLD",
+    "DUPS_ENGINE",
+    "DUPS_SEGMENTER",
+    "SUFFIX_MIN_TOKENS",
+    "AST_CLONE_MIN_NODES",
+    "WINNOW_K",
+    "WINNOW_GUARANTEE",
+    "WINNOW_MAX_POSTINGS",
+    "TFIDF_THRESHOLD",
+    "HIER_FUNCTION_BOUND",
+    "HIER_JOIN_RATIO",
+    "SIMHASH_RADIUS",
+    "LSH_NUM_PERM",
+    "LSH_TARGET_RECALL",
+    "LSH_MIN_BLOCKS",
+    "LSH_SEED",
+)
+
+# engine -> {keyword argument: setting}, the settings an engine only sees as a default argument
+ENGINE_OPTIONS = {
+    "jaccard": {"threshold": "DUPS_THRESHOLD"},
+    "hierarchical": {"threshold": "DUPS_THRESHOLD", "bound": "HIER_FUNCTION_BOUND"},
+    "tfidf": {"threshold": "TFIDF_THRESHOLD"},
+    "suffix": {"min_tokens": "SUFFIX_MIN_TOKENS"},
+    "ast": {"min_nodes": "AST_CLONE_MIN_NODES"},
+    "winnow": {"k": "WINNOW_K", "guarantee": "WINNOW_GUARANTEE"},
+}
+
+# engines that score pairs in a process pool of their own, @see core.parallel_scoring
+POOLED_ENGINES = ("jaccard", "hierarchical")
+
+def _duplicate_settings() -> dict:
+    """
+    Value of every setting the duplicate engines run with.
+
+    Note:
+        A setting this module imported is read from this module, that binding is the one its
+        functions read when they run. The rest come from core.constants.
+
+    Returns:
+        dict: name -> value, for DUPLICATE_SETTINGS
+    """
+    bound = globals()
+    return {name: bound[name] if name in bound else getattr(constants, name) for name in DUPLICATE_SETTINGS}
+
+def _engine_options(settings: dict, workers: int = None) -> dict:
+    """
+    Keyword arguments that run the engine of settings with exactly those settings.
+
+    Args:
+        settings (dict): @see _duplicate_settings()
+        workers (int, optional): Scoring processes, for the engines in POOLED_ENGINES.
+            Defaults to None (the engine's default).
+
+    Returns:
+        dict: options for _find_duplicate_records(), engine included
+    """
+    engine = settings["DUPS_ENGINE"]
+    options = {keyword: settings[name] for keyword, name in ENGINE_OPTIONS.get(engine, {}).items()}
+    if workers is not None and engine in POOLED_ENGINES:
+        options["workers"] = workers
+    return {"engine": engine, **options}
+
+def _iter_lines(text: str):
+    """
+    Iterate over the lines of a text without building the list.
+
+    Args:
+        text (str): Input text
+
+    Yields:
+        str: Same lines as text.splitlines()
+    """
+    pos = 0
+    for match in LINE_BREAK.finditer(text):
+        yield text[pos : match.start()]
+        pos = match.end()
+    if pos < len(text):
+        yield text[pos:]
+
 def _normalize_indentation(text: str) -> str:
     """
     Normalize indentation by replacing tabs with spaces and dedenting the text.
@@ -57,9 +193,8 @@ def _validate_indentation(text: str) -> bool:
     Returns:
         bool: True if indentation is valid, False otherwise
     """
-    lines = text.splitlines()
     indent_levels = []
-    for i, line in enumerate(lines, 1):
+    for i, line in enumerate(_iter_lines(text), 1):
         if not line.strip():
             continue
         leading_ws = len(line) - len(line.lstrip())
@@ -89,44 +224,101 @@ def _normalize_block(text: str) -> str:
     norm_lines = [line for line in lines if line.strip()]
     return "\n".join(norm_lines)
 
-def _split_into_blocks(source_code: str) -> list:
+def _log_repeated_block(func_blocks: dict, reported: set, func_name: str, block_text: str, start_line: int) -> None:
     """
-    Split source code into blocks based on control structures and indentation.
+    Log a function whose header block was already seen with the same text, by hash instead of
+    by comparing the texts.
+
+    Args:
+        func_blocks (dict): Function name -> {digest: first line}, filled as blocks come
+        reported (set): (function name, digest) pairs already logged
+        func_name (str): Function the block starts
+        block_text (str): Text of the block
+        start_line (int): First line of the block
+    """
+    digest = hashlib.blake2b(_normalize_block(block_text).encode(), digest_size=16).digest()
+    first_line = func_blocks[func_name].setdefault(digest, start_line)
+    if first_line != start_line and (func_name, digest) not in reported:
+        reported.add((func_name, digest))
+        duplicated_code_logger.info(
+            f"[DUPLICATE FUNC] Function '{func_name}' duplicated at lines {first_line} and {start_line}"
+        )
+
+def _iter_ast_blocks(source_code: str, spans: list):
+    """
+    Cut normalized source code into the blocks of the syntax tree, @see core.ast_segmenter.
+
+    Args:
+        source_code (str): Normalized source code the spans were computed on
+        spans (list): (first line, last line) of every block, @see _ast_block_spans()
+
+    Yields:
+        tuple: (code_block_text, starting_line_number)
+    """
+    lines = source_code.split("\n")
+    func_blocks = defaultdict(dict)
+    reported = set()
+    for start, end in spans:
+        block_text = "\n".join(lines[start - 1 : end]).rstrip()
+        match = FUNC_HEADER.search(block_text)
+        if match:
+            _log_repeated_block(func_blocks, reported, match.group(1), block_text, start)
+        yield block_text, start
+
+def _iter_blocks(source_code: str, segmenter: str = None, tree: ast.Module = None):
+    """
+    Split source code into blocks based on control structures and indentation, one block at a time.
+
+    Note:
+        With the "ast" segmenter the blocks come from the syntax tree (one parse, exact statement
+        boundaries), code that doesn't parse falls back to the "lines" splitter. The line splitter
+        only holds the lines of the current block and hands the blocks out as they are closed.
 
     Args:
         source_code (str): Source code to process
+        segmenter (str, optional): "ast" or "lines". Defaults to None (DUPS_SEGMENTER).
+        tree (ast.Module, optional): the normalized source already parsed, @see _parse_source().
+            Defaults to None (parsed here).
 
-    Returns:
-        list: List of (code_block_text, starting_line_number) tuples
+    Yields:
+        tuple: (code_block_text, starting_line_number)
     """
     source_code = _normalize_indentation(source_code)
 
+    if (DUPS_SEGMENTER if segmenter is None else segmenter) == "ast":
+        spans = _ast_block_spans(source_code, tree)
+        if spans is not None:
+            yield from _iter_ast_blocks(source_code, spans)
+            return
+        duplicated_code_logger.debug("[segmenter] source doesn't parse, splitting by lines")
+
     if not _validate_indentation(source_code):
         duplicated_code_logger.warning("Invalid indentation in source code; attempting to process anyway")
 
-    lines = source_code.splitlines()
-    blocks = []
-    func_map = defaultdict(list)
+    func_blocks = defaultdict(dict)
+    reported = set()
     current_block = []
     current_indent = None
     start_line = 0
     current_func_name = None
 
     def flush_block():
-        nonlocal current_block, start_line, current_func_name
+        nonlocal current_block, current_func_name
+        block = None
         if current_block:
             non_empty = [l for l in current_block if l.strip()]
 
             if len(non_empty) >= 2:
                 block_text = "\n".join(current_block).rstrip()
-                blocks.append((block_text, start_line))
+                block = (block_text, start_line)
 
                 if current_func_name:
-                    func_map[current_func_name].append((block_text, start_line))
+                    _log_repeated_block(func_blocks, reported, current_func_name, block_text, start_line)
             current_block = []
             current_func_name = None
+        return block
 
-    for i, line in enumerate(lines, 1):
+    for i, line in enumerate(_iter_lines(source_code), 1):
         stripped = line.strip()
         if not stripped:
             if current_block:
@@ -153,7 +345,9 @@ def _split_into_blocks(source_code: str) -> list:
         if is_new_block or (
             current_block and indent <= current_indent and not line.startswith(" ")
         ):
-            flush_block()
+            block = flush_block()
+            if block is not None:
+                yield block
 
         if not current_block:
             start_line = i
@@ -165,22 +359,22 @@ def _split_into_blocks(source_code: str) -> list:
 
         current_block.append(line)
 
-    flush_block()
+    block = flush_block()
+    if block is not None:
+        yield block
 
-    for name, entries in func_map.items():
-        seen = set()
-        for i in range(len(entries)):
-            for j in range(i + 1, len(entries)):
-                block_i = _normalize_block(entries[i][0])
-                block_j = _normalize_block(entries[j][0])
-                if block_i == block_j and block_i and block_j:
-                    if (block_i, block_j) not in seen:
-                        seen.add((block_i, block_j))
-                        duplicated_code_logger.info(
-                            f"[DUPLICATE FUNC] Function '{name}' duplicated at lines {entries[i][1]} and {entries[j][1]}"
-                        )
+def _split_into_blocks(source_code: str, segmenter: str = None) -> list:
+    """
+    Split source code into blocks based on control structures and indentation.
+
+    Args:
+        source_code (str): Source code to process
+        segmenter (str, optional): "ast" or "lines". Defaults to None (DUPS_SEGMENTER).
 
-    return blocks
+    Returns:
+        list: List of (code_block_text, starting_line_number) tuples, @see _iter_blocks()
+    """
+    return list(_iter_blocks(source_code, segmenter))
 
 def _remove_comments(source_code: str) -> str:
     """
@@ -193,9 +387,8 @@ def _remove_comments(source_code: str) -> str:
         str: Source code without comments
     """
     code = re.sub(r'(""".*?"""|\'\'\'.*?\'\'\')', "", source_code, flags=re.DOTALL)
-    lines = code.splitlines()
     cleaned_lines = []
-    for line in lines:
+    for line in _iter_lines(code):
         in_string = False
         for i, char in enumerate(line):
             if char in ('"', "'") and line[i - 1 : i] != "\\":
@@ -237,87 +430,7 @@ def _tokenize_block(block: str) -> list:
             duplicated_code_logger.warning(f"AST parsing failed for block: {source}")
             return ["SYNTAX_ERROR"]
 
-        ast_tokens = []
-
-        def binop_token(op):
-            """_summary_
-
-            Args:
-                op (_type_): binary operation node
-
-            Returns:
-                _type_: string representation of the binary operation
-            """
-            return {
-                ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/",
-                ast.Mod: "%", ast.Pow: "**", ast.FloorDiv: "//"
-            }.get(type(op), "BINOP")
-
-        def cmp_token(op):
-            """_summary_
-
-            Args:
-                op (_type_): comparison operation node
-
-            Returns:
-                _type_: string representation of the comparison operation
-            """
-            return {
-                ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=",
-                ast.Gt: ">", ast.GtE: ">=", ast.Is: "is", ast.IsNot: "is not",
-                ast.In: "in", ast.NotIn: "not in"
-            }.get(type(op), "CMP")
-
-        def unary_token(op):
-            """_summary_
-
-            Args:
-                op (_type_): unary operation node
-
-            Returns:
-                _type_: string representation of the unary operation
-            """
-            return {
-                ast.UAdd: "+", ast.USub: "-", ast.Not: "not", ast.Invert: "~"
-            }.get(type(op), "UNARYOP")
-
-        for node in ast.walk(tree):
-            match type(node):
-                case ast.FunctionDef | ast.AsyncFunctionDef:
-                    ast_tokens.append("def")
-                    ast_tokens.append("VAR")
-                    ast_tokens.extend(["VAR"] * len(node.args.args))
-                case ast.Call:
-                    ast_tokens.append("call")
-                    ast_tokens.append("VAR")
-                case ast.Assign | ast.AnnAssign:
-                    ast_tokens.append("=")
-                case ast.BinOp:
-                    ast_tokens.append(binop_token(node.op))
-                case ast.UnaryOp:
-                    ast_tokens.append(unary_token(node.op))
-                case ast.Compare:
-                    for op in node.ops:
-                        ast_tokens.append(cmp_token(op))
-                case ast.Return:
-                    ast_tokens.append("return")
-                case ast.Constant:
-                    if isinstance(node.value, str):
-                        ast_tokens.append("STR")
-                    elif isinstance(node.value, (int, float)):
-                        ast_tokens.append("NUM")
-                    elif node.value is None:
-                        ast_tokens.append("None")
-                    elif isinstance(node.value, bool):
-                        ast_tokens.append(str(node.value))
-                case ast.Name:
-                    ast_tokens.append("VAR")
-                case ast.If | ast.For | ast.While | ast.With | ast.Try:
-                    ast_tokens.append(node.__class__.__name__.lower())
-                case _:
-                    pass
-
-        return ast_tokens
+        return _ast_tokens(tree)
 
     # === Helper: tokenize module tokens ===
     def extract_tokenize_tokens(source: str) -> list:
@@ -333,21 +446,9 @@ def _tokenize_block(block: str) -> list:
         try:
             token_stream = tokenize.generate_tokens(io.StringIO(source).readline)
             for tok_type, tok_str, *_ in token_stream:
-                if tok_type == tokenize.NAME:
-                    if tok_str in {"True", "False", "None"}:
-                        tok_list.append(tok_str)
-                    elif tok_str in {"def", "return", "if", "else", "for", "while", "with", "try", "except", "finally"}:
-                        tok_list.append(tok_str)
-                    else:
-                        tok_list.append("VAR")
-                elif tok_type == tokenize.STRING:
-                    tok_list.append("STR")
-                elif tok_type == tokenize.NUMBER:
-                    tok_list.append("NUM")
-                elif tok_type == tokenize.OP:
-                    tok_list.append(tok_str)
-                elif tok_type == tokenize.NEWLINE:
-                    tok_list.append("NEWLINE")
+                normalized = _normalize_token(tok_type, tok_str)
+                if normalized is not None:
+                    tok_list.append(normalized)
         except tokenize.TokenError as e:
             duplicated_code_logger.warning(f"Tokenization failed for block: {e}\nBlock:\n{source}")
             return ["TOKEN_ERROR"]
@@ -363,6 +464,130 @@ def _tokenize_block(block: str) -> list:
 
     return tokens
 
+def _tokenize_blocks(source_code: str, blocks: list, index: dict = None, offset: int = 0) -> list:
+    """
+    Tokenize every block of a file with a single tokenize pass and a single ast.parse() of the file.
+
+    Note:
+        Gives the same tokens as calling _tokenize_block() on every block. The token stream and the
+        statements of each block are sliced out of the file by line range. Blocks that don't line up
+        with whole statements (cut through a bracket, a header without a body, etc.) are tokenized
+        on their own like before.
+
+    Args:
+        source_code (str): Source code the blocks were split from, @see _split_into_blocks()
+        blocks (list): List of (code_block_text, starting_line_number) tuples
+        index (dict, optional): Statements of the whole file when source_code is a chunk of it,
+            @see _statement_index(). Defaults to None (source_code is parsed here).
+        offset (int, optional): Line of the file just before the first line of source_code.
+            Defaults to 0.
+
+    Returns:
+        list: List of token lists, one per block
+    """
+    text = _normalize_indentation(source_code)
+    table = _line_token_table(text)
+    if index is None:
+        offset = 0
+        try:
+            index = _statement_index(ast.parse(text))
+        except SyntaxError:
+            duplicated_code_logger.warning("File level ast.parse() failed, parsing top-level statements one by one")
+            index = _chunked_statement_index(text, table[2])
+
+    all_tokens = []
+    fallbacks = 0
+    for block, start in blocks:
+        if not _validate_indentation(block):
+            duplicated_code_logger.warning(f"Skipping tokenization due to indentation issues in block:\n{block}")
+            all_tokens.append(["INDENTATION_ERROR"])
+            continue
+
+        end = start + len(block.splitlines()) - 1
+        stream = _slice_line_tokens(table, start, end)
+        if stream == ["TOKEN_ERROR"]:
+            duplicated_code_logger.warning(f"AST parsing failed for block: {block}")
+            duplicated_code_logger.warning(f"Tokenization failed for block: unclosed statement\nBlock:\n{block}")
+            all_tokens.append(["SYNTAX_ERROR", "TOKEN_ERROR"])
+            continue
+        if stream is not None and CLAUSE_START.match(block.lstrip()):
+            duplicated_code_logger.warning(f"AST parsing failed for block: {block}")
+            all_tokens.append(["SYNTAX_ERROR"] + stream)
+            continue
+
+        tree = _block_module(index, start + offset, end + offset)
+        if stream is None or tree is None:
+            fallbacks += 1
+            all_tokens.append(_tokenize_block(block))
+            continue
+        all_tokens.append(_ast_tokens(tree) + stream)
+
+    duplicated_code_logger.debug(f"[tokenized] {len(blocks)} block/s, {fallbacks} tokenized on their own")
+    return all_tokens
+
+def _iter_block_groups(source_code: str, blocks, chunk_lines: int = STREAM_CHUNK_LINES):
+    """
+    Group consecutive blocks into chunks of the file that are tokenized and parsed on their own.
+
+    Note:
+        A chunk is only cut where a block starts in column 0 (a top-level statement), once it spans
+        chunk_lines lines. Only the lines and blocks of the current chunk are held.
+
+    Args:
+        source_code (str): Source code the blocks were split from
+        blocks (iterable): (code_block_text, starting_line_number) tuples in order, @see _iter_blocks()
+        chunk_lines (int, optional): Lines per chunk. Defaults to STREAM_CHUNK_LINES.
+
+    Yields:
+        tuple: (chunk text, first line of the chunk, list of the chunk's blocks)
+    """
+    lines = enumerate(_iter_lines(_normalize_indentation(source_code)), 1)
+
+    def chunk_text(first: int, last: int) -> str:
+        kept = []
+        for number, line in lines:
+            if number >= first:
+                kept.append(line)
+            if number >= last:
+                break
+        return "\n".join(kept)
+
+    group, first, last = [], 0, 0
+    for block, start in blocks:
+        if group and start - first >= chunk_lines and not block[:1].isspace():
+            yield chunk_text(first, last), first, group
+            group = []
+        if not group:
+            first = start
+        group.append((block, start))
+        last = start + block.count("\n")
+
+    if group:
+        yield chunk_text(first, last), first, group
+
+def _iter_tokenized_blocks(source_code: str, blocks, chunk_lines: int = STREAM_CHUNK_LINES, index: dict = None):
+    """
+    Tokenize blocks as they come, one chunk of the file at a time.
+
+    Note:
+        Same tokens as _tokenize_blocks(), without holding the token table and the AST of the
+        whole file at once.
+
+    Args:
+        source_code (str): Source code the blocks were split from
+        blocks (iterable): (code_block_text, starting_line_number) tuples in order, @see _iter_blocks()
+        chunk_lines (int, optional): Lines per chunk. Defaults to STREAM_CHUNK_LINES.
+        index (dict, optional): Statements of the whole file, the chunks aren't parsed again,
+            @see _tokenize_blocks(). Defaults to None.
+
+    Yields:
+        tuple: (tokens, code_block_text, starting_line_number)
+    """
+    for chunk, first, group in _iter_block_groups(source_code, blocks, chunk_lines):
+        shifted = [(block, start - first + 1) for block, start in group]
+        for tokens, (block, start) in zip(_tokenize_blocks(chunk, shifted, index, first - 1), group):
+            yield tokens, block, start
+
 # ==================================================================================================================================
 
 
@@ -383,6 +608,10 @@ def _jaccard_similarity(tokens1: list, tokens2: list, ngram_size: int = 3) -> fl
     """
     Calculate Jaccard similarity between two sets of tokens.
 
+    Note:
+        Builds both fingerprints on every call, when the same block is compared more than
+        once build its fingerprint once and use _fingerprint_similarity() instead.
+
     Args:
         tokens1 (list): First list of tokens
         tokens2 (list): Second list of tokens
@@ -391,96 +620,680 @@ def _jaccard_similarity(tokens1: list, tokens2: list, ngram_size: int = 3) -> fl
     Returns:
         float: Jaccard similarity score
     """
-    ngrams1 = _generate_ngrams(tokens1, ngram_size)
-    ngrams2 = _generate_ngrams(tokens2, ngram_size)
-    intersection = ngrams1 & ngrams2
-    union = ngrams1 | ngrams2
-    return len(intersection) / len(union) if union else 0.0
+    return _fingerprint_similarity(
+        _ngram_fingerprint(tokens1, ngram_size), _ngram_fingerprint(tokens2, ngram_size)
+    )
+
+def _tokenize_valid_blocks(blocks: list, source_code: str = None) -> list:
+    """
+    Tokenize every block and drop the ones that could not be tokenized.
+
+    Args:
+        blocks (list): List of (code_block_text, starting_line_number) tuples, @see _split_into_blocks()
+        source_code (str, optional): Source the blocks were split from. When given the file is
+            tokenized a chunk at a time, @see _iter_tokenized_blocks(). Defaults to None (every
+            block on its own).
+
+    Returns:
+        list: List of (tokens, code_block_text, starting_line_number) tuples
+    """
+    if source_code is not None:
+        stream = _iter_tokenized_blocks(source_code, blocks)
+    else:
+        stream = ((_tokenize_block(block), block, line_num) for block, line_num in blocks)
+
+    tokenized_blocks = []
+    for tokens, block, line_num in stream:
+        if _valid_tokens(tokens):
+            tokenized_blocks.append((tokens, block, line_num))
+        else:
+            duplicated_code_logger.warning(f"Skipping block at line {line_num} due to tokenization failure")
+    return tokenized_blocks
 
-def _find_duplicated_code(source_code: str) -> list:
+def _valid_tokens(tokens: list) -> bool:
     """
-    Find duplicated code blocks in the source code.
+    Check whether a block's tokens can be compared at all.
+
+    Args:
+        tokens (list): Tokens of a block, @see _tokenize_block()
+
+    Returns:
+        bool: False for empty blocks and blocks that failed to tokenize
+    """
+    return bool(tokens) and tokens != ["INDENTATION_ERROR"] and tokens != ["TOKEN_ERROR"]
+
+def _iter_cached_blocks(source_code: str, blocks, cache, chunk_lines: int = STREAM_CHUNK_LINES, index: dict = None):
+    """
+    Tokenize and fingerprint blocks as they come, reusing the cached result of blocks seen before.
+
+    Note:
+        A block's tokens only depend on its text, so the cache is keyed by a hash of it. When most
+        blocks of a chunk are new (first run) the chunk is tokenized in one pass, @see _tokenize_blocks(),
+        otherwise only the new blocks are tokenized, one by one.
+
+    Args:
+        source_code (str): Source the blocks were split from
+        blocks (iterable): (code_block_text, starting_line_number) tuples in order, @see _iter_blocks()
+        cache (DuplicateCache): Cache to read from and fill, @see core.dup_cache
+        chunk_lines (int, optional): Lines per chunk. Defaults to STREAM_CHUNK_LINES.
+        index (dict, optional): Statements of the whole file, @see _tokenize_blocks(). Defaults to None.
+
+    Yields:
+        tuple: (tokens, fingerprint (None if the block can't be compared), code_block_text,
+                starting_line_number, cache key, whether the block was not in the cache)
+    """
+    for chunk, first, group in _iter_block_groups(source_code, blocks, chunk_lines):
+        keys = [cache.block_key(block) for block, _ in group]
+        entries = [cache.blocks.get(key) for key in keys]
+        missing = [n for n, entry in enumerate(entries) if entry is None]
+
+        if missing:
+            missing_blocks = [group[n] for n in missing]
+            if 2 * len(missing) > len(group):
+                shifted = [(block, start - first + 1) for block, start in missing_blocks]
+                block_tokens = _tokenize_blocks(chunk, shifted, index, first - 1)
+            else:
+                block_tokens = [_tokenize_block(block) for block, _ in missing_blocks]
+            for n, tokens in zip(missing, block_tokens):
+                entries[n] = (tokens, _ngram_fingerprint(tokens) if _valid_tokens(tokens) else None)
+                cache.blocks.put(keys[n], entries[n])
+
+        missing = set(missing)
+        for n, ((tokens, fingerprint), (block, line_num)) in enumerate(zip(entries, group)):
+            yield tokens, fingerprint, block, line_num, keys[n], n in missing
+
+def _iter_fingerprinted_blocks(cleaned_code: str, use_cache: bool = True):
+    """
+    Split, tokenize and fingerprint the blocks of comment-free code as a stream.
+
+    Note:
+        The code is parsed once, the segmenter cuts the blocks from that tree and the tokenizer
+        takes the blocks' statements from it. Only blocks that don't line up with whole
+        statements are parsed on their own.
+
+    Args:
+        cleaned_code (str): Source code without comments, @see _remove_comments()
+        use_cache (bool, optional): Go through DUPLICATE_CACHE, @see _iter_cached_blocks(). Defaults to True.
+
+    Yields:
+        tuple: @see _iter_cached_blocks(), the cache key is None and every block is fresh without the cache
+    """
+    tree = _parse_source(_normalize_indentation(cleaned_code))
+    index = _statement_index(tree) if tree is not None else None
+    blocks = _iter_blocks(cleaned_code, tree=tree)
+    if use_cache:
+        yield from _iter_cached_blocks(cleaned_code, blocks, DUPLICATE_CACHE, index=index)
+        return
+    for tokens, block, line_num in _iter_tokenized_blocks(cleaned_code, blocks, index=index):
+        yield tokens, _ngram_fingerprint(tokens) if _valid_tokens(tokens) else None, block, line_num, None, True
+
+def _cached_pair_scores(fingerprints: list, keys: list, fresh: set, candidates, cache, workers: int = None):
+    """
+    Score block pairs, reusing the memoized similarity of pairs seen before.
+
+    Args:
+        fingerprints (list): Fingerprint of every block
+        keys (list): Cache key of every block, @see _iter_cached_blocks()
+        fresh (set): Blocks that were not in the cache, their rows are scored in one go
+        candidates (iterable | None): (i, j) pairs to score, None for all pairs
+        cache (DuplicateCache): Cache to read from and fill
+        workers (int, optional): Processes scoring the pairs the cache misses, @see core.parallel_scoring.
+            Defaults to None (DUPS_WORKERS).
+
+    Yields:
+        tuple: (i, j, similarity)
+    """
+    memo = cache.pairs
+    if candidates is not None:
+        candidates = list(candidates)
+        pair_keys = [cache.pair_key(keys[i], keys[j]) for i, j in candidates]
+        sims = [memo.get(key) for key in pair_keys]
+
+        missing = [k for k, sim in enumerate(sims) if sim is None]
+        scored = _pair_similarities(fingerprints, [candidates[k] for k in missing], workers)
+        for k, sim in zip(missing, scored):
+            sims[k] = sim
+            memo.put(pair_keys[k], sim)
+
+        for (i, j), sim in zip(candidates, sims):
+            yield i, j, sim
+        return
+
+    fresh_rows = _row_similarity_arrays(fingerprints, sorted(fresh), workers)
+    next_fresh = next(fresh_rows, None)
+    for i in range(len(fingerprints)):
+        if next_fresh is not None and next_fresh[0] == i:
+            for j, sim in enumerate(next_fresh[1].tolist(), start=i + 1):
+                memo.put(cache.pair_key(keys[i], keys[j]), sim)
+                yield i, j, sim
+            next_fresh = next(fresh_rows, None)
+            continue
+        for j in range(i + 1, len(fingerprints)):
+            key = cache.pair_key(keys[i], keys[j])
+            sim = memo.get(key)
+            if sim is None:
+                sim = _fingerprint_similarity(fingerprints[i], fingerprints[j])
+                memo.put(key, sim)
+            yield i, j, sim
+
+def _find_jaccard_records(
+    source_code: str,
+    use_lsh: bool = None,
+    use_cache: bool = True,
+    use_join: bool = True,
+    workers: int = None,
+    use_simhash: bool = False,
+    threshold: float = None,
+) -> tuple:
+    """
+    Find duplicated code blocks in the source code by comparing the token n-grams of each block.
+
+    Note:
+        Nothing is copied per pair: the blocks go into one BlockTable and a duplicate record only
+        holds the ids of its two blocks, @see core.block_table.
 
     Args:
         source_code (str): Source code to analyze
+        use_lsh (bool, optional): Only score the pairs that collide in the MinHash/LSH index.
+            Defaults to None, which turns it on once there are LSH_MIN_BLOCKS blocks.
+        use_cache (bool, optional): Reuse the tokens, fingerprints and pair scores of blocks seen
+            by earlier calls, @see core.dup_cache. Defaults to True.
+        use_join (bool, optional): Without LSH, only score the pairs that pass the exact length /
+            prefix / positional filters, @see core.similarity_join. Same duplicates as scoring every
+            pair. Defaults to True.
+        workers (int, optional): Processes scoring the pairs, serial below DUPS_PARALLEL_MIN_PAIRS
+            pairs, @see core.parallel_scoring. Defaults to None (DUPS_WORKERS).
+        use_simhash (bool, optional): Without LSH, only score the pairs whose SimHashes are within
+            SIMHASH_RADIUS bits, @see core.simhash. Fast but approximate. Defaults to False.
+        threshold (float, optional): Lowest similarity reported. Defaults to None (DUPS_THRESHOLD).
 
     Returns:
-        list: List of dictionaries containing duplicate block pairs
+        tuple: (BlockTable of every compared block, list of {"block1": id, "block2": id,
+               "similarity", "threshold"} records)
     """
     duplicated_code_logger.info("[starting] _find_duplicated_code()")
+    threshold = DUPS_THRESHOLD if threshold is None else threshold
 
     cleaned_code = _remove_comments(source_code)
     duplicated_code_logger.debug("[removed comments] from source code")
 
-    if not cleaned_code.strip():
+    if not cleaned_code or cleaned_code.isspace():
         msg = "No valid code after removing comments"
         duplicated_code_logger.error("[error] " + msg)
-        return []
+        return BlockTable(cleaned_code), []
+
+    # block texts are sliced out of the normalized code, @see _iter_blocks()
+    table = BlockTable(_normalize_indentation(cleaned_code))
+
+    # blocks are split, tokenized and fingerprinted as a stream, only the fingerprints are kept
+    fingerprints, keys, fresh, simhashes = [], [], set(), []
+    block_count = 0
+    for tokens, fingerprint, block, line_num, key, is_fresh in _iter_fingerprinted_blocks(cleaned_code, use_cache):
+        block_count += 1
+        duplicated_code_logger.debug(f"[split] [Block starting at line {line_num}]\n{block}")
+        if fingerprint is None:
+            duplicated_code_logger.warning(f"Skipping block at line {line_num} due to tokenization failure")
+            continue
+        if is_fresh:
+            fresh.add(len(fingerprints))
+        fingerprints.append(fingerprint)
+        table.add(line_num, line_num + block.count("\n"), len(tokens))
+        keys.append(key)
+        if use_simhash:
+            simhashes.append(_simhash(tokens))
+
+    if block_count < 2:
+        msg = "Not enough code blocks to compare for duplication"
+        duplicated_code_logger.error("[error] " + msg)
+        return table, []
 
-    blocks = _split_into_blocks(cleaned_code)
-    formatted_blocks = "\n\n".join(
-        f"[Block starting at line {start}]\n{block}" for block, start in blocks
-    )
     duplicated_code_logger.debug(
-        f"[split] source code into {len(blocks)} blocks:\n{formatted_blocks}"
+        f"[info] tokenized {len(fingerprints)} of {block_count} blocks"
     )
+    if use_cache:
+        duplicated_code_logger.debug(f"[cache] {block_count - len(fresh)} of {block_count} block/s cached")
+
+    if use_lsh is None:
+        use_lsh = len(fingerprints) >= LSH_MIN_BLOCKS
+
+    candidates = None
+    if use_lsh:
+        candidates = _find_candidate_pairs(fingerprints, threshold)
+    elif use_simhash:
+        candidates = SimHashIndex(simhashes).pairs()
+        duplicated_code_logger.info(f"[simhash] {len(candidates)} candidate pair/s within {SIMHASH_RADIUS} bit/s")
+    elif use_join:
+        candidates, pruned = _similarity_join(fingerprints, threshold)
+        duplicated_code_logger.info(
+            f"[join] {pruned['candidates']} of {pruned['pairs']} pair/s left to score, pruned by "
+            f"length: {pruned['length']}, prefix: {pruned['prefix']}, position: {pruned['positional']}"
+        )
 
-    if len(blocks) < 2:
-        msg = "Not enough code blocks to compare for duplication"
-        duplicated_code_logger.error("[error] " + msg)
-        return []
+    if use_cache:
+        scored_pairs = _cached_pair_scores(fingerprints, keys, fresh, candidates, DUPLICATE_CACHE, workers)
+    elif candidates is not None:
+        candidates = list(candidates)
+        scored_pairs = (
+            (i, j, sim)
+            for (i, j), sim in zip(candidates, _pair_similarities(fingerprints, candidates, workers))
+        )
+    else:
+        scored_pairs = (
+            (i, j, sim)
+            for i, row in _row_similarity_arrays(fingerprints, range(len(fingerprints)), workers)
+            for j, sim in enumerate(row.tolist(), start=i + 1)
+        )
 
-    tokenized_blocks = []
-    for block, line_num in blocks:
-        tokens = _tokenize_block(block)
-        if tokens and tokens != ["INDENTATION_ERROR"] and tokens != ["TOKEN_ERROR"]:
-            tokenized_blocks.append((tokens, block, line_num))
-        else:
-            duplicated_code_logger.warning(f"Skipping block at line {line_num} due to tokenization failure")
+    records = []
+    for i, j, sim in scored_pairs:
+        duplicated_code_logger.debug(
+            f"[jaccard] comparing block {i} (line {table.lines[i]}) and block {j} (line {table.lines[j]}): similarity = {sim:.2f}"
+        )
 
-    duplicated_code_logger.debug(
-        f"[info] tokenized {len(tokenized_blocks)} of {len(blocks)} blocks"
+        if sim >= threshold:
+            duplicated_code_logger.info(
+                f"[found] duplicate between block {i} and block {j} with jacc_sim {sim:.2f}"
+            )
+            records.append({"block1": i, "block2": j, "similarity": sim, "threshold": threshold})
+
+    duplicated_code_logger.info(
+        f"[done], found {len(records)} duplicated block pair/s."
     )
+    return table, records
 
-    duplicates = []
-    for i in range(len(tokenized_blocks)):
-        for j in range(i + 1, len(tokenized_blocks)):
-            tokens_i, block_i, line_i = tokenized_blocks[i]
-            tokens_j, block_j, line_j = tokenized_blocks[j]
-            sim = _jaccard_similarity(tokens_i, tokens_j)
 
-            duplicated_code_logger.debug(
-                f"[jaccard] comparing block {i} (line {line_i}) and block {j} (line {line_j}): similarity = {sim:.2f}"
-            )
+def _find_tfidf_records(source_code: str, threshold: float = TFIDF_THRESHOLD, use_cache: bool = True) -> tuple:
+    """
+    Find duplicated code blocks by the TF-IDF weighted cosine of their token n-grams.
+
+    Note:
+        Boilerplate n-grams shared by most blocks barely count, so two blocks have to share the
+        rare parts to score high. All pairs are scored in one batch, @see core.tfidf.
+
+    Args:
+        source_code (str): Source code to analyze
+        threshold (float, optional): Lowest cosine reported. Defaults to TFIDF_THRESHOLD.
+        use_cache (bool, optional): Reuse the tokens of blocks seen by earlier calls. Defaults to True.
+
+    Returns:
+        tuple: (BlockTable, records), @see _find_jaccard_records()
+    """
+    duplicated_code_logger.info("[starting] _find_tfidf_records()")
+
+    cleaned_code = _remove_comments(source_code)
+    if not cleaned_code or cleaned_code.isspace():
+        duplicated_code_logger.error("[error] No valid code after removing comments")
+        return BlockTable(cleaned_code), []
+
+    table = BlockTable(_normalize_indentation(cleaned_code))
+    ngram_hashes = []
+    for tokens, fingerprint, block, line_num, _, _ in _iter_fingerprinted_blocks(cleaned_code, use_cache):
+        if fingerprint is None:
+            duplicated_code_logger.warning(f"Skipping block at line {line_num} due to tokenization failure")
+            continue
+        ngram_hashes.append(_ngram_hashes(tokens))
+        table.add(line_num, line_num + block.count("\n"), len(tokens))
+
+    records = [
+        {"block1": i, "block2": j, "similarity": sim, "threshold": threshold}
+        for i, j, sim in _cosine_pairs(ngram_hashes, threshold)
+    ]
+    duplicated_code_logger.info(f"[done], found {len(records)} duplicated block pair/s.")
+    return table, records
+
+
+def _hierarchical_search(
+    source_code: str,
+    threshold: float = None,
+    bound: float = HIER_FUNCTION_BOUND,
+    use_cache: bool = True,
+    workers: int = None,
+) -> tuple:
+    """
+    Find duplicated code blocks, comparing blocks only inside similar function pairs.
 
-            if sim >= DUPS_THRESHOLD:
-                duplicated_code_logger.info(
-                    f"[found] duplicate between block {i} and block {j} with jacc_sim {sim:.2f}"
-                )
-                duplicates.append(
-                    {
-                        "block1": {
-                            "index": i,
-                            "text": block_i,
-                            "type": "code",
-                            "tokens": list(tokens_i),
-                            "line_number": line_i,
-                        },
-                        "block2": {
-                            "index": j,
-                            "text": block_j,
-                            "type": "code",
-                            "tokens": list(tokens_j),
-                            "line_number": line_j,
-                        },
-                        "similarity": sim,
-                        "threshold": DUPS_THRESHOLD,
-                    }
-                )
+    Note:
+        One tokenization: the block fingerprints are scored and also make up the function
+        signatures, @see core.hierarchical.
 
+    Args:
+        source_code (str): Source code to analyze
+        threshold (float, optional): Lowest block similarity reported. Defaults to None (DUPS_THRESHOLD).
+        bound (float, optional): Lowest function signature similarity whose blocks are compared.
+            Defaults to HIER_FUNCTION_BOUND.
+        use_cache (bool, optional): Reuse the tokens of blocks seen by earlier calls. Defaults to True.
+        workers (int, optional): @see _find_jaccard_records(). Defaults to None (DUPS_WORKERS).
+
+    Returns:
+        tuple: (BlockTable, records, stats), @see _find_jaccard_records(), @see _hierarchical_pairs()
+    """
+    duplicated_code_logger.info("[starting] _hierarchical_search()")
+    threshold = DUPS_THRESHOLD if threshold is None else threshold
+
+    cleaned_code = _remove_comments(source_code)
+    if not cleaned_code or cleaned_code.isspace():
+        duplicated_code_logger.error("[error] No valid code after removing comments")
+        return BlockTable(cleaned_code), [], {}
+
+    table = BlockTable(_normalize_indentation(cleaned_code))
+    fingerprints = []
+    for tokens, fingerprint, block, line_num, _, _ in _iter_fingerprinted_blocks(cleaned_code, use_cache):
+        if fingerprint is None:
+            duplicated_code_logger.warning(f"Skipping block at line {line_num} due to tokenization failure")
+            continue
+        fingerprints.append(fingerprint)
+        table.add(line_num, line_num + block.count("\n"), len(tokens))
+
+    if len(fingerprints) < 2:
+        return table, [], {}
+
+    groups = _group_blocks(table.lines, _function_spans(table.source))
+    allowed, stats = _similar_groups(fingerprints, groups, bound)
+
+    # when the functions hardly prune anything, the exact join filters are cheaper than listing pairs
+    if stats["compared"] * HIER_JOIN_RATIO >= stats["block_pairs"]:
+        candidates, _ = _similarity_join(fingerprints, threshold)
+        candidates = _allowed_pairs(allowed, groups, list(candidates))
+    else:
+        candidates = _hierarchical_pairs(allowed, groups)
+    scored_pairs = (
+        (i, j, sim) for (i, j), sim in zip(candidates, _pair_similarities(fingerprints, candidates, workers))
+    )
+
+    records = [
+        {"block1": i, "block2": j, "similarity": sim, "threshold": threshold}
+        for i, j, sim in scored_pairs
+        if sim >= threshold
+    ]
     duplicated_code_logger.info(
-        f"[done], found {len(duplicates)} duplicated block pair/s."
+        f"[done], found {len(records)} duplicated block pair/s, skipped {stats['skipped']} of "
+        f"{stats['block_pairs']} block comparison/s."
     )
+    return table, records, stats
+
+
+def _find_hierarchical_records(source_code: str, **options) -> tuple:
+    """
+    Find duplicated code blocks, comparing blocks only inside similar function pairs.
+
+    Args:
+        source_code (str): Source code to analyze
+        **options: Passed on, @see _hierarchical_search()
+
+    Returns:
+        tuple: (BlockTable, records), @see _find_jaccard_records()
+    """
+    table, records, _ = _hierarchical_search(source_code, **options)
+    return table, records
+
+
+def _describe_records(table: BlockTable, records: list, with_tokens: bool = True, use_cache: bool = True) -> list:
+    """
+    Turn records into full duplicate dicts, the text of a block is sliced out once however many
+    pairs it is in.
+
+    Args:
+        table (BlockTable): Blocks the records point into
+        records (list): @see _find_jaccard_records()
+        with_tokens (bool, optional): Attach the token list of every block (debug output, the
+            tokens are recomputed or read from the cache). Defaults to True.
+        use_cache (bool, optional): Look the tokens up in DUPLICATE_CACHE first. Defaults to True.
+
+    Returns:
+        list: List of dictionaries containing duplicate block pairs
+    """
+    described = {}
+
+    def describe(n: int) -> dict:
+        if n not in described:
+            text = table.text(n)
+            block = {"index": n, "text": text, "type": "code"}
+            if with_tokens:
+                entry = DUPLICATE_CACHE.blocks.peek(DUPLICATE_CACHE.block_key(text)) if use_cache else None
+                block["tokens"] = list(entry[0]) if entry is not None else _tokenize_block(text)
+            described[n] = {**block, **table.span(n)}
+        return dict(described[n])
+
+    return [
+        {**record, "block1": describe(record["block1"]), "block2": describe(record["block2"])}
+        for record in records
+    ]
+
+
+def _find_jaccard_duplicates(source_code: str, with_tokens: bool = True, **options) -> list:
+    """
+    Find duplicated code blocks in the source code by comparing the token n-grams of each block.
+
+    Args:
+        source_code (str): Source code to analyze
+        with_tokens (bool, optional): Attach the token list of every block. Defaults to True.
+        **options: Passed on, @see _find_jaccard_records()
+
+    Returns:
+        list: List of dictionaries containing duplicate block pairs, @see _describe_records()
+    """
+    table, records = _find_jaccard_records(source_code, **options)
+    duplicates = _describe_records(table, records, with_tokens, options.get("use_cache", True))
     duplicated_code_logger.info(f"[info]\n {json.dumps(duplicates, indent=4)}\n")
 
     return duplicates
+
+
+def _find_hierarchical_duplicates(source_code: str, with_tokens: bool = True, **options) -> list:
+    """
+    Find duplicated code blocks, comparing blocks only inside similar function pairs.
+
+    Args:
+        source_code (str): Source code to analyze
+        with_tokens (bool, optional): Attach the token list of every block. Defaults to True.
+        **options: Passed on, @see _hierarchical_search()
+
+    Returns:
+        list: List of dictionaries containing duplicate block pairs, @see _describe_records()
+    """
+    table, records = _find_hierarchical_records(source_code, **options)
+    return _describe_records(table, records, with_tokens, options.get("use_cache", True))
+
+
+def _find_tfidf_duplicates(source_code: str, with_tokens: bool = True, **options) -> list:
+    """
+    Find duplicated code blocks by the TF-IDF weighted cosine of their token n-grams.
+
+    Args:
+        source_code (str): Source code to analyze
+        with_tokens (bool, optional): Attach the token list of every block. Defaults to True.
+        **options: Passed on, @see _find_tfidf_records()
+
+    Returns:
+        list: List of dictionaries containing duplicate block pairs, @see _describe_records()
+    """
+    table, records = _find_tfidf_records(source_code, **options)
+    return _describe_records(table, records, with_tokens, options.get("use_cache", True))
+
+
+DUPLICATE_ENGINES = {
+    "jaccard": _find_jaccard_duplicates,
+    "suffix": _find_suffix_clones,
+    "ast": _find_ast_clones,
+    "winnow": _find_winnow_clones,
+    "tfidf": _find_tfidf_duplicates,
+    "hierarchical": _find_hierarchical_duplicates,
+}
+
+# engines that build records into a BlockTable themselves, @see _find_duplicate_records()
+RECORD_ENGINES = {
+    "jaccard": _find_jaccard_records,
+    "tfidf": _find_tfidf_records,
+    "hierarchical": _find_hierarchical_records,
+}
+
+
+def _find_duplicated_code(source_code: str, engine: str = DUPS_ENGINE, **options) -> list:
+    """
+    Find duplicated code in the source code with the selected engine.
+
+    Args:
+        source_code (str): Source code to analyze
+        engine (str, optional): Key of DUPLICATE_ENGINES. Defaults to DUPS_ENGINE.
+        **options: Passed through to the engine (e.g. use_lsh, min_tokens)
+
+    Raises:
+        ValueError: if the engine is unknown
+
+    Returns:
+        list: List of dictionaries containing duplicate block pairs
+    """
+    if engine not in DUPLICATE_ENGINES:
+        raise ValueError(f"Unknown duplicate engine: {engine} (expected one of {list(DUPLICATE_ENGINES)})")
+
+    return DUPLICATE_ENGINES[engine](source_code, **options)
+
+
+def _records_from_pairs(source_code: str, duplicates: list) -> tuple:
+    """
+    Move the blocks of full duplicate dicts into a BlockTable, for engines that build the dicts.
+
+    Args:
+        source_code (str): Source code the line numbers refer to
+        duplicates (list): Duplicate pairs, @see _find_duplicated_code()
+
+    Returns:
+        tuple: (BlockTable, records), @see _find_jaccard_records()
+    """
+    table, ids = BlockTable(source_code), {}
+
+    def block_id(block: dict) -> int:
+        span = (block["line_number"], block.get("end_line", block["line_number"] + block["text"].count("\n")))
+        if span not in ids:
+            ids[span] = table.add(*span, len(block.get("tokens", ())))
+        return ids[span]
+
+    records = [
+        {**dup, "block1": block_id(dup["block1"]), "block2": block_id(dup["block2"])}
+        for dup in duplicates
+    ]
+    return table, records
+
+
+def _find_duplicate_records(source_code: str, engine: str = DUPS_ENGINE, **options) -> tuple:
+    """
+    Find duplicated code, as one block table plus records that point into it.
+
+    Note:
+        For reports: a block is stored once however many pairs it is in, its text is sliced
+        out of the source only when asked for, and no token lists are kept.
+
+    Args:
+        source_code (str): Source code to analyze
+        engine (str, optional): Key of DUPLICATE_ENGINES. Defaults to DUPS_ENGINE.
+        **options: Passed through to the engine
+
+    Raises:
+        ValueError: if the engine is unknown
+
+    Returns:
+        tuple: (BlockTable, list of {"block1": id, "block2": id, "similarity", "threshold", ...})
+    """
+    if engine in RECORD_ENGINES:
+        return RECORD_ENGINES[engine](source_code, **options)
+    return _records_from_pairs(source_code, _find_duplicated_code(source_code, engine, **options))
+
+
+def _iter_streamed_pairs(cleaned_code: str, table: BlockTable, threshold: float, use_cache: bool = True):
+    """
+    Score every block against the blocks before it as soon as it is tokenized.
+
+    Args:
+        cleaned_code (str): Source code without comments
+        table (BlockTable): Empty table, filled with the blocks as they are read
+        threshold (float): Lowest similarity yielded
+        use_cache (bool, optional): @see _iter_fingerprinted_blocks(). Defaults to True.
+
+    Yields:
+        tuple: (i, j, similarity) with i < j, ordered by j
+    """
+    stack = FingerprintStack()
+    for tokens, fingerprint, block, line_num, _, _ in _iter_fingerprinted_blocks(cleaned_code, use_cache):
+        if fingerprint is None:
+            continue
+        j = table.add(line_num, line_num + block.count("\n"), len(tokens))
+        matches = stack.matches(fingerprint, threshold)
+        stack.append(fingerprint)
+        for i, sim in matches:
+            yield i, j, sim
+
+
+def _iter_ranked_pairs(cleaned_code: str, table: BlockTable, threshold: float, use_cache: bool = True):
+    """
+    Score the SimHash candidate pairs, closest SimHashes first.
+
+    Args:
+        cleaned_code (str): Source code without comments
+        table (BlockTable): Empty table, filled with every block first
+        threshold (float): Lowest similarity yielded
+        use_cache (bool, optional): @see _iter_fingerprinted_blocks(). Defaults to True.
+
+    Yields:
+        tuple: (i, j, similarity) with i < j, likeliest duplicates first
+    """
+    fingerprints, simhashes = [], []
+    for tokens, fingerprint, block, line_num, _, _ in _iter_fingerprinted_blocks(cleaned_code, use_cache):
+        if fingerprint is None:
+            continue
+        table.add(line_num, line_num + block.count("\n"), len(tokens))
+        fingerprints.append(fingerprint)
+        simhashes.append(_simhash(tokens))
+
+    for i, j in SimHashIndex(simhashes).ranked_pairs():
+        sim = _fingerprint_similarity(fingerprints[i], fingerprints[j])
+        if sim >= threshold:
+            yield i, j, sim
+
+
+def iter_duplicates(
+    source_code: str,
+    threshold: float = None,
+    limit: int = None,
+    use_simhash: bool = False,
+    use_cache: bool = True,
+):
+    """
+    Yield duplicate block pairs as they are found, no work is done past what the caller takes.
+
+    Note:
+        Without an index a block is scored against the blocks before it right after it is
+        tokenized, so "is there any duplicate?" stops at the second copy of the first one.
+        With use_simhash every block is read first and the candidates come closest SimHash
+        first, approximate like the use_simhash filter of _find_jaccard_records().
+        Every pair is scored (no join filters), to collect all of them _find_duplicated_code()
+        is faster.
+
+    Args:
+        source_code (str): Source code to analyze
+        threshold (float, optional): Lowest Jaccard similarity yielded. Defaults to None (DUPS_THRESHOLD).
+        limit (int, optional): Most pairs yielded. Defaults to None (all of them).
+        use_simhash (bool, optional): Rank the pairs with a SimHash index. Defaults to False.
+        use_cache (bool, optional): @see _iter_fingerprinted_blocks(). Defaults to True.
+
+    Yields:
+        dict: {"block1", "block2", "similarity", "threshold"}, blocks as in _find_duplicated_code()
+              without the tokens
+    """
+    threshold = DUPS_THRESHOLD if threshold is None else threshold
+    cleaned_code = _remove_comments(source_code)
+    if (limit is not None and limit <= 0) or not cleaned_code or cleaned_code.isspace():
+        return
+
+    table = BlockTable(_normalize_indentation(cleaned_code))
+    pairs = _iter_ranked_pairs if use_simhash else _iter_streamed_pairs
+
+    def describe(n: int) -> dict:
+        return {"index": n, "text": table.text(n), "type": "code", **table.span(n)}
+
+    found = 0
+    for i, j, sim in pairs(cleaned_code, table, threshold, use_cache):
+        yield {"block1": describe(i), "block2": describe(j), "similarity": sim, "threshold": threshold}
+        found += 1
+        if limit is not None and found >= limit:
+            duplicated_code_logger.info(f"[iter] stopped at the limit of {limit} pair/s, {len(table)} block/s read")
+            return
@@ -0,0 +1,260 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: fingerprint.py
+#
+# __brief__: Per-block n-gram fingerprints. Tokens are interned to small ints and every n-gram is
+#            hashed into one uint64 with a rolling (Horner) hash, so a block's n-grams become one
+#            sorted NumPy array that is built once and compared many times.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+# ==========
+fingerprint_logger = setup_logger(
+    name="fingerprint.py_logger", log_file="fingerprint.log"
+)
+# ==========
+
+fingerprint_logger.info("fingerprint_logger")
+
+# normalized token -> small int, shared by every block of the process so fingerprints stay comparable
+_TOKEN_IDS = {}
+
+# odd 64 bit multiplier of the rolling hash, arithmetic wraps mod 2^64, @see winnowing._HASH_BASE
+_HASH_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _intern_tokens(tokens: list) -> np.ndarray:
+    """_summary_
+
+    Args:
+        tokens (list): normalized tokens, @see _tokenize_block()
+
+    Returns:
+        np.ndarray: token ids (uint64)
+    """
+    ids = _TOKEN_IDS
+    return np.fromiter(
+        (ids.setdefault(tok, len(ids)) for tok in tokens), dtype=np.uint64, count=len(tokens)
+    )
+
+
+def _ngram_hashes(tokens: list, n: int = 3) -> np.ndarray:
+    """_summary_
+
+    Note:
+        Every n-gram hashes to (id_0 + 1) * M^(n-1) + ... + (id_(n-1) + 1) mod 2^64, M a large odd
+        constant. Unigrams are exact, longer n-grams collide with probability ~2^-64 per pair
+        whatever the size of the vocabulary.
+
+    Args:
+        tokens (list): normalized tokens
+        n (int, optional): size of the n-grams. Defaults to 3.
+
+    Raises:
+        ValueError: if n is less than 1
+
+    Returns:
+        np.ndarray: hash of every n-gram (uint64) in block order, repeats included
+    """
+    if n < 1:
+        raise ValueError(f"n-gram size must be at least 1, got {n}")
+
+    ids = _intern_tokens(tokens)
+    count = len(ids) - n + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+
+    values = ids + np.uint64(1)
+    hashes = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for k in range(n):
+            hashes = hashes * _HASH_BASE + values[k : k + count]
+    return hashes
+
+
+def _ngram_fingerprint(tokens: list, n: int = 3) -> np.ndarray:
+    """_summary_
+
+    Args:
+        tokens (list): normalized tokens
+        n (int, optional): size of the n-grams. Defaults to 3.
+
+    Returns:
+        np.ndarray: sorted, unique n-gram hashes (uint64), the same set _generate_ngrams() builds,
+                    @see _ngram_hashes()
+    """
+    return np.unique(_ngram_hashes(tokens, n))
+
+
+def _fingerprint_similarity(fingerprint1: np.ndarray, fingerprint2: np.ndarray) -> float:
+    """_summary_
+
+    Args:
+        fingerprint1 (np.ndarray): @see _ngram_fingerprint()
+        fingerprint2 (np.ndarray): @see _ngram_fingerprint()
+
+    Returns:
+        float: Jaccard similarity of the two n-gram sets, 0.0 if both are empty
+    """
+    common = np.intersect1d(fingerprint1, fingerprint2, assume_unique=True).size
+    union = fingerprint1.size + fingerprint2.size - common
+    return common / union if union else 0.0
+
+
+def _stack_fingerprints(fingerprints: list) -> tuple:
+    """_summary_
+
+    Args:
+        fingerprints (list): fingerprint of every block, @see _ngram_fingerprint()
+
+    Returns:
+        tuple: (all hashes back to back, owning block of every hash, size of every fingerprint,
+                offset of every fingerprint), @see _row_similarities()
+    """
+    sizes = np.fromiter((fp.size for fp in fingerprints), dtype=np.int64, count=len(fingerprints))
+    values = np.concatenate(fingerprints) if fingerprints else np.empty(0, dtype=np.uint64)
+    owners = np.repeat(np.arange(len(fingerprints)), sizes)
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    return values, owners, sizes, offsets
+
+
+def _row_similarity_array(stacked: tuple, i: int) -> np.ndarray:
+    """_summary_
+
+    Note:
+        Scores block i against every later block in one go. Per pair NumPy calls cost more than
+        the intersection itself on blocks this small, so the whole row is done with one
+        searchsorted() + bincount() over the stacked hashes instead.
+
+    Args:
+        stacked (tuple): @see _stack_fingerprints()
+        i (int): index of the block
+
+    Returns:
+        np.ndarray: Jaccard similarity of block i with blocks i + 1, i + 2, ... (float64, same
+                    values as _fingerprint_similarity())
+    """
+    values, owners, sizes, offsets = stacked
+    width = sizes.size - i - 1
+    if width <= 0:
+        return np.zeros(0)
+
+    fingerprint = values[offsets[i] : offsets[i + 1]]
+    rest = values[offsets[i + 1] :]
+    common = np.zeros(width, dtype=np.int64)
+    if fingerprint.size and rest.size:
+        pos = np.searchsorted(fingerprint, rest)
+        pos[pos == fingerprint.size] = 0
+        hits = fingerprint[pos] == rest
+        common = np.bincount(owners[offsets[i + 1] :][hits] - (i + 1), minlength=width)
+
+    union = sizes[i] + sizes[i + 1 :] - common
+    return np.divide(common, union, out=np.zeros(width), where=union > 0)
+
+
+def _row_similarities(stacked: tuple, i: int) -> list:
+    """_summary_
+
+    Args:
+        stacked (tuple): @see _stack_fingerprints()
+        i (int): index of the block
+
+    Returns:
+        list: @see _row_similarity_array(), as floats
+    """
+    return _row_similarity_array(stacked, i).tolist()
+
+
+class FingerprintStack:
+    """_summary_
+
+    Note:
+        Fingerprints are appended one at a time and a new one is scored against everything
+        stacked before it, the streaming counterpart of _stack_fingerprints(). The buffers
+        double when full, so appending n blocks copies O(n) hashes overall.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """_summary_
+
+        Args:
+            capacity (int, optional): hashes the buffers start with. Defaults to 1024.
+        """
+        self.values = np.empty(capacity, dtype=np.uint64)
+        self.owners = np.empty(capacity, dtype=np.int64)
+        self.sizes = np.empty(max(1, capacity // 16), dtype=np.int64)
+        self.length = 0
+        self.count = 0
+
+    def append(self, fingerprint: np.ndarray) -> int:
+        """_summary_
+
+        Args:
+            fingerprint (np.ndarray): @see _ngram_fingerprint()
+
+        Returns:
+            int: position of the fingerprint in the stack
+        """
+        end = self.length + fingerprint.size
+        if end > self.values.size:
+            capacity = max(end, 2 * self.values.size)
+            self.values = np.resize(self.values, capacity)
+            self.owners = np.resize(self.owners, capacity)
+        if self.count == self.sizes.size:
+            self.sizes = np.resize(self.sizes, 2 * self.sizes.size)
+
+        self.values[self.length : end] = fingerprint
+        self.owners[self.length : end] = self.count
+        self.sizes[self.count] = fingerprint.size
+        self.length = end
+        self.count += 1
+        return self.count - 1
+
+    def similarities(self, fingerprint: np.ndarray) -> np.ndarray:
+        """_summary_
+
+        Args:
+            fingerprint (np.ndarray): @see _ngram_fingerprint()
+
+        Returns:
+            np.ndarray: Jaccard similarity with every stacked fingerprint, in stack order (same
+                        values as _fingerprint_similarity())
+        """
+        common = np.zeros(self.count, dtype=np.int64)
+        values = self.values[: self.length]
+        if fingerprint.size and values.size:
+            pos = np.searchsorted(fingerprint, values)
+            pos[pos == fingerprint.size] = 0
+            hits = fingerprint[pos] == values
+            common = np.bincount(self.owners[: self.length][hits], minlength=self.count)
+
+        union = fingerprint.size + self.sizes[: self.count] - common
+        return np.divide(common, union, out=np.zeros(self.count), where=union > 0)
+
+    def matches(self, fingerprint: np.ndarray, threshold: float) -> list:
+        """_summary_
+
+        Args:
+            fingerprint (np.ndarray): @see _ngram_fingerprint()
+            threshold (float): lowest similarity kept
+
+        Returns:
+            list: (position, similarity) of every stacked fingerprint at or above the threshold
+        """
+        sims = self.similarities(fingerprint)
+        hits = np.flatnonzero(sims >= threshold)
+        return list(zip(hits.tolist(), sims[hits].tolist()))
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,165 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: function_metrics.py
+#
+# __brief__: Every function level smell and metric from one walk over the AST. The visitor keeps a
+#            stack of the functions it is inside of, length comes from lineno / end_lineno, the
+#            parameter count from ast.arguments and every decision point is charged to the innermost
+#            open function only, so nested and async functions are measured on their own.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import ast
+from typing import List
+
+from core.constants import LENGTH_THRESHOLD, PARAMS_THRESHOLD
+from utils.logger import setup_logger
+
+# ==========
+function_metrics_logger = setup_logger(name="function_metrics.py_logger", log_file="function_metrics.log")
+# ==========
+
+function_metrics_logger.info("function_metrics_logger")
+
+# statements that add a path through a function, @see trend_analysis._calculate_cyclomatic_complexity()
+# (ast.TryStar only exists on 3.11+, on 3.10 it falls back to ast.Try again)
+DECISIONS = (
+    ast.If,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.Try,
+    getattr(ast, "TryStar", ast.Try),
+    ast.With,
+    ast.AsyncWith,
+)
+
+
+class FunctionMetricsVisitor(ast.NodeVisitor):
+    """_summary_
+
+    Note:
+        One {"function", "qualname", "start_line", "end_line", "length", "params_count",
+        "complexity", "is_async"} dict per def, in the order they appear. Decorators, defaults
+        and annotations are evaluated outside the function, their decisions count for the
+        enclosing one.
+    """
+
+    def __init__(self):
+        self.functions = []
+        self._open = []
+        self._scope = []
+
+    def _visit_function(self, node) -> None:
+        for outside in node.decorator_list + node.args.defaults + node.args.kw_defaults:
+            if outside is not None:
+                self.visit(outside)
+
+        args = node.args
+        params = args.posonlyargs + args.args + args.kwonlyargs + [a for a in (args.vararg, args.kwarg) if a]
+        record = {
+            "function": node.name,
+            "qualname": ".".join(self._scope + [node.name]),
+            "start_line": node.lineno,
+            "end_line": node.end_lineno,
+            "length": node.end_lineno - node.lineno + 1,
+            "params_count": len(params),
+            "complexity": 1,
+            "is_async": isinstance(node, ast.AsyncFunctionDef),
+        }
+        self.functions.append(record)
+
+        self._open.append(record)
+        self._scope.append(node.name)
+        for statement in node.body:
+            self.visit(statement)
+        self._scope.pop()
+        self._open.pop()
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        for outside in node.decorator_list + node.bases + [k.value for k in node.keywords]:
+            self.visit(outside)
+        self._scope.append(node.name)
+        for statement in node.body:
+            self.visit(statement)
+        self._scope.pop()
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        if self._open:
+            self._open[-1]["complexity"] += len(node.values) - 1
+        self.generic_visit(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if self._open and isinstance(node, DECISIONS):
+            self._open[-1]["complexity"] += 1
+        super().generic_visit(node)
+
+
+def _function_metrics(tree: ast.AST) -> List[dict]:
+    """_summary_
+
+    Args:
+        tree (ast.AST): parsed file, @see ParsedSource.tree
+
+    Returns:
+        List[dict]: metrics of every function and method, @see FunctionMetricsVisitor
+    """
+    visitor = FunctionMetricsVisitor()
+    visitor.visit(tree)
+    function_metrics_logger.info(f"[visit] {len(visitor.functions)} function/s")
+    return visitor.functions
+
+
+def _long_methods(functions: List[dict], threshold: int = LENGTH_THRESHOLD) -> List[dict]:
+    """_summary_
+
+    Args:
+        functions (List[dict]): @see _function_metrics()
+        threshold (int, optional): longest allowed function. Defaults to LENGTH_THRESHOLD.
+
+    Returns:
+        List[dict]: same entries as _find_long_method()
+    """
+    return [
+        {
+            "function": f["function"],
+            "start_line": f["start_line"],
+            "end_line": f["end_line"],
+            "length": f["length"],
+            "threshold": threshold,
+        }
+        for f in functions
+        if f["length"] > threshold
+    ]
+
+
+def _long_parameter_lists(functions: List[dict], threshold: int = PARAMS_THRESHOLD) -> List[dict]:
+    """_summary_
+
+    Args:
+        functions (List[dict]): @see _function_metrics()
+        threshold (int, optional): most parameters allowed. Defaults to PARAMS_THRESHOLD.
+
+    Returns:
+        List[dict]: same entries as _find_long_parameter_list(), "position" is the line of the def
+    """
+    return [
+        {
+            "function": f["function"],
+            "position": f["start_line"],
+            "params_count": f["params_count"],
+            "threshold": threshold,
+        }
+        for f in functions
+        if f["params_count"] > threshold
+    ]
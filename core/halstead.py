@@ -21,6 +21,7 @@ from core.constants import ALLOWED_OPERATORS
 from utils.exceptions import CodeProcessingError
 from utils.logger import setup_logger
 from utils.utility import _read_file_contents
+from core.parsed_source import ParsedSource
 
 # ==========
 halstead_metrics_logger = setup_logger(
@@ -201,7 +202,7 @@ def _calculate_halstead_metrics(info_dict: dict) -> dict:
     return halstead_metrics
 
 
-def fetch_halstead_metrics(file_name: str) -> dict:
+def fetch_halstead_metrics(file_name: str, source: ParsedSource = None) -> dict:
     """_summary_
 
     Note:
@@ -209,11 +210,12 @@ def fetch_halstead_metrics(file_name: str) -> dict:
 
     Args:
         file_name (str): _description_
+        source (ParsedSource, optional): the file, already read. Defaults to None (read it here).
 
     Returns:
         _type_: @see _calculate_halstead_metrics()
     """
-    raw_code = _read_file_contents(file_name)
+    raw_code = source.text if source is not None else _read_file_contents(file_name)
     lines = _extract_operators_and_operands(raw_code)
     halstead_metrics = _calculate_halstead_metrics(lines)
 
@@ -0,0 +1,168 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: hierarchical.py
+#
+# __brief__: Two-level duplicate search. Blocks are grouped by the function they are in, every
+#            function gets a coarse signature (the union of its blocks' n-grams), and blocks are only
+#            compared inside function pairs whose signatures clear a lower bound. The block
+#            fingerprints are reused for the signatures, nothing is tokenized twice.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import ast
+from typing import List, Set, Tuple
+
+import numpy as np
+
+from core.constants import HIER_FUNCTION_BOUND
+from core.fingerprint import _fingerprint_similarity
+from core.similarity_join import _similarity_join
+from utils.logger import setup_logger
+
+# ==========
+hierarchical_logger = setup_logger(name="hierarchical.py_logger", log_file="hierarchical.log")
+# ==========
+
+hierarchical_logger.info("hierarchical_logger")
+
+
+def _function_spans(source_code: str) -> List[Tuple[str, int, int]]:
+    """_summary_
+
+    Args:
+        source_code (str): code the block line numbers refer to
+
+    Returns:
+        List[Tuple[str, int, int]]: (name, first line, last line) of every function and method,
+                                    empty if the code doesn't parse
+    """
+    try:
+        tree = ast.parse(source_code)
+    except SyntaxError:
+        hierarchical_logger.warning("[functions] code doesn't parse, every block is module level")
+        return []
+    return [
+        (node.name, node.lineno, node.end_lineno)
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+
+
+def _group_blocks(lines: List[int], spans: List[Tuple[str, int, int]]) -> np.ndarray:
+    """_summary_
+
+    Args:
+        lines (List[int]): first line of every block
+        spans (List[Tuple[str, int, int]]): @see _function_spans()
+
+    Returns:
+        np.ndarray: group of every block, the innermost function its first line is in, or
+                    len(spans) for module level code
+    """
+    groups = np.full(len(lines), len(spans), dtype=np.int64)
+    size = np.full(len(lines), np.iinfo(np.int64).max)
+    lines = np.asarray(lines, dtype=np.int64)
+    for g, (_, first, last) in enumerate(spans):
+        inside = (lines >= first) & (lines <= last) & (last - first < size)
+        groups[inside], size[inside] = g, last - first
+    return groups
+
+
+def _similar_groups(
+    fingerprints: List[np.ndarray], groups: np.ndarray, bound: float = HIER_FUNCTION_BOUND
+) -> Tuple[Set[Tuple[int, int]], dict]:
+    """_summary_
+
+    Note:
+        Blocks of the same group are always compared with each other, a bound of 0 compares
+        every pair. The bound is a heuristic: two similar blocks in otherwise unrelated
+        functions are not looked at. Only the group pairs over the bound are kept, nothing
+        is sized groups x groups.
+
+    Args:
+        fingerprints (List[np.ndarray]): fingerprint of every block, @see _ngram_fingerprint()
+        groups (np.ndarray): group of every block, @see _group_blocks()
+        bound (float, optional): lowest signature similarity of two functions whose blocks are
+                                 compared. Defaults to HIER_FUNCTION_BOUND.
+
+    Returns:
+        Tuple[Set[Tuple[int, int]], dict]: (allowed, the (f, g) group pairs with f < g whose blocks
+                                           are compared, counts of the search with the "skipped"
+                                           block comparisons)
+    """
+    counts = np.bincount(groups) if len(groups) else np.zeros(0, dtype=np.int64)
+    group_ids = np.flatnonzero(counts).tolist()
+    signatures = [np.unique(np.concatenate([fingerprints[i] for i in np.flatnonzero(groups == g)])) for g in group_ids]
+
+    if bound > 0:
+        candidates, _ = _similarity_join(signatures, bound)
+        scored = [(x, y) for x, y in candidates if _fingerprint_similarity(signatures[x], signatures[y]) >= bound]
+    else:
+        scored = [(x, y) for x in range(len(group_ids)) for y in range(x + 1, len(group_ids))]
+
+    allowed = {(min(group_ids[x], group_ids[y]), max(group_ids[x], group_ids[y])) for x, y in scored}
+
+    total = len(fingerprints) * (len(fingerprints) - 1) // 2
+    compared = sum(int(counts[f]) * int(counts[g]) for f, g in allowed) + int((counts * (counts - 1) // 2).sum())
+    stats = {
+        "groups": len(group_ids),
+        "group_pairs": len(group_ids) * (len(group_ids) - 1) // 2,
+        "group_candidates": len(scored),
+        "block_pairs": total,
+        "compared": compared,
+        "skipped": total - compared,
+    }
+    hierarchical_logger.info(
+        f"[groups] {stats['group_candidates']} of {stats['group_pairs']} function pair/s over the bound {bound}, "
+        f"{compared} of {total} block comparison/s left, {stats['skipped']} skipped"
+    )
+    return allowed, stats
+
+
+def _allowed_pairs(
+    allowed: Set[Tuple[int, int]], groups: np.ndarray, pairs: List[Tuple[int, int]]
+) -> List[Tuple[int, int]]:
+    """_summary_
+
+    Args:
+        allowed (Set[Tuple[int, int]]): @see _similar_groups()
+        groups (np.ndarray): group of every block
+        pairs (List[Tuple[int, int]]): (i, j) block pairs
+
+    Returns:
+        List[Tuple[int, int]]: the pairs whose blocks are in the same group or in groups that are compared
+    """
+    groups = groups.tolist()
+    kept = []
+    for i, j in pairs:
+        f, g = groups[i], groups[j]
+        if f == g or (min(f, g), max(f, g)) in allowed:
+            kept.append((i, j))
+    return kept
+
+
+def _hierarchical_pairs(allowed: Set[Tuple[int, int]], groups: np.ndarray) -> List[Tuple[int, int]]:
+    """_summary_
+
+    Args:
+        allowed (Set[Tuple[int, int]]): @see _similar_groups()
+        groups (np.ndarray): group of every block
+
+    Returns:
+        List[Tuple[int, int]]: sorted (i, j) block pairs to score
+    """
+    members = {}
+    for i, g in enumerate(groups.tolist()):
+        members.setdefault(g, []).append(i)
+
+    pairs = [(i, j) for blocks in members.values() for n, i in enumerate(blocks) for j in blocks[n + 1 :]]
+    pairs.extend((min(i, j), max(i, j)) for f, g in allowed for i in members[f] for j in members[g])
+    pairs.sort()
+    return pairs
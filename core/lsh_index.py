@@ -0,0 +1,202 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: lsh_index.py
+#
+# __brief__: MinHash signatures + banded LSH, used as a candidate stage in front of the
+#            exact Jaccard check so we don't have to compare every block with every other block.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import zlib
+from collections import defaultdict
+from typing import List, Tuple
+
+import numpy as np
+
+from core.constants import DUPS_THRESHOLD, LSH_NUM_PERM, LSH_TARGET_RECALL, LSH_SEED
+from utils.logger import setup_logger
+
+# ==========
+lsh_logger = setup_logger(name="lsh_index.py_logger", log_file="lsh_index.log")
+# ==========
+
+lsh_logger.info("lsh_logger")
+
+# smallest prime above 2^32, hashes are 32 bit so (a * x + b) never overflows uint64
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _lsh_recall(threshold: float, bands: int, rows: int) -> float:
+    """_summary_
+
+    Args:
+        threshold (float): Jaccard similarity of the pair
+        bands (int): number of bands
+        rows (int): rows per band
+
+    Returns:
+        float: probability that a pair with the given similarity collides in at least one band
+    """
+    return 1.0 - (1.0 - threshold**rows) ** bands
+
+
+def _optimal_lsh_params(
+    threshold: float = DUPS_THRESHOLD,
+    num_perm: int = LSH_NUM_PERM,
+    target_recall: float = LSH_TARGET_RECALL,
+) -> Tuple[int, int]:
+    """_summary_
+
+    Note:
+        More rows per band means fewer false candidates, so we pick the largest
+        number of rows that still reaches the target recall at the threshold.
+
+    Args:
+        threshold (float, optional): similarity we must not miss. Defaults to DUPS_THRESHOLD.
+        num_perm (int, optional): length of the MinHash signature. Defaults to LSH_NUM_PERM.
+        target_recall (float, optional): recall wanted at the threshold. Defaults to LSH_TARGET_RECALL.
+
+    Returns:
+        Tuple[int, int]: (bands, rows)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if _lsh_recall(threshold, bands, rows) >= target_recall:
+            best = (bands, rows)
+
+    lsh_logger.debug(
+        f"[params] threshold={threshold}, num_perm={num_perm}, target_recall={target_recall} "
+        f"-> bands={best[0]}, rows={best[1]}, recall={_lsh_recall(threshold, *best):.4f}"
+    )
+    return best
+
+
+def _make_permutations(num_perm: int = LSH_NUM_PERM, seed: int = LSH_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """_summary_
+
+    Args:
+        num_perm (int, optional): number of hash functions. Defaults to LSH_NUM_PERM.
+        seed (int, optional): seed, fixed so results are reproducible. Defaults to LSH_SEED.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the (a, b) coefficients of h(x) = (a * x + b) mod p
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def _crc32_ngram_hashes(ngrams: set) -> np.ndarray:
+    """_summary_
+
+    Note:
+        crc32 instead of hash(), because hash() is salted per process.
+
+    Args:
+        ngrams (set): set of n-gram tuples, @see _generate_ngrams()
+
+    Returns:
+        np.ndarray: 32 bit hash of every n-gram (uint64)
+    """
+    return np.fromiter(
+        (zlib.crc32("\x1f".join(gram).encode()) for gram in ngrams),
+        dtype=np.uint64,
+        count=len(ngrams),
+    )
+
+
+def _minhash_signature(hashes: np.ndarray, perms: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """_summary_
+
+    Args:
+        hashes (np.ndarray): 32 bit element hashes of one set
+        perms (Tuple[np.ndarray, np.ndarray]): @see _make_permutations()
+
+    Returns:
+        np.ndarray: MinHash signature, all _MAX_HASH for an empty set
+    """
+    a, b = perms
+    if hashes.size == 0:
+        return np.full(a.shape[0], _MAX_HASH, dtype=np.uint64)
+    values = (np.outer(a, hashes) + b[:, None]) % _PRIME
+    return values.min(axis=1)
+
+
+def _lsh_candidate_pairs(signatures: List[np.ndarray], bands: int, rows: int) -> List[Tuple[int, int]]:
+    """_summary_
+
+    Args:
+        signatures (List[np.ndarray]): MinHash signature per block (empty sets are skipped)
+        bands (int): number of bands
+        rows (int): rows per band
+
+    Returns:
+        List[Tuple[int, int]]: sorted (i, j) pairs, i < j, that share at least one band
+    """
+    candidates = set()
+    for band in range(bands):
+        lo, hi = band * rows, (band + 1) * rows
+        buckets = defaultdict(list)
+        for idx, sig in enumerate(signatures):
+            if sig[0] == _MAX_HASH:
+                continue
+            buckets[sig[lo:hi].tobytes()].append(idx)
+
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    candidates.add((members[x], members[y]))
+
+    lsh_logger.info(
+        f"[candidates] {len(candidates)} candidate pair/s out of "
+        f"{len(signatures) * (len(signatures) - 1) // 2} ({bands} bands x {rows} rows)"
+    )
+    return sorted(candidates)
+
+
+def _fold_hashes(hashes: np.ndarray) -> np.ndarray:
+    """_summary_
+
+    Args:
+        hashes (np.ndarray): 64 bit hashes, @see fingerprint._ngram_fingerprint()
+
+    Returns:
+        np.ndarray: the same hashes folded to 32 bits, so (a * x + b) can't overflow
+    """
+    return (hashes ^ (hashes >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+
+
+def _find_candidate_pairs(
+    fingerprints: List[np.ndarray],
+    threshold: float = DUPS_THRESHOLD,
+    num_perm: int = LSH_NUM_PERM,
+    target_recall: float = LSH_TARGET_RECALL,
+) -> List[Tuple[int, int]]:
+    """_summary_
+
+    Note:
+        Abstract the details from the client
+
+    Args:
+        fingerprints (List[np.ndarray]): n-gram fingerprint of every block, @see _ngram_fingerprint()
+        threshold (float, optional): similarity threshold. Defaults to DUPS_THRESHOLD.
+        num_perm (int, optional): length of the MinHash signature. Defaults to LSH_NUM_PERM.
+        target_recall (float, optional): recall wanted at the threshold. Defaults to LSH_TARGET_RECALL.
+
+    Returns:
+        List[Tuple[int, int]]: @see _lsh_candidate_pairs()
+    """
+    bands, rows = _optimal_lsh_params(threshold, num_perm, target_recall)
+    perms = _make_permutations(num_perm)
+    signatures = [_minhash_signature(_fold_hashes(fp), perms) for fp in fingerprints]
+    return _lsh_candidate_pairs(signatures, bands, rows)
@@ -27,15 +27,17 @@ long_method_logger = setup_logger(
 long_method_logger.info("long_method_logger")
 
 
-def _find_long_method(source_code: str) -> list:
+def _find_long_method(source_code: str, threshold: int = None) -> list:
     """_summary_
 
     Args:
         source_code (str): code returned form "_read_file_contents()"
+        threshold (int, optional): longest allowed method. Defaults to None (LENGTH_THRESHOLD).
 
     Returns:
-        list: list of all instances where a method is longer than <LENGTH_THRESHOLD>
+        list: list of all instances where a method is longer than <threshold>
     """
+    threshold = LENGTH_THRESHOLD if threshold is None else threshold
     long_methods = []
     lines = source_code.split("\n")
 
@@ -54,14 +56,14 @@ def _find_long_method(source_code: str) -> list:
                 body_lines = lines[start_line:end_line + 1]
                 method_length = sum(1 for line in body_lines if line.strip())
 
-                if method_length > LENGTH_THRESHOLD:
+                if method_length > threshold:
                     long_methods.append(
                         {
                             "function": function_name,
                             "start_line": start_line + 1,
                             "end_line": end_line + 1,
                             "length": method_length,
-                            "threshold": LENGTH_THRESHOLD,
+                            "threshold": threshold,
                         }
                     )
             in_function = True
@@ -78,14 +80,14 @@ def _find_long_method(source_code: str) -> list:
             if current_indent < function_indent and stripped:
                 end_line = idx - 1
                 method_length = end_line - start_line + 1
-                if method_length > LENGTH_THRESHOLD:
+                if method_length > threshold:
                     long_methods.append(
                         {
                             "function": function_name,
                             "start_line": start_line + 1,
                             "end_line": end_line + 1,
                             "length": method_length,
-                            "threshold": LENGTH_THRESHOLD,
+                            "threshold": threshold,
                         }
                     )
                 in_function = False
@@ -94,14 +96,14 @@ def _find_long_method(source_code: str) -> list:
     if in_function:
         end_line = len(lines) - 1
         method_length = end_line - start_line + 1
-        if method_length > LENGTH_THRESHOLD:
+        if method_length > threshold:
             long_methods.append(
                 {
                     "function": function_name,
                     "start_line": start_line + 1,
                     "end_line": end_line + 1,
                     "length": method_length,
-                    "threshold": LENGTH_THRESHOLD,
+                    "threshold": threshold,
                 }
             )
 
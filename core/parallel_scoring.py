@@ -0,0 +1,164 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: parallel_scoring.py
+#
+# __brief__: Scores block pairs across a process pool. The pair space is cut into tiles (bands of rows
+#            with about the same number of pairs, or slices of a candidate list), the fingerprints are
+#            sent to every worker once when it starts, and the tiles come back in order, so the result
+#            is the same list the serial loop builds. Below DUPS_PARALLEL_MIN_PAIRS it stays serial.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+from core.constants import DUPS_WORKERS, DUPS_PARALLEL_MIN_PAIRS
+from core.fingerprint import _fingerprint_similarity, _stack_fingerprints, _row_similarity_array
+from utils.logger import setup_logger
+
+# ==========
+parallel_scoring_logger = setup_logger(
+    name="parallel_scoring.py_logger", log_file="parallel_scoring.log"
+)
+# ==========
+
+parallel_scoring_logger.info("parallel_scoring_logger")
+
+# tiles per worker, more tiles even out rows / candidates that cost more than others
+_TILES_PER_WORKER = 4
+
+# set once in every worker process, @see _init_worker()
+_WORKER_FINGERPRINTS = None
+_WORKER_STACKED = None
+
+
+def _init_worker(fingerprints: List[np.ndarray]) -> None:
+    """_summary_
+
+    Note:
+        Runs once per worker, so the fingerprints cross the process boundary once per worker
+        instead of once per pair or tile.
+
+    Args:
+        fingerprints (List[np.ndarray]): fingerprint of every block
+    """
+    global _WORKER_FINGERPRINTS, _WORKER_STACKED
+    _WORKER_FINGERPRINTS = fingerprints
+    _WORKER_STACKED = _stack_fingerprints(fingerprints)
+
+
+def _score_row_tile(rows: np.ndarray) -> List[np.ndarray]:
+    """_summary_
+
+    Args:
+        rows (np.ndarray): blocks whose rows are scored, @see _row_similarity_array()
+
+    Returns:
+        List[np.ndarray]: one row of similarities per block
+    """
+    return [_row_similarity_array(_WORKER_STACKED, i) for i in rows.tolist()]
+
+
+def _score_pair_tile(pairs: np.ndarray) -> np.ndarray:
+    """_summary_
+
+    Args:
+        pairs (np.ndarray): (k, 2) array of block pairs
+
+    Returns:
+        np.ndarray: similarity of every pair
+    """
+    fps = _WORKER_FINGERPRINTS
+    return np.array([_fingerprint_similarity(fps[i], fps[j]) for i, j in pairs.tolist()], dtype=np.float64)
+
+
+def _resolve_workers(workers: int, pair_count: int) -> int:
+    """_summary_
+
+    Args:
+        workers (int): requested worker count, None for DUPS_WORKERS
+        pair_count (int): number of pairs to score
+
+    Returns:
+        int: processes to use, 1 means score in this process
+    """
+    workers = DUPS_WORKERS if workers is None else workers
+    if workers <= 1 or pair_count < DUPS_PARALLEL_MIN_PAIRS:
+        return 1
+    return workers
+
+
+def _row_tiles(rows: list, n: int, tiles: int) -> List[np.ndarray]:
+    """_summary_
+
+    Args:
+        rows (list): blocks whose rows are scored, ascending
+        n (int): number of blocks
+        tiles (int): how many tiles to cut
+
+    Returns:
+        List[np.ndarray]: consecutive runs of rows, each with about the same number of pairs
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cumulative = np.cumsum(n - 1 - rows)
+    if rows.size == 0 or cumulative[-1] == 0:
+        return [rows] if rows.size else []
+    cuts = np.searchsorted(cumulative, np.linspace(0, cumulative[-1], tiles + 1)[1:-1], side="right")
+    return [tile for tile in np.split(rows, cuts) if tile.size]
+
+
+def _row_similarity_arrays(fingerprints: List[np.ndarray], rows: list, workers: int = None):
+    """_summary_
+
+    Args:
+        fingerprints (List[np.ndarray]): fingerprint of every block
+        rows (list): blocks whose rows are scored, ascending
+        workers (int, optional): processes to use. Defaults to None (DUPS_WORKERS).
+
+    Yields:
+        Tuple[int, np.ndarray]: (block, similarities with every later block), in the order of rows
+    """
+    n = len(fingerprints)
+    workers = _resolve_workers(workers, sum(n - 1 - i for i in rows))
+
+    if workers == 1:
+        stacked = _stack_fingerprints(fingerprints)
+        for i in rows:
+            yield i, _row_similarity_array(stacked, i)
+        return
+
+    tiles = _row_tiles(rows, n, workers * _TILES_PER_WORKER)
+    parallel_scoring_logger.info(f"[rows] {len(rows)} row/s in {len(tiles)} tile/s on {workers} worker/s")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fingerprints,)) as pool:
+        for tile, scored in zip(tiles, pool.map(_score_row_tile, tiles)):
+            yield from zip(tile.tolist(), scored)
+
+
+def _pair_similarities(fingerprints: List[np.ndarray], pairs: List[Tuple[int, int]], workers: int = None) -> list:
+    """_summary_
+
+    Args:
+        fingerprints (List[np.ndarray]): fingerprint of every block
+        pairs (List[Tuple[int, int]]): block pairs to score
+        workers (int, optional): processes to use. Defaults to None (DUPS_WORKERS).
+
+    Returns:
+        list: similarity of every pair, in the order of pairs
+    """
+    workers = _resolve_workers(workers, len(pairs))
+    if workers == 1:
+        return [_fingerprint_similarity(fingerprints[i], fingerprints[j]) for i, j in pairs]
+
+    tiles = np.array_split(np.asarray(pairs, dtype=np.int64).reshape(-1, 2), workers * _TILES_PER_WORKER)
+    parallel_scoring_logger.info(f"[pairs] {len(pairs)} pair/s in {len(tiles)} tile/s on {workers} worker/s")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fingerprints,)) as pool:
+        return np.concatenate(list(pool.map(_score_pair_tile, tiles))).tolist()
@@ -27,15 +27,17 @@ long_param_list_logger = setup_logger(
 long_param_list_logger.info("long_param_list_logger")
 
 
-def _find_long_parameter_list(source_code: str) -> list:
+def _find_long_parameter_list(source_code: str, threshold: int = None) -> list:
     """_summary_
 
     Args:
         source_code (str): code returned form "_read_file_contents()"
+        threshold (int, optional): most parameters allowed. Defaults to None (PARAMS_THRESHOLD).
 
     Returns:
-        list: list of all instances where a method has more than <PARAMS_THRESHOLD> parameters
+        list: list of all instances where a method has more than <threshold> parameters
     """
+    threshold = PARAMS_THRESHOLD if threshold is None else threshold
     tokens = re.findall(r"\w+|[()]", source_code)
     long_parameter_methods = []
     found_method = "\0"
@@ -61,14 +63,14 @@ def _find_long_parameter_list(source_code: str) -> list:
                     num_params += 1
                 i += 1
 
-            if num_params > PARAMS_THRESHOLD:
-                found_method = f"Function: \n\tposition: {i}, \n\tname: {function_name}, \n\tparameters: {num_params},\n which exceeds the threshold of {PARAMS_THRESHOLD}"
+            if num_params > threshold:
+                found_method = f"Function: \n\tposition: {i}, \n\tname: {function_name}, \n\tparameters: {num_params},\n which exceeds the threshold of {threshold}"
                 long_parameter_methods.append(
                     {
                         "function": function_name,
                         "position": i,
                         "params_count": num_params,
-                        "threshold": PARAMS_THRESHOLD,
+                        "threshold": threshold,
                     }
                 )
         i += 1
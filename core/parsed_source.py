@@ -0,0 +1,126 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: parsed_source.py
+#
+# __brief__: One file, read and parsed once. Holds the decoded text, a table of where every line
+#            starts and the AST, so the detectors of a report share them instead of each going back
+#            to the disk (or the parser) for their own copy. The tree is only built when a detector
+#            first asks for it. The duplicate finder can't use it: it works on a comment and
+#            docstring free copy of the text, whose lines and tree differ, and parses that copy once.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import ast
+from bisect import bisect_right
+from functools import cached_property
+from itertools import accumulate
+from typing import List, Optional
+
+from utils.logger import setup_logger
+from utils.utility import _read_file_contents
+
+# ==========
+parsed_source_logger = setup_logger(name="parsed_source.py_logger", log_file="parsed_source.log")
+# ==========
+
+parsed_source_logger.info("parsed_source_logger")
+
+
+class ParsedSource:
+    """_summary_
+
+    Note:
+        Lines and offsets follow str.splitlines(keepends=True), line numbers are 1-based like
+        the ones in the AST.
+    """
+
+    def __init__(self, text: str, file_name: str = None):
+        """_summary_
+
+        Args:
+            text (str): decoded source code
+            file_name (str, optional): where the text came from, for the logs. Defaults to None.
+        """
+        self.text = text
+        self.file_name = file_name
+        self._lines = text.splitlines(keepends=True)
+        # offset of the first character of every line, plus one past the end
+        self.line_offsets = [0] + list(accumulate(len(line) for line in self._lines))
+
+    @classmethod
+    def from_file(cls, file_name: str) -> "ParsedSource":
+        """_summary_
+
+        Args:
+            file_name (str): file to read
+
+        Raises:
+            TypeError: raised when the file could not be read
+
+        Returns:
+            ParsedSource: the file, read once
+        """
+        text = _read_file_contents(file_name)
+        if text is None:
+            parsed_source_logger.error(f"could not read file: {file_name}")
+            raise TypeError(f"could not read file: {file_name}")
+
+        parsed_source_logger.info(f"[read] {file_name}, {len(text)} character/s")
+        return cls(text, file_name)
+
+    @property
+    def lines(self) -> List[str]:
+        """_summary_
+
+        Returns:
+            List[str]: the lines without their line breaks, same as self.text.splitlines()
+        """
+        return [line.rstrip("\r\n") for line in self._lines]
+
+    def offset(self, line: int, column: int = 0) -> int:
+        """_summary_
+
+        Args:
+            line (int): 1-based line
+            column (int, optional): column in the line. Defaults to 0.
+
+        Returns:
+            int: offset of the position in self.text
+        """
+        return self.line_offsets[line - 1] + column
+
+    def line_of(self, offset: int) -> int:
+        """_summary_
+
+        Args:
+            offset (int): offset in self.text
+
+        Returns:
+            int: 1-based line the offset is on
+        """
+        return max(1, bisect_right(self.line_offsets, offset, hi=len(self._lines)))
+
+    @cached_property
+    def tree(self) -> Optional[ast.Module]:
+        """_summary_
+
+        Returns:
+            Optional[ast.Module]: the AST of the file, None if it doesn't parse
+        """
+        try:
+            tree = ast.parse(self.text)
+        except (SyntaxError, ValueError) as e:
+            parsed_source_logger.warning(f"[tree] {self.file_name} doesn't parse: {e}")
+            return None
+        parsed_source_logger.debug(f"[tree] {self.file_name} parsed")
+        return tree
+
+    def __len__(self) -> int:
+        return len(self._lines)
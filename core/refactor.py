@@ -24,9 +24,12 @@ from utils.utility import _read_file_contents
 
 from core.duplicated_finder import (
     _tokenize_block,
-    _jaccard_similarity,
     _remove_comments,
 )
+from core.fingerprint import _ngram_fingerprint, _fingerprint_similarity
+from core.similarity_join import _similarity_join
+from core.ast_hash import _function_clone_groups
+from core.threshold_sweep import ThresholdSweep
 
 from core.constants import DUPS_THRESHOLD
 
@@ -315,33 +318,54 @@ def _extract_functions(source_code: str) -> dict:
     refactor_logger.debug(f"Keys: {functions.keys()}")
     return functions
 
-def _find_duplicates(func_map: dict) -> list:
+def _find_duplicates(func_map: dict, threshold: float = None) -> list:
     """_summary_
 
     Args:
         func_map (dict): dictionary mapping function names to their AST nodes
+        threshold (float, optional): lowest Jaccard similarity kept. Defaults to None (DUPS_THRESHOLD).
 
     Returns:
         list: list of tuples containing function names and their Jaccard similarity
     """
-    tokens = {name: _tokenize_block(data["text"]) for name, data in func_map.items()}
+    threshold = DUPS_THRESHOLD if threshold is None else threshold
+    names = list(func_map)
+    fingerprints = [_ngram_fingerprint(_tokenize_block(func_map[name]["text"])) for name in names]
+    candidates, _ = _similarity_join(fingerprints, threshold)
+
     duplicates = []
+    for i, j in candidates:
+        sim = _fingerprint_similarity(fingerprints[i], fingerprints[j])
+        if sim >= threshold:
+            a, b = sorted((names[i], names[j]))
+            duplicates.append((a, b, sim))
 
-    seen = set()
-    for a, tokens_a in tokens.items():
-        for b, tokens_b in tokens.items():
-            if a >= b or (a, b) in seen:
-                continue
-            sim = _jaccard_similarity(tokens_a, tokens_b)
-            if sim >= DUPS_THRESHOLD:
-                duplicates.append((a, b, sim))
-                seen.add((a, b))
+    # same order as the nested loop over func_map used to give
+    position = {name: k for k, name in enumerate(names)}
+    duplicates.sort(key=lambda dup: (position[dup[0]], position[dup[1]]))
 
     refactor_logger.debug(f"Found duplicates: {duplicates}")
     return duplicates
 
+def _refactor_clone_groups(source_code: str, groups: list, use_wrapper: bool = True) -> str:
+    """_summary_
+
+    Args:
+        source_code (str): source code to be refactored
+        groups (list): groups of function names, @see ast_hash._function_clone_groups()
+        use_wrapper (bool, optional): @see refactor_duplicates(). Defaults to True.
+
+    Returns:
+        str: refactored source code, one pass per group
+    """
+    for group in groups:
+        duplicates = [(group[0], name, 1.0) for name in group[1:]]
+        source_code = _refactor_with_ast(source_code, duplicates, use_wrapper)
+    return source_code
+
+
 # ============================== CALLABLE ===========================
-def refactor_duplicates(filepath, use_wrapper: bool = True) -> Tuple[str, bool]:
+def refactor_duplicates(filepath, use_wrapper: bool = True, structural: bool = False) -> Tuple[str, bool]:
     """_summary_
 
     Args:
@@ -361,6 +385,10 @@ def refactor_duplicates(filepath, use_wrapper: bool = True) -> Tuple[str, bool]:
             we create a separate function called _common_logic_<hash> (to avoid name clashes).
             This allows us to preserve context.
 
+        structural (bool, optional): only merge functions that are the same AST up to renaming
+                                     their locals, @see ast_hash._function_clone_groups().
+                                     Defaults to False (token similarity above DUPS_THRESHOLD).
+
     Raises:
         CodeProcessingError: if the file could not be read
 
@@ -371,6 +399,12 @@ def refactor_duplicates(filepath, use_wrapper: bool = True) -> Tuple[str, bool]:
     if not source_code:
         raise CodeProcessingError(f"Could't read any code from: {filepath}")
 
+    if structural:
+        groups = _function_clone_groups(source_code)
+        if not groups:
+            return "# No duplicates found, nothing to refactor.", False
+        return _refactor_clone_groups(source_code, groups, use_wrapper), True
+
     functions_dict = _extract_functions(source_code)
     duplicates = _find_duplicates(functions_dict)
 
@@ -395,21 +429,22 @@ def _debug_dict(source_code: str, threshold: float = 0.85) -> dict:
     token_map = {name: _tokenize_block(data["text"]) for name, data in func_map.items()}
     debug["tokens"] = token_map
 
+    fingerprints = {name: _ngram_fingerprint(tokens) for name, tokens in token_map.items()}
+
     similarities = []
-    for a, tokens_a in token_map.items():
-        for b, tokens_b in token_map.items():
+    for a, fingerprint_a in fingerprints.items():
+        for b, fingerprint_b in fingerprints.items():
             if a >= b:
                 continue
-            sim = _jaccard_similarity(tokens_a, tokens_b)
+            sim = _fingerprint_similarity(fingerprint_a, fingerprint_b)
             similarities.append({"pair": (a, b), "similarity": sim})
     debug["similarities"] = similarities
 
-    global DUPS_THRESHOLD
-    prev_threshold = DUPS_THRESHOLD
-    DUPS_THRESHOLD = threshold
-    duplicates = _find_duplicates(func_map)
-    DUPS_THRESHOLD = prev_threshold
-    debug["duplicates"] = duplicates
+    # the scores above are reused, no second pass and no rebinding of DUPS_THRESHOLD
+    sweep = ThresholdSweep(((*s["pair"], s["similarity"]) for s in similarities), floor=0.0)
+    # the sweep hands them out most similar first, keep the order the pairs were compared in
+    order = {s["pair"]: n for n, s in enumerate(similarities)}
+    debug["duplicates"] = sorted(sweep.pairs(threshold), key=lambda pair: order[pair[:2]])
 
     if debug is None:
         refactor_logger.error("debug_dict was not generated")
@@ -0,0 +1,259 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: simhash.py
+#
+# __brief__: 64 bit SimHash per block (weighted token n-grams) and a multi-table index for Hamming
+#            radius queries. The 64 bits are cut into radius + 1 chunks, a fingerprint within the
+#            radius agrees exactly with the query on at least one chunk (pigeonhole), so every table
+#            is the fingerprints sorted by one chunk and a lookup is a binary search per table.
+#
+#            @see Manku et al., "Detecting Near-Duplicates for Web Crawling"
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import hashlib
+from collections import Counter
+from typing import List, Tuple
+
+import numpy as np
+
+from core.constants import SIMHASH_RADIUS
+from utils.logger import setup_logger
+
+# ==========
+simhash_logger = setup_logger(name="simhash.py_logger", log_file="simhash.log")
+# ==========
+
+simhash_logger.info("simhash_logger")
+
+_BITS = np.arange(64, dtype=np.uint64)
+
+# n-gram -> 64 bit hash, the normalized vocabulary is small so the same n-grams keep coming back
+_NGRAM_HASHES = {}
+
+# when the tables would hand back more than 1 / _SCAN_FRACTION of the index, scan everything instead
+_SCAN_FRACTION = 64
+
+# popcount of every byte, for numpy builds without np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+
+def _ngram_hash(gram: tuple) -> int:
+    """_summary_
+
+    Note:
+        blake2b instead of hash(), because hash() is salted per process.
+
+    Args:
+        gram (tuple): n-gram of normalized tokens
+
+    Returns:
+        int: stable 64 bit hash of the n-gram
+    """
+    value = _NGRAM_HASHES.get(gram)
+    if value is None:
+        digest = hashlib.blake2b("\x1f".join(gram).encode(), digest_size=8).digest()
+        value = _NGRAM_HASHES[gram] = int.from_bytes(digest, "little")
+    return value
+
+
+def _simhash(tokens: list, n: int = 3) -> int:
+    """_summary_
+
+    Note:
+        Every n-gram votes +weight on the bits its hash has set and -weight on the others, the
+        weight is how often it occurs in the block (the n-grams _generate_ngrams() collects, with
+        their counts). A bit of the SimHash is set where the votes are positive.
+
+    Args:
+        tokens (list): normalized tokens of the block, @see _tokenize_block()
+        n (int, optional): size of the n-grams. Defaults to 3.
+
+    Returns:
+        int: 64 bit SimHash, 0 for a block shorter than one n-gram
+    """
+    grams = Counter(tuple(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+    if not grams:
+        return 0
+
+    hashes = np.fromiter((_ngram_hash(gram) for gram in grams), dtype=np.uint64, count=len(grams))
+    weights = np.fromiter(grams.values(), dtype=np.int64, count=len(grams))
+    bits = ((hashes[:, None] >> _BITS) & np.uint64(1)).astype(np.int64)
+    votes = weights @ (2 * bits - 1)
+    return int(np.bitwise_or.reduce(np.where(votes > 0, np.uint64(1) << _BITS, np.uint64(0))))
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """_summary_
+
+    Args:
+        values (np.ndarray): uint64 array
+
+    Returns:
+        np.ndarray: number of set bits of every value
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.int64)
+    as_bytes = np.ascontiguousarray(values, dtype=np.uint64).view(np.uint8).reshape(-1, 8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=1, dtype=np.int64)
+
+
+def _hamming_distances(fingerprints: np.ndarray, query: int) -> np.ndarray:
+    """_summary_
+
+    Args:
+        fingerprints (np.ndarray): packed uint64 SimHashes
+        query (int): SimHash to compare with
+
+    Returns:
+        np.ndarray: Hamming distance of every fingerprint to the query, one vectorized pass
+    """
+    return _popcount(fingerprints ^ np.uint64(query))
+
+
+class SimHashIndex:
+    """_summary_
+
+    Near-duplicate lookup over a fixed set of SimHashes, @see _simhash(). A first-pass filter:
+    what it returns still has to be checked with the exact similarity.
+    """
+
+    def __init__(self, fingerprints: np.ndarray, radius: int = SIMHASH_RADIUS):
+        """_summary_
+
+        Args:
+            fingerprints (np.ndarray): SimHash of every block, the position is the block id
+            radius (int, optional): largest Hamming radius queries may use. Defaults to SIMHASH_RADIUS.
+        """
+        self.fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        self.radius = radius
+
+        edges = np.linspace(0, 64, radius + 2).astype(int)
+        self._chunks = []
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            mask = np.uint64((1 << (hi - lo)) - 1)
+            keys = (self.fingerprints >> np.uint64(lo)) & mask
+            order = np.argsort(keys, kind="stable")
+            self._chunks.append((np.uint64(lo), mask, keys[order], order))
+
+        simhash_logger.info(f"[index] {len(self.fingerprints)} fingerprint/s, {len(self._chunks)} table/s")
+
+    def candidates(self, query: int):
+        """_summary_
+
+        Args:
+            query (int): SimHash to look up
+
+        Returns:
+            np.ndarray | None: sorted ids that share at least one chunk with the query, None when
+                               that's more than 1 / _SCAN_FRACTION of the index (a scan is cheaper)
+        """
+        query = np.uint64(query)
+        ranges = []
+        for lo, mask, keys, order in self._chunks:
+            key = (query >> lo) & mask
+            ranges.append((order, np.searchsorted(keys, key, side="left"), np.searchsorted(keys, key, side="right")))
+
+        if sum(right - left for _, left, right in ranges) * _SCAN_FRACTION > len(self.fingerprints):
+            return None
+        return np.unique(np.concatenate([order[left:right] for order, left, right in ranges]))
+
+    def query(self, query: int, radius: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """_summary_
+
+        Args:
+            query (int): SimHash to look up
+            radius (int, optional): Hamming radius, at most the index radius. Defaults to None (index radius).
+
+        Raises:
+            ValueError: if the radius is larger than the one the index was built for
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (ids, distances) within the radius, closest first
+        """
+        radius = self.radius if radius is None else radius
+        if radius > self.radius:
+            raise ValueError(f"radius {radius} is larger than the index radius {self.radius}")
+
+        ids = self.candidates(query)
+        if ids is None:
+            return self.scan(query, radius)
+        distances = _hamming_distances(self.fingerprints[ids], query)
+        keep = distances <= radius
+        ids, distances = ids[keep], distances[keep]
+        order = np.lexsort((ids, distances))
+        return ids[order], distances[order]
+
+    def scan(self, query: int, radius: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """_summary_
+
+        Note:
+            Popcount over every fingerprint, no tables. Same result as query(), works for any radius.
+            One pass of XOR + popcount is a few ms for 500k fingerprints.
+
+        Args:
+            query (int): SimHash to look up
+            radius (int, optional): Hamming radius. Defaults to None (index radius).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (ids, distances) within the radius, closest first
+        """
+        radius = self.radius if radius is None else radius
+        distances = _hamming_distances(self.fingerprints, query)
+        ids = np.flatnonzero(distances <= radius)
+        order = np.lexsort((ids, distances[ids]))
+        return ids[order], distances[ids][order]
+
+    def pairs(self, radius: int = None) -> List[Tuple[int, int]]:
+        """_summary_
+
+        Args:
+            radius (int, optional): Hamming radius, at most the index radius. Defaults to None (index radius).
+
+        Returns:
+            List[Tuple[int, int]]: sorted (i, j) pairs, i < j, within the radius
+        """
+        radius = self.radius if radius is None else radius
+        if radius > self.radius:
+            raise ValueError(f"radius {radius} is larger than the index radius {self.radius}")
+
+        found = set()
+        for _, _, keys, order in self._chunks:
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            ends = np.r_[starts[1:], len(keys)]
+            for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+                members = np.sort(order[start:end])
+                for x in range(len(members) - 1):
+                    i = int(members[x])
+                    rest = members[x + 1 :]
+                    close = rest[_hamming_distances(self.fingerprints[rest], int(self.fingerprints[i])) <= radius]
+                    found.update((i, int(j)) for j in close.tolist())
+
+        simhash_logger.info(f"[pairs] {len(found)} pair/s within radius {radius}")
+        return sorted(found)
+
+    def ranked_pairs(self, radius: int = None) -> List[Tuple[int, int]]:
+        """_summary_
+
+        Args:
+            radius (int, optional): Hamming radius, at most the index radius. Defaults to None (index radius).
+
+        Returns:
+            List[Tuple[int, int]]: the pairs of pairs(), closest first (the likeliest duplicates)
+        """
+        pairs = self.pairs(radius)
+        if not pairs:
+            return []
+        i, j = np.asarray(pairs, dtype=np.int64).T
+        distances = _popcount(self.fingerprints[i] ^ self.fingerprints[j])
+        return [pairs[k] for k in np.lexsort((j, i, distances)).tolist()]
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
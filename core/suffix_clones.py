@@ -0,0 +1,219 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: suffix_clones.py
+#
+# __brief__: Suffix array based clone engine. The whole file is turned into one normalized token
+#            stream, and every maximal repeated token run is reported as a Type 1 / Type 2 clone.
+#            Unlike the Jaccard engine it doesn't care where _split_into_blocks() puts the cuts.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import numpy as np
+
+from core.constants import SUFFIX_MIN_TOKENS
+from core.token_stream import _file_token_stream
+from utils.logger import setup_logger
+
+# ==========
+suffix_clones_logger = setup_logger(
+    name="suffix_clones.py_logger", log_file="suffix_clones.log"
+)
+# ==========
+
+suffix_clones_logger.info("suffix_clones_logger")
+
+
+def _suffix_array(ids: np.ndarray) -> np.ndarray:
+    """_summary_
+
+    Note:
+        Prefix doubling: every round sorts the suffixes by their first 2k tokens using the
+        ranks of the previous round, and stops as soon as all ranks are distinct.
+
+    Args:
+        ids (np.ndarray): token ids
+
+    Returns:
+        np.ndarray: start positions of the suffixes in sorted order
+    """
+    n = len(ids)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    rank = np.unique(ids, return_inverse=True)[1].astype(np.int64).ravel()
+    k = 1
+    while True:
+        second = np.full(n, -1, dtype=np.int64)
+        if k < n:
+            second[: n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+
+        sorted_rank, sorted_second = rank[sa], second[sa]
+        changed = np.empty(n, dtype=bool)
+        changed[0] = True
+        changed[1:] = (sorted_rank[1:] != sorted_rank[:-1]) | (sorted_second[1:] != sorted_second[:-1])
+
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.cumsum(changed) - 1
+        if rank[sa[-1]] == n - 1 or k >= n:
+            return sa
+        k *= 2
+
+
+def _lcp_array(ids: np.ndarray, sa: np.ndarray) -> np.ndarray:
+    """_summary_
+
+    Note:
+        Kasai et al., linear time.
+
+    Args:
+        ids (np.ndarray): token ids
+        sa (np.ndarray): suffix array, @see _suffix_array()
+
+    Returns:
+        np.ndarray: lcp[i] = longest common prefix of suffixes sa[i - 1] and sa[i] (lcp[0] = 0)
+    """
+    n = len(ids)
+    tokens = ids.tolist()
+    order = sa.tolist()
+    rank = [0] * n
+    for i, pos in enumerate(order):
+        rank[pos] = i
+
+    lcp = [0] * n
+    h = 0
+    for pos in range(n):
+        r = rank[pos]
+        if r == 0:
+            h = 0
+            continue
+        prev = order[r - 1]
+        while pos + h < n and prev + h < n and tokens[pos + h] == tokens[prev + h]:
+            h += 1
+        lcp[r] = h
+        if h > 0:
+            h -= 1
+    return np.asarray(lcp, dtype=np.int64)
+
+
+def _maximal_repeats(ids: np.ndarray, min_len: int) -> list:
+    """_summary_
+
+    Note:
+        Bottom-up walk over the lcp-intervals. Every interval is right-maximal by construction,
+        it is only kept if the occurrences don't all share the same previous token (left-maximal).
+
+    Args:
+        ids (np.ndarray): token ids
+        min_len (int): shortest run worth reporting
+
+    Returns:
+        list: list of (length, sorted start positions) tuples
+    """
+    n = len(ids)
+    if n < 2:
+        return []
+
+    sa = _suffix_array(ids)
+    lcp = _lcp_array(ids, sa).tolist()
+    order = sa.tolist()
+    tokens = ids.tolist()
+
+    repeats = []
+    stack = [(0, 0)]  # (lcp value, left bound)
+    for i in range(1, n + 1):
+        current = lcp[i] if i < n else -1
+        left = i - 1
+        while stack and current < stack[-1][0]:
+            length, left = stack.pop()
+            if length >= min_len:
+                positions = sorted(order[left:i])
+                previous = {tokens[p - 1] if p > 0 else None for p in positions}
+                if len(previous) > 1 or None in previous:
+                    repeats.append((length, positions))
+        if not stack or current > stack[-1][0]:
+            stack.append((current, left))
+
+    return repeats
+
+
+def _non_overlapping(positions: list, length: int) -> list:
+    """_summary_
+
+    Args:
+        positions (list): sorted start positions of one repeat
+        length (int): length of the repeat
+
+    Returns:
+        list: greedy subset of positions whose runs don't overlap (periodic repeats)
+    """
+    kept = []
+    for pos in positions:
+        if not kept or pos >= kept[-1] + length:
+            kept.append(pos)
+    return kept
+
+
+def _find_suffix_clones(source_code: str, min_tokens: int = SUFFIX_MIN_TOKENS) -> list:
+    """_summary_
+
+    Args:
+        source_code (str): source code to analyze
+        min_tokens (int, optional): shortest repeated run reported. Defaults to SUFFIX_MIN_TOKENS.
+
+    Returns:
+        list: duplicate pairs in the same shape as the Jaccard engine, plus "clone_type"
+              (1 = identical tokens, 2 = identical after normalization) and "length" in tokens
+    """
+    suffix_clones_logger.info("[starting] _find_suffix_clones()")
+
+    stream = _file_token_stream(source_code)
+    if len(stream) < 2:
+        return []
+
+    vocab = {}
+    ids = np.fromiter(
+        (vocab.setdefault(norm, len(vocab)) for norm, _, _ in stream), dtype=np.int64, count=len(stream)
+    )
+    lines = source_code.splitlines()
+
+    def describe(pos: int, length: int) -> dict:
+        start_line, end_line = stream[pos][2], stream[pos + length - 1][2]
+        return {
+            "index": pos,
+            "text": "\n".join(lines[start_line - 1 : end_line]),
+            "type": "code",
+            "tokens": [norm for norm, _, _ in stream[pos : pos + length]],
+            "line_number": start_line,
+            "end_line": end_line,
+        }
+
+    duplicates = []
+    for length, positions in _maximal_repeats(ids, min_tokens):
+        positions = _non_overlapping(positions, length)
+        for x in range(len(positions)):
+            for y in range(x + 1, len(positions)):
+                a, b = positions[x], positions[y]
+                raw_a = [raw for _, raw, _ in stream[a : a + length]]
+                raw_b = [raw for _, raw, _ in stream[b : b + length]]
+                duplicates.append(
+                    {
+                        "block1": describe(a, length),
+                        "block2": describe(b, length),
+                        "similarity": 1.0,
+                        "threshold": 1.0,
+                        "clone_type": 1 if raw_a == raw_b else 2,
+                        "length": length,
+                    }
+                )
+
+    duplicates.sort(key=lambda d: (d["block1"]["index"], d["block2"]["index"], -d["length"]))
+    suffix_clones_logger.info(f"[done], found {len(duplicates)} repeated token run pair/s.")
+    return duplicates
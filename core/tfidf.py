@@ -0,0 +1,176 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: tfidf.py
+#
+# __brief__: TF-IDF weighted cosine similarity between blocks. Every block is a sparse row of n-gram
+#            weights, n-grams found in most blocks (`( VAR )`, `VAR = VAR`) get a small weight and rare
+#            ones a large one. All-pairs cosine is the product of the L2-normalized matrix with its
+#            transpose, computed a tile of rows at a time, and only scores at or above the threshold
+#            leave a tile. SciPy is used when it's installed, a NumPy CSR product otherwise.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+from typing import List, Tuple
+
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:  # optional, @see _cosine_tile_numpy()
+    sparse = None
+
+from core.constants import TFIDF_THRESHOLD, TFIDF_TILE_CELLS
+from utils.logger import setup_logger
+
+# ==========
+tfidf_logger = setup_logger(name="tfidf.py_logger", log_file="tfidf.log")
+# ==========
+
+tfidf_logger.info("tfidf_logger")
+
+# cosine of two identical rows can come out a few ulps under 1.0, scores this close to the threshold count
+_EPSILON = 1e-9
+
+
+def _tfidf_matrix(ngram_hashes: List[np.ndarray]) -> tuple:
+    """_summary_
+
+    Note:
+        tf is sublinear (1 + log count), so a block repeating one n-gram ten times doesn't drown
+        out the rest of it, idf is smoothed, log((1 + N) / (1 + df)) + 1. Rows are L2-normalized,
+        the dot product of two rows is their cosine.
+
+    Args:
+        ngram_hashes (List[np.ndarray]): n-gram hashes of every block, repeats included,
+                                         @see _ngram_hashes()
+
+    Returns:
+        tuple: (data, indices, indptr, columns) CSR arrays, columns in a row are sorted, an empty
+               block is an empty row
+    """
+    sizes = np.fromiter((len(h) for h in ngram_hashes), dtype=np.int64, count=len(ngram_hashes))
+    if not sizes.sum():
+        return np.empty(0), np.empty(0, dtype=np.int64), np.zeros(len(sizes) + 1, dtype=np.int64), 0
+
+    vocab, columns = np.unique(np.concatenate(ngram_hashes), return_inverse=True)
+    rows = np.repeat(np.arange(len(sizes), dtype=np.int64), sizes)
+    cells, counts = np.unique(rows * len(vocab) + columns, return_counts=True)
+    rows, columns = np.divmod(cells, len(vocab))
+
+    df = np.bincount(columns, minlength=len(vocab))
+    idf = np.log((1 + len(sizes)) / (1 + df)) + 1
+    data = (1 + np.log(counts)) * idf[columns]
+
+    norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(sizes)))
+    data /= norms[rows]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(sizes)))))
+    return data, columns, indptr, len(vocab)
+
+
+def _cosine_tile_scipy(matrix, transposed, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """_summary_
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): normalized TF-IDF rows
+        transposed (scipy.sparse.csr_matrix): matrix.T
+        lo (int): first row of the tile
+        hi (int): one past the last row of the tile
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (rows, columns, cosines) of every nonzero
+                                                   product in the tile
+    """
+    product = (matrix[lo:hi] @ transposed).tocoo()
+    return product.row + lo, product.col, product.data
+
+
+def _cosine_tile_numpy(csr: tuple, csc: tuple, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """_summary_
+
+    Note:
+        Every nonzero of the tile is paired with the posting list of its column, the products
+        are summed per (row, other row) cell with one bincount into a dense tile.
+
+    Args:
+        csr (tuple): (data, indices, indptr, columns), @see _tfidf_matrix()
+        csc (tuple): (data, row indices, column pointers) of the same matrix
+        lo (int): first row of the tile
+        hi (int): one past the last row of the tile
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (rows, columns, cosines) of every nonzero
+                                                   product in the tile
+    """
+    data, indices, indptr, _ = csr
+    col_data, col_rows, col_ptr = csc
+    n = len(indptr) - 1
+
+    start, end = indptr[lo], indptr[hi]
+    tile_rows = np.repeat(np.arange(hi - lo, dtype=np.int64), np.diff(indptr[lo : hi + 1]))
+    columns = indices[start:end]
+    lengths = col_ptr[columns + 1] - col_ptr[columns]
+    if not lengths.sum():
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+
+    # positions of every posting of every column, back to back
+    offsets = np.repeat(col_ptr[columns] - np.cumsum(lengths) + lengths, lengths)
+    postings = offsets + np.arange(lengths.sum())
+    products = np.repeat(data[start:end], lengths) * col_data[postings]
+    cells = np.repeat(tile_rows, lengths) * n + col_rows[postings]
+
+    tile = np.bincount(cells, weights=products, minlength=(hi - lo) * n)
+    found = np.flatnonzero(tile)
+    return found // n + lo, found % n, tile[found]
+
+
+def _cosine_pairs(
+    ngram_hashes: List[np.ndarray], threshold: float = TFIDF_THRESHOLD, tile_cells: int = TFIDF_TILE_CELLS
+) -> List[Tuple[int, int, float]]:
+    """_summary_
+
+    Note:
+        A tile is as many rows as fit tile_cells (row, other row) scores, so memory stays flat
+        however many blocks there are, and only the pairs over the threshold are kept from it.
+
+    Args:
+        ngram_hashes (List[np.ndarray]): n-gram hashes of every block, @see _ngram_hashes()
+        threshold (float, optional): lowest cosine kept. Defaults to TFIDF_THRESHOLD.
+        tile_cells (int, optional): scores computed per tile. Defaults to TFIDF_TILE_CELLS.
+
+    Returns:
+        List[Tuple[int, int, float]]: sorted (i, j, cosine) with i < j and cosine >= threshold
+    """
+    csr = _tfidf_matrix(ngram_hashes)
+    data, indices, indptr, columns = csr
+    n = len(indptr) - 1
+    tile_rows = max(1, tile_cells // max(n, 1))
+
+    if sparse is not None:
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(n, columns))
+        transposed = matrix.T.tocsr()
+        tile = lambda lo, hi: _cosine_tile_scipy(matrix, transposed, lo, hi)
+    else:
+        order = np.argsort(indices, kind="stable")
+        col_rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))[order]
+        col_ptr = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=columns))))
+        tile = lambda lo, hi: _cosine_tile_numpy(csr, (data[order], col_rows, col_ptr), lo, hi)
+
+    pairs = []
+    for lo in range(0, n, tile_rows):
+        rows, cols, cosines = tile(lo, min(n, lo + tile_rows))
+        keep = (cols > rows) & (cosines >= threshold - _EPSILON)
+        pairs.extend(zip(rows[keep].tolist(), cols[keep].tolist(), np.minimum(cosines[keep], 1.0).tolist()))
+
+    pairs.sort()
+    tfidf_logger.info(
+        f"[done] {n} block/s, {columns} n-gram/s, {len(pairs)} pair/s at cosine >= {threshold} "
+        f"({'scipy' if sparse is not None else 'numpy'}, {tile_rows} row/s per tile)"
+    )
+    return pairs
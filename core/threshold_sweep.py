@@ -0,0 +1,212 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: threshold_sweep.py
+#
+# __brief__: Threshold tuning without re-running the analysis. Every pair scoring at least a floor
+#            is computed once and kept sorted by similarity, the pairs at any threshold t >= floor
+#            are a prefix of that order (one binary search), and the clone classes after every
+#            prefix are counted in the same single pass.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import json
+from typing import Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+from core.constants import SWEEP_FLOOR, SWEEP_STEP
+from core.clone_classes import _find_root
+from core.duplicated_finder import _find_jaccard_records
+from utils.logger import setup_logger
+
+# ==========
+threshold_sweep_logger = setup_logger(name="threshold_sweep.py_logger", log_file="threshold_sweep.log")
+# ==========
+
+threshold_sweep_logger.info("threshold_sweep_logger")
+
+
+class ThresholdSweep:
+    """_summary_
+
+    Note:
+        Pairs are (a, b, similarity) with a and b any hashable block id (table ids, function
+        names), "at threshold t" always means similarity >= t, as in the engines.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[Hashable, Hashable, float]], floor: float = SWEEP_FLOOR):
+        """_summary_
+
+        Args:
+            pairs (Iterable[Tuple[Hashable, Hashable, float]]): scored pairs, the ones under the floor are dropped
+            floor (float, optional): lowest threshold the sweep can answer for. Defaults to SWEEP_FLOOR.
+        """
+        self.floor = floor
+        kept = [pair for pair in pairs if pair[2] >= floor]
+        self._pairs = sorted(kept, key=lambda pair: -pair[2])
+        # descending similarities, negated so np.searchsorted sees them ascending
+        self._negated = -np.fromiter((sim for _, _, sim in self._pairs), dtype=np.float64, count=len(self._pairs))
+
+        # classes / blocks in a class after the first k pairs, for every k
+        self._classes = np.zeros(len(self._pairs) + 1, dtype=np.int64)
+        self._blocks = np.zeros(len(self._pairs) + 1, dtype=np.int64)
+        ids, parent = {}, []
+        classes = 0
+        for k, (a, b, _) in enumerate(self._pairs, start=1):
+            for block in (a, b):
+                if block not in ids:
+                    ids[block] = len(parent)
+                    parent.append(len(parent))
+                    classes += 1
+            root_a, root_b = _find_root(parent, ids[a]), _find_root(parent, ids[b])
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+                classes -= 1
+            self._classes[k], self._blocks[k] = classes, len(parent)
+
+        threshold_sweep_logger.info(f"[sweep] {len(self._pairs)} pair/s at similarity >= {floor}")
+
+    @classmethod
+    def from_source(cls, source_code: str, floor: float = SWEEP_FLOOR, **options) -> "ThresholdSweep":
+        """_summary_
+
+        Args:
+            source_code (str): source code to analyze
+            floor (float, optional): lowest threshold the sweep can answer for. Defaults to SWEEP_FLOOR.
+            **options: passed to the Jaccard engine, @see _find_jaccard_records()
+
+        Returns:
+            ThresholdSweep: sweep over the block pairs, ids are rows of self.table
+        """
+        table, records = _find_jaccard_records(source_code, threshold=floor, **options)
+        sweep = cls(((r["block1"], r["block2"], r["similarity"]) for r in records), floor)
+        sweep.table = table
+        return sweep
+
+    def _prefix(self, threshold: float) -> int:
+        """_summary_
+
+        Args:
+            threshold (float): similarity threshold, at least the floor
+
+        Raises:
+            ValueError: under the floor, pairs there were never kept
+
+        Returns:
+            int: number of pairs at the threshold
+        """
+        if threshold < self.floor:
+            raise ValueError(f"threshold {threshold} is under the sweep floor {self.floor}")
+        return int(np.searchsorted(self._negated, -threshold, side="right"))
+
+    def count(self, threshold: float) -> int:
+        """_summary_
+
+        Args:
+            threshold (float): similarity threshold
+
+        Returns:
+            int: number of duplicate pairs at the threshold
+        """
+        return self._prefix(threshold)
+
+    def pairs(self, threshold: float) -> List[Tuple[Hashable, Hashable, float]]:
+        """_summary_
+
+        Args:
+            threshold (float): similarity threshold
+
+        Returns:
+            List[Tuple[Hashable, Hashable, float]]: duplicate pairs at the threshold, most similar first
+        """
+        return self._pairs[: self._prefix(threshold)]
+
+    def clone_classes(self, threshold: float) -> int:
+        """_summary_
+
+        Args:
+            threshold (float): similarity threshold
+
+        Returns:
+            int: number of clone classes at the threshold, @see _clone_classes()
+        """
+        return int(self._classes[self._prefix(threshold)])
+
+    def cloned_blocks(self, threshold: float) -> int:
+        """_summary_
+
+        Args:
+            threshold (float): similarity threshold
+
+        Returns:
+            int: number of blocks in some clone class at the threshold
+        """
+        return int(self._blocks[self._prefix(threshold)])
+
+    def precision_table(self, thresholds: Iterable[float] = None, relevant: Iterable[tuple] = None) -> List[dict]:
+        """_summary_
+
+        Args:
+            thresholds (Iterable[float], optional): thresholds to report. Defaults to None
+                                                    (floor to 1.0 in SWEEP_STEP steps).
+            relevant (Iterable[tuple], optional): (a, b) pairs that really are clones (hand labels,
+                                                  another engine), in either order. Defaults to None.
+
+        Returns:
+            List[dict]: one {"threshold", "pairs", "clone_classes", "cloned_blocks", "precision",
+                        "recall"} row per threshold, precision and recall are None without labels
+        """
+        if thresholds is None:
+            thresholds = np.round(np.arange(self.floor, 1.0 + SWEEP_STEP / 2, SWEEP_STEP), 6)
+
+        hits = None
+        if relevant is not None:
+            relevant = {frozenset(pair) for pair in relevant}
+            hits = np.concatenate(([0], np.cumsum([frozenset((a, b)) in relevant for a, b, _ in self._pairs])))
+
+        rows = []
+        for threshold in thresholds:
+            k = self._prefix(float(threshold))
+            row = {
+                "threshold": float(threshold),
+                "pairs": k,
+                "clone_classes": int(self._classes[k]),
+                "cloned_blocks": int(self._blocks[k]),
+                "precision": None,
+                "recall": None,
+            }
+            if hits is not None:
+                row["precision"] = float(hits[k] / k) if k else 1.0
+                row["recall"] = float(hits[k] / len(relevant)) if relevant else 1.0
+            rows.append(row)
+        return rows
+
+    def export(self, path: str, thresholds: Iterable[float] = None, relevant: Iterable[tuple] = None) -> str:
+        """_summary_
+
+        Args:
+            path (str): json file to write
+            thresholds (Iterable[float], optional): @see precision_table(). Defaults to None.
+            relevant (Iterable[tuple], optional): @see precision_table(). Defaults to None.
+
+        Returns:
+            str: the path written
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as json_file:
+            json.dump({"floor": self.floor, "rows": self.precision_table(thresholds, relevant)}, json_file, indent=4)
+
+        threshold_sweep_logger.info(f"[export] precision table written to {path}")
+        return path
+
+    def __len__(self) -> int:
+        return len(self._pairs)
@@ -0,0 +1,397 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: token_stream.py
+#
+# __brief__: Token normalization shared by all the duplicate engines (VAR/NUM/STR abstraction),
+#            plus a whole-file token stream that keeps the line of every token.
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import io
+import ast
+import copy
+import tokenize
+from bisect import bisect_left, bisect_right
+
+from utils.logger import setup_logger
+
+# ==========
+token_stream_logger = setup_logger(
+    name="token_stream.py_logger", log_file="token_stream.log"
+)
+# ==========
+
+token_stream_logger.info("token_stream_logger")
+
+KEPT_NAMES = {"True", "False", "None"}
+KEPT_KEYWORDS = {"def", "return", "if", "else", "for", "while", "with", "try", "except", "finally"}
+
+BINOP_TOKENS = {
+    ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/",
+    ast.Mod: "%", ast.Pow: "**", ast.FloorDiv: "//"
+}
+CMP_TOKENS = {
+    ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=",
+    ast.Gt: ">", ast.GtE: ">=", ast.Is: "is", ast.IsNot: "is not",
+    ast.In: "in", ast.NotIn: "not in"
+}
+UNARY_TOKENS = {
+    ast.UAdd: "+", ast.USub: "-", ast.Not: "not", ast.Invert: "~"
+}
+
+# tokens that don't belong to a logical line
+_LAYOUT_TOKENS = frozenset(
+    (tokenize.INDENT, tokenize.DEDENT, tokenize.NL, tokenize.COMMENT, tokenize.ENDMARKER)
+)
+
+# statement lists a compound statement can own, in _fields order
+_STMT_LIST_FIELDS = ("body", "orelse", "finalbody")
+
+
+def _normalize_token(tok_type: int, tok_str: str):
+    """_summary_
+
+    Args:
+        tok_type (int): token type from the tokenize module
+        tok_str (str): raw token string
+
+    Returns:
+        str | None: normalized token, or None if the token is not used for comparison
+    """
+    if tok_type == tokenize.NAME:
+        if tok_str in KEPT_NAMES or tok_str in KEPT_KEYWORDS:
+            return tok_str
+        return "VAR"
+    if tok_type == tokenize.STRING:
+        return "STR"
+    if tok_type == tokenize.NUMBER:
+        return "NUM"
+    if tok_type == tokenize.OP:
+        return tok_str
+    if tok_type == tokenize.NEWLINE:
+        return "NEWLINE"
+    return None
+
+
+def _file_token_stream(source_code: str) -> list:
+    """_summary_
+
+    Args:
+        source_code (str): whole file
+
+    Returns:
+        list: list of (normalized, raw, line_number) tuples, cut short if the file
+              can't be fully tokenized
+    """
+    stream = []
+    try:
+        for tok_type, tok_str, start, *_ in tokenize.generate_tokens(io.StringIO(source_code).readline):
+            normalized = _normalize_token(tok_type, tok_str)
+            if normalized is not None:
+                stream.append((normalized, tok_str, start[0]))
+    except (tokenize.TokenError, IndentationError) as e:
+        token_stream_logger.warning(f"Tokenization stopped early after {len(stream)} tokens: {e}")
+    return stream
+
+
+def _walk(tree: ast.AST) -> list:
+    """_summary_
+
+    Note:
+        Same nodes in the same (breadth first) order as ast.walk(), without the deque and the
+        two generator layers of ast.iter_child_nodes() per node.
+
+    Args:
+        tree (ast.AST): root node
+
+    Returns:
+        list: every node of the tree
+    """
+    nodes = [tree]
+    AST = ast.AST
+    for node in nodes:
+        for name in node._fields:
+            value = getattr(node, name, None)
+            if isinstance(value, AST):
+                nodes.append(value)
+            elif isinstance(value, list):
+                nodes.extend(item for item in value if isinstance(item, AST))
+    return nodes
+
+
+def _ast_tokens(tree: ast.AST) -> list:
+    """_summary_
+
+    Args:
+        tree (ast.AST): parsed block (or a Module built from some of the file's statements)
+
+    Returns:
+        list: list of AST tokens, in ast.walk() (breadth first) order
+    """
+    ast_tokens = []
+    for node in _walk(tree):
+        match type(node):
+            case ast.FunctionDef | ast.AsyncFunctionDef:
+                ast_tokens.append("def")
+                ast_tokens.append("VAR")
+                ast_tokens.extend(["VAR"] * len(node.args.args))
+            case ast.Call:
+                ast_tokens.append("call")
+                ast_tokens.append("VAR")
+            case ast.Assign | ast.AnnAssign:
+                ast_tokens.append("=")
+            case ast.BinOp:
+                ast_tokens.append(BINOP_TOKENS.get(type(node.op), "BINOP"))
+            case ast.UnaryOp:
+                ast_tokens.append(UNARY_TOKENS.get(type(node.op), "UNARYOP"))
+            case ast.Compare:
+                for op in node.ops:
+                    ast_tokens.append(CMP_TOKENS.get(type(op), "CMP"))
+            case ast.Return:
+                ast_tokens.append("return")
+            case ast.Constant:
+                if isinstance(node.value, str):
+                    ast_tokens.append("STR")
+                elif isinstance(node.value, (int, float)):
+                    ast_tokens.append("NUM")
+                elif node.value is None:
+                    ast_tokens.append("None")
+                elif isinstance(node.value, bool):
+                    ast_tokens.append(str(node.value))
+            case ast.Name:
+                ast_tokens.append("VAR")
+            case ast.If | ast.For | ast.While | ast.With | ast.Try:
+                ast_tokens.append(node.__class__.__name__.lower())
+            case _:
+                pass
+
+    return ast_tokens
+
+
+def _line_token_table(text: str) -> tuple:
+    """_summary_
+
+    Note:
+        One tokenize pass over the whole file, the tokens of any line range can then be
+        sliced out instead of tokenizing every block again. If tokenize gives up half way
+        (unterminated string, bad unindent) everything before the broken statement is kept.
+
+    Args:
+        text (str): whole (normalized) file
+
+    Returns:
+        tuple: (normalized tokens, line of every token, lines that start a logical line, lines that
+                end a logical line, lines a logical line continues past, last usable line)
+    """
+    tokens, token_lines = [], []
+    starts, ends, open_lines = set(), set(), set()
+    logical_start = None
+    last_line = len(text.splitlines())
+    try:
+        for tok_type, tok_str, (line, _), _, _ in tokenize.generate_tokens(io.StringIO(text).readline):
+            if tok_type in _LAYOUT_TOKENS:
+                continue
+            if logical_start is None:
+                logical_start = line
+                starts.add(line)
+
+            normalized = _normalize_token(tok_type, tok_str)
+            if normalized is not None:
+                tokens.append(normalized)
+                token_lines.append(line)
+            if tok_type == tokenize.NEWLINE:
+                ends.add(line)
+                if line > logical_start:
+                    open_lines.update(range(logical_start, line))
+                logical_start = None
+    except (tokenize.TokenError, SyntaxError) as e:
+        error_line = e.lineno if isinstance(e, SyntaxError) else e.args[1][0]
+        last_line = min(error_line, logical_start or error_line) - 1
+        starts = {line for line in starts if line <= last_line}
+        token_stream_logger.warning(f"File level tokenization stopped at line {last_line + 1}: {e}")
+    return tokens, token_lines, starts, ends, open_lines, last_line
+
+
+def _slice_line_tokens(table: tuple, start: int, end: int):
+    """_summary_
+
+    Args:
+        table (tuple): @see _line_token_table()
+        start (int): first line of the block
+        end (int): last line of the block
+
+    Returns:
+        list | None: the block's tokens, ["TOKEN_ERROR"] if the block stops in the middle of a
+                     statement (unclosed bracket), None if the block doesn't start on a statement
+                     or lies past the point where the file stopped tokenizing
+    """
+    tokens, token_lines, starts, ends, open_lines, last_line = table
+    if start not in starts or end > last_line:
+        return None
+    if end in open_lines:
+        return ["TOKEN_ERROR"]
+    if end not in ends:
+        return None
+    return tokens[bisect_left(token_lines, start) : bisect_right(token_lines, end)]
+
+
+def _statement_index(tree: ast.Module) -> dict:
+    """_summary_
+
+    Args:
+        tree (ast.Module): the file's AST
+
+    Returns:
+        dict: line -> (outermost statement starting on that line, its sibling list, its position)
+    """
+    index = {}
+    pending = [tree.body]
+    while pending:
+        stmts = pending.pop()
+        for pos, stmt in enumerate(stmts):
+            index.setdefault(stmt.lineno, (stmt, stmts, pos))
+            for field in _STMT_LIST_FIELDS:
+                children = getattr(stmt, field, None)
+                if children:
+                    pending.append(children)
+            for handler in getattr(stmt, "handlers", ()):
+                pending.append(handler.body)
+            for case in getattr(stmt, "cases", ()):
+                pending.append(case.body)
+    return index
+
+
+def _chunked_statement_index(text: str, starts: set) -> dict:
+    """_summary_
+
+    Note:
+        Used when the file as a whole doesn't parse (e.g. a function whose only statement was a
+        docstring, now removed). Every top-level statement is parsed on its own, so one broken
+        function only costs the blocks inside it.
+
+    Args:
+        text (str): whole (normalized) file
+        starts (set): lines that start a logical line, @see _line_token_table()
+
+    Returns:
+        dict: @see _statement_index(), without the statements that didn't parse
+    """
+    lines = text.splitlines(keepends=True)
+    cuts = sorted(line for line in starts if not lines[line - 1][:1].isspace())
+    index = {}
+    for first, stop in zip(cuts, cuts[1:] + [len(lines) + 1]):
+        try:
+            tree = ast.parse("".join(lines[first - 1 : stop - 1]))
+        except SyntaxError:
+            continue
+        ast.increment_lineno(tree, first - 1)
+        index.update(_statement_index(tree))
+    return index
+
+
+def _statement_start(stmt: ast.stmt) -> int:
+    """_summary_
+
+    Args:
+        stmt (ast.stmt): statement
+
+    Returns:
+        int: first line of the statement, decorators included
+    """
+    decorators = getattr(stmt, "decorator_list", ())
+    return min([stmt.lineno] + [d.lineno for d in decorators])
+
+
+def _truncate_statement(stmt: ast.stmt, start: int, end: int):
+    """_summary_
+
+    Note:
+        What ast.parse() would give for a compound statement cut off after line `end`,
+        i.e. a header followed by only the first few statements of its body.
+
+    Args:
+        stmt (ast.stmt): compound statement from the file's AST
+        start (int): first line of the block
+        end (int): last line of the block
+
+    Returns:
+        tuple | None: (truncated copy, last line it covers), None if it can't be cut there cleanly
+    """
+    if not hasattr(stmt, "body") or getattr(stmt, "handlers", None) or getattr(stmt, "cases", None):
+        return None
+
+    truncated = copy.copy(stmt)
+    covered = stmt.lineno
+    for field in _STMT_LIST_FIELDS:
+        children = getattr(stmt, field, None)
+        if not children:
+            continue
+        kept = []
+        for child in children:
+            if _statement_start(child) > end:
+                break
+            if child.end_lineno > end:
+                return None
+            kept.append(child)
+            covered = max(covered, child.end_lineno)
+        setattr(truncated, field, kept)
+
+    if not truncated.body:
+        return None
+    if hasattr(stmt, "decorator_list"):
+        truncated.decorator_list = [d for d in stmt.decorator_list if d.lineno >= start]
+    return truncated, covered
+
+
+def _block_module(index: dict, start: int, end: int):
+    """_summary_
+
+    Args:
+        index (dict): @see _statement_index()
+        start (int): first line of the block
+        end (int): last line of the block
+
+    Returns:
+        ast.Module | None: the same tree ast.parse() would build for the block on its own,
+                           None if the block doesn't line up with the file's statements
+    """
+    entry = index.get(start)
+    if entry is None:
+        return None
+
+    first, siblings, pos = entry
+    body = []
+    covered = start - 1
+    for stmt in siblings[pos:]:
+        stmt_start = start if stmt is first else _statement_start(stmt)
+        if stmt_start > end:
+            break
+        if stmt_start not in (covered, covered + 1):
+            return None
+
+        if stmt.end_lineno <= end:
+            node = stmt
+            if stmt is first and getattr(stmt, "decorator_list", None):
+                node = copy.copy(stmt)
+                node.decorator_list = [d for d in stmt.decorator_list if d.lineno >= start]
+            body.append(node)
+            covered = stmt.end_lineno
+            continue
+
+        truncated = _truncate_statement(stmt, start, end)
+        if truncated is None:
+            return None
+        node, covered = truncated
+        body.append(node)
+        break
+
+    if covered != end or not body:
+        return None
+    return ast.Module(body=body, type_ignores=[])
@@ -26,6 +26,7 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from core.halstead import _calculate_halstead_metrics, _extract_operators_and_operands
+from core.function_metrics import _function_metrics
 from utils.logger import setup_logger
 from utils.utility import _save_to_json
 from utils.exceptions import CodeProcessingError
@@ -74,14 +75,10 @@ def extract_metrics(file_path: Path) -> Dict[str, float]:
         lines = _extract_operators_and_operands(source_code)
         halstead_metrics = _calculate_halstead_metrics(lines)
 
-        cyclo_sum = 0
-        func_count = 0
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                cyclo = _calculate_cyclomatic_complexity(node)
-                if cyclo != -9999:
-                    cyclo_sum += cyclo
-                    func_count += 1
+        # one walk, nested functions are measured on their own, @see core.function_metrics
+        complexities = [f["complexity"] for f in _function_metrics(tree)]
+        cyclo_sum = sum(complexities)
+        func_count = len(complexities)
         avg_cyclo = cyclo_sum / func_count if func_count > 0 else 1.0
         if func_count == 0:
             trend_logger.warning(
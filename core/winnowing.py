@@ -0,0 +1,253 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+#
+# __file__: winnowing.py
+#
+# __brief__: Winnowing (MOSS) clone engine. The normalized token stream is hashed k tokens at a time,
+#            every window of w hashes keeps its minimum, and the kept hashes go into a hash -> locations
+#            index. Matches come from index lookups and are grown to the full matching region, so a
+#            small clone inside two big blocks is found, in one file or across files.
+#
+#            @see Schleimer et al., "Winnowing: Local Algorithms for Document Fingerprinting"
+
+import os
+# =========
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+from typing import Dict, List
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.constants import WINNOW_K, WINNOW_GUARANTEE, WINNOW_MAX_POSTINGS
+from core.token_stream import _file_token_stream
+from utils.logger import setup_logger
+
+# ==========
+winnowing_logger = setup_logger(name="winnowing.py_logger", log_file="winnowing.log")
+# ==========
+
+winnowing_logger.info("winnowing_logger")
+
+# odd 64 bit multiplier of the rolling hash, arithmetic wraps mod 2^64
+_HASH_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _kgram_hashes(ids: np.ndarray, k: int = WINNOW_K) -> np.ndarray:
+    """_summary_
+
+    Args:
+        ids (np.ndarray): token ids
+        k (int, optional): tokens per k-gram. Defaults to WINNOW_K.
+
+    Returns:
+        np.ndarray: uint64 hash of the k-gram starting at every position (len(ids) - k + 1 of them)
+    """
+    n = len(ids) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint64)
+
+    values = ids.astype(np.uint64) + np.uint64(1)
+    hashes = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset in range(k):
+            hashes = hashes * _HASH_BASE + values[offset : offset + n]
+    return hashes
+
+
+def _winnow(hashes: np.ndarray, window: int) -> np.ndarray:
+    """_summary_
+
+    Note:
+        The rightmost minimum of every window is kept, so neighbouring windows that share their
+        minimum keep the same position and it's recorded once.
+
+    Args:
+        hashes (np.ndarray): k-gram hashes, @see _kgram_hashes()
+        window (int): hashes per window
+
+    Returns:
+        np.ndarray: sorted positions of the selected hashes
+    """
+    if len(hashes) == 0:
+        return np.empty(0, dtype=np.int64)
+    window = max(1, min(window, len(hashes)))
+
+    windows = sliding_window_view(hashes, window)
+    rightmost = window - 1 - np.argmin(windows[:, ::-1], axis=1)
+    return np.unique(np.arange(len(windows)) + rightmost)
+
+
+def _winnow_index(streams: List[np.ndarray], k: int = WINNOW_K, guarantee: int = WINNOW_GUARANTEE) -> dict:
+    """_summary_
+
+    Note:
+        Every shared run of at least guarantee tokens has a window of w = guarantee - k + 1 hashes
+        entirely inside it, so both copies keep at least one equal hash.
+
+    Args:
+        streams (List[np.ndarray]): token ids of every file, from one shared vocabulary
+        k (int, optional): tokens per k-gram. Defaults to WINNOW_K.
+        guarantee (int, optional): shortest run that is always found. Defaults to WINNOW_GUARANTEE.
+
+    Returns:
+        dict: hash -> list of (file, position) locations
+    """
+    index = {}
+    for file_id, ids in enumerate(streams):
+        hashes = _kgram_hashes(ids, k)
+        for pos in _winnow(hashes, guarantee - k + 1).tolist():
+            index.setdefault(int(hashes[pos]), []).append((file_id, pos))
+    return index
+
+
+def _winnow_regions(
+    streams: List[np.ndarray],
+    index: dict,
+    k: int = WINNOW_K,
+    guarantee: int = WINNOW_GUARANTEE,
+    max_postings: int = WINNOW_MAX_POSTINGS,
+) -> list:
+    """_summary_
+
+    Note:
+        Every pair of locations sharing a fingerprint is a seed, a seed is grown both ways while
+        the tokens keep matching. Seeds on the same diagonal that the last region already covers
+        are skipped, and so are fingerprints with more than max_postings locations (boilerplate).
+
+    Args:
+        streams (List[np.ndarray]): token ids of every file
+        index (dict): @see _winnow_index()
+        k (int, optional): tokens per k-gram. Defaults to WINNOW_K.
+        guarantee (int, optional): shortest region reported. Defaults to WINNOW_GUARANTEE.
+        max_postings (int, optional): most locations of a fingerprint still looked at. Defaults to WINNOW_MAX_POSTINGS.
+
+    Returns:
+        list: sorted (file_a, start_a, file_b, start_b, length) regions, (file_a, start_a) first
+    """
+    seeds = set()
+    for locations in index.values():
+        if len(locations) < 2 or len(locations) > max_postings:
+            continue
+        for x in range(len(locations)):
+            for y in range(x + 1, len(locations)):
+                seeds.add(locations[x] + locations[y])
+
+    tokens = [ids.tolist() for ids in streams]
+    covered = {}
+    regions = []
+    for fa, a, fb, b in sorted(seeds, key=lambda s: (s[0], s[2], s[3] - s[1], s[1])):
+        diagonal = (fa, fb, b - a)
+        if a < covered.get(diagonal, -1):
+            continue
+
+        A, B = tokens[fa], tokens[fb]
+        while a > 0 and b > 0 and A[a - 1] == B[b - 1]:
+            a, b = a - 1, b - 1
+        length = 0
+        while a + length < len(A) and b + length < len(B) and A[a + length] == B[b + length]:
+            length += 1
+        covered[diagonal] = a + length
+
+        if fa == fb:
+            length = min(length, b - a)  # a region can't overlap its own copy
+        if length >= guarantee:
+            regions.append((fa, a, fb, b, length))
+
+    regions.sort()
+    return regions
+
+
+def _describe_region(stream: list, lines: list, pos: int, length: int) -> dict:
+    """_summary_
+
+    Args:
+        stream (list): (normalized, raw, line_number) tokens of the file, @see _file_token_stream()
+        lines (list): lines of the file
+        pos (int): first token of the region
+        length (int): tokens in the region
+
+    Returns:
+        dict: one side of a duplicate pair, same shape as the other engines
+    """
+    start_line, end_line = stream[pos][2], stream[pos + length - 1][2]
+    return {
+        "index": pos,
+        "text": "\n".join(lines[start_line - 1 : end_line]),
+        "type": "code",
+        "tokens": [norm for norm, _, _ in stream[pos : pos + length]],
+        "line_number": start_line,
+        "end_line": end_line,
+    }
+
+
+def _find_winnow_matches(
+    sources: Dict[str, str], k: int = WINNOW_K, guarantee: int = WINNOW_GUARANTEE
+) -> list:
+    """_summary_
+
+    Args:
+        sources (Dict[str, str]): file name -> source code
+        k (int, optional): tokens per k-gram. Defaults to WINNOW_K.
+        guarantee (int, optional): shortest matching run reported (and always found). Defaults to WINNOW_GUARANTEE.
+
+    Returns:
+        list: duplicate pairs with a "file" on both blocks, plus "clone_type" and "length" in tokens
+    """
+    if guarantee < k:
+        raise ValueError(f"guarantee ({guarantee}) can't be shorter than a k-gram ({k})")
+
+    names = list(sources)
+    token_streams = [_file_token_stream(sources[name]) for name in names]
+    vocab = {}
+    streams = [
+        np.fromiter((vocab.setdefault(norm, len(vocab)) for norm, _, _ in stream), dtype=np.int64, count=len(stream))
+        for stream in token_streams
+    ]
+
+    index = _winnow_index(streams, k, guarantee)
+    regions = _winnow_regions(streams, index, k, guarantee)
+    lines = [sources[name].splitlines() for name in names]
+
+    duplicates = []
+    for fa, a, fb, b, length in regions:
+        raw_a = [raw for _, raw, _ in token_streams[fa][a : a + length]]
+        raw_b = [raw for _, raw, _ in token_streams[fb][b : b + length]]
+        duplicates.append(
+            {
+                "block1": {"file": names[fa], **_describe_region(token_streams[fa], lines[fa], a, length)},
+                "block2": {"file": names[fb], **_describe_region(token_streams[fb], lines[fb], b, length)},
+                "similarity": 1.0,
+                "threshold": 1.0,
+                "clone_type": 1 if raw_a == raw_b else 2,
+                "length": length,
+            }
+        )
+
+    winnowing_logger.info(
+        f"[done] {len(names)} file/s, {len(index)} fingerprint/s, {len(duplicates)} matching region/s"
+    )
+    return duplicates
+
+
+def _find_winnow_clones(source_code: str, k: int = WINNOW_K, guarantee: int = WINNOW_GUARANTEE) -> list:
+    """_summary_
+
+    Args:
+        source_code (str): source code to analyze
+        k (int, optional): tokens per k-gram. Defaults to WINNOW_K.
+        guarantee (int, optional): shortest matching run reported. Defaults to WINNOW_GUARANTEE.
+
+    Returns:
+        list: duplicate pairs in the same shape as the suffix engine, @see _find_winnow_matches()
+    """
+    winnowing_logger.info("[starting] _find_winnow_clones()")
+
+    duplicates = _find_winnow_matches({"": source_code}, k, guarantee)
+    for dup in duplicates:
+        del dup["block1"]["file"], dup["block2"]["file"]
+    return duplicates
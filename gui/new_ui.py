@@ -39,6 +39,7 @@ from rich.markdown import Markdown
 from core.file_saver import save_refactored_file
 from core.refactor import refactor_duplicates
 from core.code_smells import find_code_smells
+from core.block_index import BlockIndex
 from core.trend_analysis import markdown_fmt
 
 from utils.utility import _read_file_contents
@@ -202,6 +203,10 @@ class CodeSmellApp(App):
 
     chosen_path = None
 
+    # index of the editor text, rebuilt only when the text changed since the last "Find similar"
+    _block_index = None
+    _block_index_text = None
+
     def compose(self) -> ComposeResult:
         """_summary_
 
@@ -222,6 +227,7 @@ class CodeSmellApp(App):
                     yield Button("Analyze", id="analyze")
                     yield Button("Trends (β)", id="trends")
                     yield Button("Refactor", id="refactor")
+                    yield Button("Find similar", id="find_similar")
                     yield Button("Save", id="save")
                     yield Button("Clear", id="clear")
                     # yield Button("Theme", id="toggle_theme") -> doesn't work great
@@ -254,7 +260,8 @@ class CodeSmellApp(App):
             "\t1. Click 'Upload' to select a Python file (*.py).\n"
             "\t2. Use 'Analyze' to detect code smells and get a Markdown Report.\n"
             "\t3. Use 'Refactor' to clean up duplicates.\n"
-            "\t4. Save or clear your work as needed.\n"
+            "\t4. Select code and use 'Find similar' to list its near copies.\n"
+            "\t5. Save or clear your work as needed.\n"
         )
         # clean_dirs(are_you_sure=True)  # IMPORTANT: deletes recent logs, reports,...
         #     essentially starts from scratch
@@ -268,6 +275,9 @@ class CodeSmellApp(App):
         elif btn == "trends":
             self.trends()
 
+        elif btn == "find_similar":
+            self.find_similar()
+
         elif btn == "clear":
             await self.push_screen(
                 ConfirmationDialog(
@@ -471,6 +481,46 @@ class CodeSmellApp(App):
             log.write(f" Analysis failed: {str(e)}")
             new_ui.error(f"Unexpected error during analysis: {e}", exc_info=True)
 
+    def find_similar(self):
+        """_summary_
+
+        Brief:
+            Looks up the blocks of the editor that are most similar to the selected code.
+            The selection itself is left out, results go to the log.
+        """
+        log = self.query_one("#log", RichLog)
+        code_editor = self.query_one("#code_editor", TextArea)
+
+        snippet = code_editor.selected_text
+        if not snippet.strip():
+            log.write("Select some code in the editor first.")
+            return
+        try:
+            if self._block_index is None or self._block_index_text != code_editor.text:
+                self._block_index = BlockIndex(code_editor.text)
+                self._block_index_text = code_editor.text
+
+            start, end = sorted((code_editor.selection.start, code_editor.selection.end))
+            matches = self._block_index.query(snippet, exclude=(start[0] + 1, end[0] + 1))
+
+            if not matches:
+                log.write("No similar blocks found.")
+                return
+
+            log.write(
+                Markdown(
+                    "### Similar blocks\n\n"
+                    + "\n".join(
+                        f"- lines {m['line_number']}-{m['end_line']}: {m['similarity']:.0%} similar"
+                        for m in matches
+                    )
+                )
+            )
+
+        except Exception as e:
+            log.write(f" Find similar failed: {str(e)}")
+            new_ui.error(f"Unexpected error during find similar: {e}", exc_info=True)
+
     def refactor(self, use_wrapper: bool = True):
         """_summary_
 
@@ -0,0 +1,657 @@
+# __name__: Jakob Balkovec
+# __class__: CPSC 4260 - Software Refactoring
+# __date__: Sun Oct 18th, 2026
+# __file__: benchmarks.py
+# __brief__: quick and dirty benchmarks for the analysis pipeline, run against the tests/ corpus
+
+# TO RUN: python playground/benchmarks.py <name>   (no name runs all of them)
+
+# =========
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# =========
+
+import ast
+import time
+import random
+import tempfile
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from core.constants import BATCH_WORKERS, DUPS_WORKERS, SIMHASH_RADIUS
+from core.duplicated_finder import (
+    _find_duplicated_code,
+    _find_jaccard_records,
+    _hierarchical_search,
+    iter_duplicates,
+    _remove_comments,
+    _split_into_blocks,
+    _tokenize_valid_blocks,
+    _tokenize_block,
+    _generate_ngrams,
+    _find_duplicate_records,
+)
+from core.fingerprint import (
+    _ngram_fingerprint,
+    _ngram_hashes,
+    _fingerprint_similarity,
+    _stack_fingerprints,
+    _row_similarities,
+)
+from core.dup_cache import DUPLICATE_CACHE
+from core.similarity_join import _similarity_join
+from core.parallel_scoring import _pair_similarities, _row_similarity_arrays
+from core.simhash import SimHashIndex
+from core.block_index import BlockIndex
+from core.tfidf import _cosine_pairs
+from core.threshold_sweep import ThresholdSweep
+from core.parsed_source import ParsedSource
+from core.method_length import _find_long_method
+from core.param_length import _find_long_parameter_list
+from core.code_metrics import fetch_code_metrics
+from core.halstead import fetch_halstead_metrics
+from core.function_metrics import _function_metrics, _long_methods, _long_parameter_lists
+from core.trend_analysis import _calculate_cyclomatic_complexity
+from core.detectors import _run_detectors
+from core.code_smells import find_code_smells, find_code_smells_many
+from core.analysis_cache import AnalysisCache
+import core.tfidf as tfidf
+from core.clone_classes import _clone_classes
+from utils.utility import _read_file_contents, _save_to_json, _generate_readable_report
+
+TESTS_DIR = Path(__file__).resolve().parent.parent / "tests"
+
+
+def _corpus() -> dict:
+    """_summary_
+
+    Returns:
+        dict: file name -> source code, for every tests/test*.py file
+    """
+    return {
+        path.name: _read_file_contents(str(path))
+        for path in sorted(TESTS_DIR.glob("test*.py"))
+    }
+
+
+def _timed(func, *args, **kwargs):
+    """_summary_
+
+    Returns:
+        tuple: (result, seconds)
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _pair_keys(duplicates: list) -> set:
+    return {(d["block1"]["index"], d["block2"]["index"]) for d in duplicates}
+
+
+def bench_lsh() -> None:
+    """
+    Brief:
+        Recall and speed of the MinHash/LSH candidate stage vs. the exhaustive loop.
+        Every file is run on its own, then all of them glued together (more blocks).
+    """
+    corpus = _corpus()
+    corpus["<all files>"] = "\n".join(corpus.values())
+
+    print(f"{'file':<16}{'pairs':>8}{'found':>8}{'recall':>9}{'exhaustive':>13}{'lsh':>10}")
+    total_exact, total_found = 0, 0
+    for name, source in corpus.items():
+        exact, t_exact = _timed(_find_duplicated_code, source, use_lsh=False, use_cache=False)
+        approx, t_lsh = _timed(_find_duplicated_code, source, use_lsh=True, use_cache=False)
+
+        exact_keys, approx_keys = _pair_keys(exact), _pair_keys(approx)
+        found = len(exact_keys & approx_keys)
+        recall = found / len(exact_keys) if exact_keys else 1.0
+        total_exact += len(exact_keys)
+        total_found += found
+
+        print(f"{name:<16}{len(exact_keys):>8}{found:>8}{recall:>9.3f}{t_exact:>12.3f}s{t_lsh:>9.3f}s")
+
+    overall = total_found / total_exact if total_exact else 1.0
+    print(f"\noverall recall: {overall:.3f} ({total_found}/{total_exact})")
+
+
+def _all_blocks_tokens() -> list:
+    source = _remove_comments("\n".join(_corpus().values()))
+    return [tokens for tokens, _, _ in _tokenize_valid_blocks(_split_into_blocks(source), source)]
+
+
+def _set_jaccard(ngrams1: set, ngrams2: set) -> float:
+    union = ngrams1 | ngrams2
+    return len(ngrams1 & ngrams2) / len(union) if union else 0.0
+
+
+def bench_fingerprint() -> None:
+    """
+    Brief:
+        All-pairs scoring of the glued corpus: n-gram sets rebuilt for every pair (the old
+        _jaccard_similarity()), sets built once per block, uint64 fingerprints built once and
+        scored per pair, and the same fingerprints scored a whole row at a time.
+        Plus the memory a block's n-grams take in each form.
+    """
+    blocks = _all_blocks_tokens()
+    pairs = [(i, j) for i in range(len(blocks)) for j in range(i + 1, len(blocks))]
+
+    def rebuilt():
+        return [_set_jaccard(_generate_ngrams(blocks[i]), _generate_ngrams(blocks[j])) for i, j in pairs]
+
+    def sets_once():
+        sets = [_generate_ngrams(tokens) for tokens in blocks]
+        return [_set_jaccard(sets[i], sets[j]) for i, j in pairs]
+
+    def fingerprints_once():
+        fps = [_ngram_fingerprint(tokens) for tokens in blocks]
+        return [_fingerprint_similarity(fps[i], fps[j]) for i, j in pairs]
+
+    def fingerprint_rows():
+        stacked = _stack_fingerprints([_ngram_fingerprint(tokens) for tokens in blocks])
+        return [sim for i in range(len(blocks)) for sim in _row_similarities(stacked, i)]
+
+    expected, t_rebuilt = _timed(rebuilt)
+    same_sets, t_sets = _timed(sets_once)
+    same_fps, t_fps = _timed(fingerprints_once)
+    same_rows, t_rows = _timed(fingerprint_rows)
+    assert expected == same_sets == same_fps == same_rows
+
+    sets = [_generate_ngrams(tokens) for tokens in blocks]
+    set_bytes = sum(sys.getsizeof(s) + sum(sys.getsizeof(g) for g in s) for s in sets)
+    fp_bytes = sum(_ngram_fingerprint(tokens).nbytes for tokens in blocks)
+
+    print(f"{len(blocks)} blocks, {len(pairs)} pairs (scores identical)")
+    print(f"{'rebuilt per pair':<22}{t_rebuilt:>9.3f}s")
+    print(f"{'sets once':<22}{t_sets:>9.3f}s")
+    print(f"{'fingerprints once':<22}{t_fps:>9.3f}s")
+    print(f"{'fingerprint rows':<22}{t_rows:>9.3f}s")
+    print(f"n-gram memory per block: sets {set_bytes / len(blocks):,.0f} B, fingerprints {fp_bytes / len(blocks):,.0f} B")
+
+
+def bench_join() -> None:
+    """
+    Brief:
+        Exact similarity join (length / prefix / positional filters) vs. scoring every pair with
+        fingerprint rows, at a few thresholds, on the glued corpus and on generated code.
+    """
+    sources = {"corpus": "\n".join(_corpus().values()), "generated": _synthetic_source(400_000)}
+    print(f"{'source':<11}{'t':>5}{'pairs':>9}{'length':>9}{'prefix':>9}{'position':>9}{'scored':>8}{'rows':>9}{'join':>9}")
+    for name, source in sources.items():
+        cleaned = _remove_comments(source)
+        blocks = [tokens for tokens, _, _ in _tokenize_valid_blocks(_split_into_blocks(cleaned), cleaned)]
+        fps = [_ngram_fingerprint(tokens) for tokens in blocks]
+
+        for threshold in (0.5, 0.76, 0.9):
+            def all_rows():
+                stacked = _stack_fingerprints(fps)
+                return [
+                    (i, j)
+                    for i in range(len(fps))
+                    for j, sim in enumerate(_row_similarities(stacked, i), start=i + 1)
+                    if sim >= threshold
+                ]
+
+            def joined():
+                candidates, pruned = _similarity_join(fps, threshold)
+                found = [(i, j) for i, j in candidates if _fingerprint_similarity(fps[i], fps[j]) >= threshold]
+                return found, pruned
+
+            expected, t_rows = _timed(all_rows)
+            (found, pruned), t_join = _timed(joined)
+            assert found == expected
+
+            print(
+                f"{name:<11}{threshold:>5}{pruned['pairs']:>9}{pruned['length']:>9}{pruned['prefix']:>9}"
+                f"{pruned['positional']:>9}{pruned['candidates']:>8}{t_rows:>8.3f}s{t_join:>8.3f}s"
+            )
+
+
+def bench_cache() -> None:
+    """
+    Brief:
+        Analyze, edit one line, analyze again (what the GUI does) on the glued corpus, with and
+        without the block / pair cache.
+    """
+    source = "\n".join(_corpus().values())
+    lines = source.splitlines()
+    middle = next(n for n in range(len(lines) // 2, len(lines)) if lines[n].strip().startswith("return"))
+    edited = "\n".join(lines[:middle] + [lines[middle] + " + 1"] + lines[middle + 1 :])
+
+    DUPLICATE_CACHE.clear()
+    uncached, t_uncached = _timed(_find_duplicated_code, edited, use_cache=False)
+    _, t_cold = _timed(_find_duplicated_code, source)
+    _, t_warm = _timed(_find_duplicated_code, source)
+    cached, t_edit = _timed(_find_duplicated_code, edited)
+    assert cached == uncached
+
+    print(f"{'uncached':<22}{t_uncached:>9.3f}s")
+    print(f"{'cold cache':<22}{t_cold:>9.3f}s")
+    print(f"{'unchanged rerun':<22}{t_warm:>9.3f}s")
+    print(f"{'one line edited':<22}{t_edit:>9.3f}s")
+    print(f"cache: {DUPLICATE_CACHE.stats()}")
+
+
+def _synthetic_source(size: int, seed: int = 4260) -> str:
+    """_summary_
+
+    Args:
+        size (int): rough size of the source in bytes
+        seed (int, optional): random seed. Defaults to 4260.
+
+    Returns:
+        str: random, mostly non-duplicated functions (so the output stays small and the
+             pipeline itself is measured)
+    """
+    rng = random.Random(seed)
+    ops = ["+", "-", "*", "/", "%", "//", "**", "&", "|", "^", "<<", ">>"]
+    cmps = ["<", ">", "==", "!=", "<=", ">=", "in", "not in", "is", "is not"]
+    names = ["a", "b", "c", "total", "item"]
+
+    def expr(depth: int) -> str:
+        kind = rng.random()
+        if depth == 0 or kind < 0.15:
+            return rng.choice(names + [str(rng.randint(0, 99)), "'s'", "None", "True"])
+        if kind < 0.45:
+            return f"({expr(depth - 1)} {rng.choice(ops)} {expr(depth - 1)})"
+        if kind < 0.6:
+            args = ", ".join(expr(depth - 1) for _ in range(rng.randint(0, 3)))
+            return f"{rng.choice(names)}.{rng.choice(['get', 'pop', 'join', 'split'])}({args})"
+        if kind < 0.7:
+            return f"{rng.choice(names)}[{expr(depth - 1)}]"
+        if kind < 0.8:
+            return f"[{', '.join(expr(depth - 1) for _ in range(rng.randint(1, 3)))}]"
+        if kind < 0.9:
+            return f"{rng.choice(['-', 'not ', '~'])}{expr(depth - 1)}"
+        return f"{expr(depth - 1)} if {expr(depth - 1)} else {expr(depth - 1)}"
+
+    def statement(pad: str) -> str:
+        kind = rng.random()
+        if kind < 0.4:
+            return f"{pad}{rng.choice(names)} = {expr(3)}"
+        if kind < 0.6:
+            return f"{pad}{rng.choice(names)} {rng.choice(ops)}= {expr(2)}"
+        if kind < 0.8:
+            return f"{pad}{rng.choice(names)}[{expr(1)}] = {expr(2)}"
+        return f"{pad}print({', '.join(expr(2) for _ in range(rng.randint(1, 3)))})"
+
+    def body(indent: int, depth: int) -> list:
+        pad = " " * indent
+        lines = []
+        for _ in range(rng.randint(3, 6)):
+            kind = rng.random()
+            if kind < 0.6 or depth == 0:
+                lines.append(statement(pad))
+            elif kind < 0.75:
+                lines.append(f"{pad}if {expr(2)} {rng.choice(cmps)} {expr(2)}:")
+                lines += body(indent + 4, depth - 1)
+            elif kind < 0.9:
+                lines.append(f"{pad}for item in {expr(2)}:")
+                lines += body(indent + 4, depth - 1)
+            else:
+                lines.append(f"{pad}while {expr(2)}:")
+                lines += body(indent + 4, depth - 1)
+        return lines
+
+    parts, total = [], 0
+    while total < size:
+        params = ", ".join(names[: rng.randint(1, len(names))])
+        func = "\n".join([f"def func_{len(parts)}({params}):"] + body(4, 2) + [f"    return {expr(2)}", "", ""])
+        parts.append(func)
+        total += len(func)
+    return "\n".join(parts)
+
+
+def bench_memory() -> None:
+    """
+    Brief:
+        Peak traced memory (tracemalloc) and time of _find_duplicated_code() on 1, 5 and 10 MB of
+        generated code, relative to the size of the input. Cache off, so every run does all the work.
+    """
+    print(f"{'input':<10}{'blocks':>9}{'peak':>12}{'peak/input':>12}{'time':>10}")
+    for megabytes in (1, 5, 10):
+        source = _synthetic_source(megabytes * 1024 * 1024)
+        tracemalloc.start()
+        result, seconds = _timed(_find_duplicated_code, source, use_cache=False)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        blocks = sum(1 for _ in _split_into_blocks(_remove_comments(source)))
+        print(
+            f"{megabytes:>3} MB    {blocks:>9}{peak / 2**20:>10.1f}MB{peak / len(source):>11.1f}x{seconds:>9.1f}s"
+            f"   ({len(result)} pairs)"
+        )
+
+
+def bench_parallel() -> None:
+    """
+    Brief:
+        Scoring every pair of generated code serially vs. on a process pool (1, 2, 4 workers and
+        DUPS_WORKERS), join and LSH off so the pair space is as big as it gets.
+    """
+    source = _synthetic_source(400_000)
+    cleaned = _remove_comments(source)
+    blocks = [tokens for tokens, _, _ in _tokenize_valid_blocks(_split_into_blocks(cleaned), cleaned)]
+    fps = [_ngram_fingerprint(tokens) for tokens in blocks]
+    pairs = [(i, j) for i in range(len(fps)) for j in range(i + 1, len(fps))]
+    print(f"{len(fps)} blocks, {len(pairs)} pairs, {DUPS_WORKERS} cpu/s")
+
+    def rows(workers: int) -> list:
+        return [row for _, row in _row_similarity_arrays(fps, range(len(fps)), workers)]
+
+    expected, t_serial = _timed(rows, 1)
+    print(f"{'workers':<10}{'rows':>10}{'pairs':>10}")
+    for workers in sorted({1, 2, 4, DUPS_WORKERS}):
+        scored, t_rows = _timed(rows, workers)
+        assert all(np.array_equal(a, b) for a, b in zip(scored, expected))
+        _, t_pairs = _timed(_pair_similarities, fps, pairs, workers)
+        print(f"{workers:<10}{t_rows:>9.3f}s{t_pairs:>9.3f}s")
+
+
+def bench_simhash() -> None:
+    """
+    Brief:
+        One "is this block near-duplicated anywhere?" lookup against 10k / 100k / 500k SimHashes,
+        index tables vs. a popcount scan over all of them, at a tight and at the default radius.
+    """
+    rng = np.random.default_rng(4260)
+    print(f"{'blocks':>8}{'radius':>8}{'build':>10}{'query':>10}{'scan':>10}{'hits':>6}")
+    for size in (10_000, 100_000, 500_000):
+        fingerprints = rng.integers(0, 2**63, size, dtype=np.uint64) * np.uint64(2)
+        queries = fingerprints[:: size // 100][:100] ^ np.uint64(0b1011)
+        for radius in (3, SIMHASH_RADIUS):
+            index, t_build = _timed(SimHashIndex, fingerprints, radius)
+
+            found, t_query = _timed(lambda: [index.query(int(q))[0].tolist() for q in queries])
+            scanned, t_scan = _timed(lambda: [index.scan(int(q))[0].tolist() for q in queries])
+            assert found == scanned
+            print(
+                f"{size:>8}{radius:>8}{t_build:>9.3f}s{1000 * t_query / len(queries):>8.2f}ms"
+                f"{1000 * t_scan / len(queries):>8.2f}ms{sum(map(len, found)):>6}"
+            )
+
+
+def bench_block_query() -> None:
+    """
+    Brief:
+        "Find similar" on the glued corpus, index lookups vs. scoring the snippet against every
+        block. The index is built once, a query only tokenizes the snippet.
+    """
+    index, t_build = _timed(BlockIndex, "\n".join(_corpus().values()))
+    fingerprints = [_ngram_fingerprint(_tokenize_block(block["text"])) for block in index.blocks]
+    snippets = [block["text"] for block in index.blocks[:: max(1, len(index) // 50)]]
+
+    def brute_force(snippet):
+        query = _ngram_fingerprint(_tokenize_block(snippet))
+        scores = sorted((-_fingerprint_similarity(query, fp), n) for n, fp in enumerate(fingerprints))
+        return [n for score, n in scores if score < 0][:5]
+
+    found, t_query = _timed(lambda: [[r["index"] for r in index.query(s)] for s in snippets])
+    scanned, t_scan = _timed(lambda: [brute_force(s) for s in snippets])
+    assert found == scanned
+    print(f"{len(index)} blocks, build {t_build:.3f}s")
+    print(f"query {1000 * t_query / len(snippets):.2f}ms   scan {1000 * t_scan / len(snippets):.2f}ms")
+
+
+def bench_tfidf() -> None:
+    """
+    Brief:
+        All-pairs TF-IDF cosine as tiled sparse products (SciPy when installed, NumPy CSR) vs.
+        all-pairs Jaccard with fingerprint rows, on the glued corpus and on generated code.
+    """
+    sources = {"corpus": "\n".join(_corpus().values()), "generated": _synthetic_source(400_000)}
+    print(f"{'source':<11}{'blocks':>8}{'jaccard':>10}{'numpy':>10}{'scipy':>10}{'pairs':>8}")
+    for name, source in sources.items():
+        cleaned = _remove_comments(source)
+        blocks = [tokens for tokens, _, _ in _tokenize_valid_blocks(_split_into_blocks(cleaned), cleaned)]
+        hashes = [_ngram_hashes(tokens) for tokens in blocks]
+        stacked = _stack_fingerprints([_ngram_fingerprint(tokens) for tokens in blocks])
+
+        _, t_rows = _timed(lambda: [_row_similarities(stacked, i) for i in range(len(blocks))])
+        scipy_module = tfidf.sparse
+        tfidf.sparse = None
+        found, t_numpy = _timed(_cosine_pairs, hashes)
+        tfidf.sparse = scipy_module
+        t_scipy = float("nan")
+        if scipy_module is not None:
+            assert [p[:2] for p in _timed(_cosine_pairs, hashes)[0]] == [p[:2] for p in found]
+            t_scipy = _timed(_cosine_pairs, hashes)[1]
+        print(f"{name:<11}{len(blocks):>8}{t_rows:>9.3f}s{t_numpy:>9.3f}s{t_scipy:>9.3f}s{len(found):>8}")
+
+
+def bench_sweep() -> None:
+    """
+    Brief:
+        Pair counts at 26 thresholds (0.5 .. 1.0), one full analysis per threshold vs. one sweep
+        scored at the lowest threshold and binary searched after that.
+    """
+    source = "\n".join(_corpus().values())
+    thresholds = np.round(np.arange(0.5, 1.01, 0.02), 2)
+
+    rerun, t_rerun = _timed(
+        lambda: [len(_find_jaccard_records(source, threshold=t, use_cache=False)[1]) for t in thresholds]
+    )
+    sweep, t_build = _timed(ThresholdSweep.from_source, source, 0.5, use_cache=False)
+    swept, t_query = _timed(lambda: [sweep.count(t) for t in thresholds])
+    assert swept == rerun
+    print(f"re-run {t_rerun:.3f}s   sweep {t_build:.3f}s + {1000 * t_query:.2f}ms for {len(thresholds)} thresholds")
+
+
+def bench_hierarchical() -> None:
+    """
+    Brief:
+        Flat block search (similarity join) vs. blocks compared only inside similar function pairs, on the
+        glued corpus and on generated code.
+    """
+    sources = {"corpus": "\n".join(_corpus().values()), "generated": _synthetic_source(400_000)}
+    print(f"{'source':<11}{'flat':>9}{'hier':>9}{'compared':>10}{'skipped':>10}{'found':>7}{'missed':>8}")
+    for name, source in sources.items():
+        (_, flat), t_flat = _timed(_find_jaccard_records, source, use_cache=False)
+        (_, records, stats), t_hier = _timed(_hierarchical_search, source, use_cache=False)
+        missed = len({(r["block1"], r["block2"]) for r in flat} - {(r["block1"], r["block2"]) for r in records})
+        print(
+            f"{name:<11}{t_flat:>8.3f}s{t_hier:>8.3f}s{stats['compared']:>10}{stats['skipped']:>10}"
+            f"{len(records):>7}{missed:>8}"
+        )
+
+
+def bench_iter() -> None:
+    """
+    Brief:
+        "Is there any duplicate?" (a pre-commit check) with iter_duplicates() stopping at the first
+        pair, vs. building the full duplicate list, on the glued corpus and on generated code.
+    """
+    sources = {"corpus": "\n".join(_corpus().values()), "generated": _synthetic_source(400_000)}
+    print(f"{'source':<11}{'first':>9}{'all':>9}{'list':>9}{'pairs':>7}")
+    for name, source in sources.items():
+        first, t_first = _timed(lambda: next(iter_duplicates(source, use_cache=False), None))
+        streamed, t_all = _timed(lambda: list(iter_duplicates(source, use_cache=False)))
+        listed, t_list = _timed(_find_duplicated_code, source, use_cache=False, with_tokens=False)
+        assert len(streamed) == len(listed) and (first is None) == (not listed)
+        print(f"{name:<11}{t_first:>8.3f}s{t_all:>8.3f}s{t_list:>8.3f}s{len(listed):>7}")
+
+
+def bench_segmenter() -> None:
+    """
+    Brief:
+        Block splitting from the syntax tree vs. the keyword / indentation line splitter, on the
+        glued corpus and on generated code.
+    """
+    sources = {"corpus": "\n".join(_corpus().values()), "generated": _synthetic_source(400_000)}
+    print(f"{'source':<11}{'lines':>9}{'ast':>9}{'blocks':>14}{'same':>7}")
+    for name, source in sources.items():
+        cleaned = _remove_comments(source)
+        by_lines, t_lines = _timed(_split_into_blocks, cleaned, "lines")
+        by_ast, t_ast = _timed(_split_into_blocks, cleaned, "ast")
+        same = len(set(by_lines) & set(by_ast))
+        print(f"{name:<11}{t_lines:>8.3f}s{t_ast:>8.3f}s{len(by_lines):>7}/{len(by_ast):<6}{same:>7}")
+
+
+def _counted(func, path):
+    """_summary_
+
+    Returns:
+        tuple: (reads of path, other file opens, ast.parse() calls, seconds) of func(path)
+    """
+    with patch("builtins.open", wraps=open) as opened, patch("ast.parse", wraps=ast.parse) as parsed:
+        _, seconds = _timed(func, path)
+    reads = sum(1 for call in opened.call_args_list if call.args and str(call.args[0]) == path)
+    return reads, opened.call_count - reads, parsed.call_count, seconds
+
+
+def bench_parsed_source() -> None:
+    """
+    Brief:
+        Reads of the analyzed file, other opens (the JSON and readable report) and ast.parse()
+        calls per whole report: the detector calls of find_code_smells() before ParsedSource, each
+        fetch_* reading the file itself, vs. find_code_smells() itself. Serial detectors, cold
+        duplicate cache, no analysis cache.
+    """
+    def separate(path):
+        DUPLICATE_CACHE.clear()
+        source_code = _read_file_contents(path)
+        blocks, duplicates = _find_duplicate_records(source_code)
+        clone_classes = _clone_classes(duplicates, blocks)
+        code_smells = {
+            "long_parameter_list": _find_long_parameter_list(source_code),
+            "long_method": _find_long_method(source_code),
+            "duplicated_code": clone_classes,
+            "duplicate_blocks": blocks.to_json(m["id"] for c in clone_classes for m in c["members"]),
+            "code_metrics": fetch_code_metrics(path),
+            "halstead_metrics": fetch_halstead_metrics(path),
+        }
+        _generate_readable_report(_save_to_json(code_smells, path))
+
+    def shared(path):
+        DUPLICATE_CACHE.clear()
+        find_code_smells(path, pool="serial", use_cache=False)
+
+    paths = [str(TESTS_DIR / name) for name, source in _corpus().items() if _remove_comments(source).strip()]
+    shared(paths[0])  # first call imports numpy.ma lazily, which ast.parse()s builtin signatures
+    print(f"{'':<18}{'reads':>8}{'other':>8}{'parses':>8}{'time':>10}")
+    for name, run in (("before", separate), ("find_code_smells", shared)):
+        totals = np.array([_counted(run, path) for path in paths], dtype=np.float64).sum(axis=0)
+        per_file = "".join(f"{total / len(paths):>8.1f}" for total in totals[:3])
+        print(f"{name:<18}{per_file}{totals[3]:>9.3f}s")
+
+
+def bench_function_metrics() -> None:
+    """
+    Brief:
+        Long methods, long parameter lists and complexity as three passes (two line / regex scans
+        and an ast.walk() per function) vs. one FunctionMetricsVisitor walk, parse included in both.
+    """
+    def three_passes(source):
+        long_methods = _find_long_method(source)
+        long_params = _find_long_parameter_list(source)
+        tree = ast.parse(source)
+        complexity = [_calculate_cyclomatic_complexity(node) for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+        return long_methods, long_params, complexity
+
+    def one_walk(source):
+        functions = _function_metrics(ast.parse(source))
+        return _long_methods(functions), _long_parameter_lists(functions), [f["complexity"] for f in functions]
+
+    corpus = "\n".join(_corpus().values())
+    sources = {"corpus": corpus, "corpus x20": "\n".join([corpus] * 20)}
+    print(f"{'source':<11}{'3 passes':>10}{'1 walk':>9}{'functions':>11}")
+    for name, source in sources.items():
+        (_, _, before), t_before = _timed(three_passes, source)
+        (_, _, after), t_after = _timed(one_walk, source)
+        print(f"{name:<11}{t_before:>9.3f}s{t_after:>8.3f}s{len(after):>11}")
+
+
+def bench_detectors() -> None:
+    """
+    Brief:
+        A whole report's detectors run one after another vs. through the registry scheduler with
+        the heavy ones (duplicates, Halstead) in a thread or process pool. Cold duplicate cache.
+    """
+    def cold(text, pool):
+        DUPLICATE_CACHE.clear()
+        return _timed(_run_detectors, ParsedSource(text), pool=pool)[1]
+
+    corpus = "\n".join(_corpus().values())
+    sources = {"corpus": corpus, "corpus x5": "\n".join([corpus] * 5)}
+    print(f"{'source':<11}{'serial':>9}{'thread':>9}{'process':>9}")
+    for name, text in sources.items():
+        print(f"{name:<11}" + "".join(f"{cold(text, pool):>8.3f}s" for pool in ("serial", "thread", "process")))
+
+
+def bench_batch() -> None:
+    """
+    Brief:
+        Every tests/ file through find_code_smells() one by one vs. find_code_smells_many() with one
+        worker and with a pool of BATCH_WORKERS (at least 2) processes, report cache off (largest first, as they complete / in order).
+    """
+    paths = [str(path) for path in sorted(TESTS_DIR.glob("test*.py"))]
+    workers = max(2, BATCH_WORKERS)
+    runs = {
+        "loop": lambda: [_batch_loop_one(path, use_cache=False) for path in paths],
+        "many x1": lambda: list(find_code_smells_many(paths, workers=1, use_cache=False)),
+        f"many x{workers}": lambda: list(find_code_smells_many(paths, workers=workers, use_cache=False)),
+        f"ordered x{workers}": lambda: list(find_code_smells_many(paths, workers=workers, ordered=True, use_cache=False)),
+    }
+    print(f"{len(paths)} file/s\n{'':<14}{'time':>9}")
+    for name, run in runs.items():
+        DUPLICATE_CACHE.clear()
+        _, seconds = _timed(run)
+        print(f"{name:<14}{seconds:>8.3f}s")
+
+
+def _batch_loop_one(path: str, use_cache: bool = True):
+    try:
+        return find_code_smells(path, use_cache=use_cache)
+    except Exception as e:
+        return e
+
+
+def bench_analysis_cache() -> None:
+    """
+    Brief:
+        Every tests/ file through find_code_smells() with the on-disk report cache off, with it empty,
+        then again with every file cached (nothing is analyzed, no report is written).
+    """
+    paths = [str(path) for path in sorted(TESTS_DIR.glob("test*.py"))]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(os.path.join(tmp, "cache.sqlite3"))
+        with patch("core.code_smells.ANALYSIS_CACHE", cache):
+            print(f"{len(paths)} file/s\n{'':<8}{'time':>9}")
+            for name, use_cache in (("off", False), ("cold", True), ("warm", True)):
+                DUPLICATE_CACHE.clear()
+                _, seconds = _timed(lambda: [_batch_loop_one(path, use_cache) for path in paths])
+                print(f"{name:<8}{seconds:>8.3f}s")
+        print(f"cache: {cache.stats()}")
+
+
+BENCHMARKS = {
+    "lsh": bench_lsh,
+    "fingerprint": bench_fingerprint,
+    "cache": bench_cache,
+    "join": bench_join,
+    "memory": bench_memory,
+    "parallel": bench_parallel,
+    "simhash": bench_simhash,
+    "block_query": bench_block_query,
+    "tfidf": bench_tfidf,
+    "sweep": bench_sweep,
+    "hierarchical": bench_hierarchical,
+    "iter": bench_iter,
+    "segmenter": bench_segmenter,
+    "parsed_source": bench_parsed_source,
+    "function_metrics": bench_function_metrics,
+    "detectors": bench_detectors,
+    "batch": bench_batch,
+    "analysis_cache": bench_analysis_cache,
+}
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for bench_name in selected:
+        print(f"\n===== {bench_name} =====")
+        BENCHMARKS[bench_name]()
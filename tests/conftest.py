@@ -13,9 +13,12 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # =========
 
+import pytest
 from rich.console import Console
 from rich.theme import Theme
 
+from core.analysis_cache import AnalysisCache
+
 custom_theme = Theme(
     {
         "heading": "bold bright_cyan",
@@ -27,6 +30,26 @@ custom_theme = Theme(
 console = Console(theme=custom_theme)
 
 
+@pytest.fixture(autouse=True)
+def analysis_cache(tmp_path, monkeypatch):
+    """_summary_
+
+    Note:
+        Every test gets an empty cache of its own instead of data/index/, a report cached by one
+        test (or an earlier run) never answers another. Batch workers are forked and inherit it.
+
+    Args:
+        tmp_path (Path): pytest's per-test directory
+        monkeypatch (MonkeyPatch): pytest's monkeypatch fixture
+
+    Returns:
+        AnalysisCache: the cache find_code_smells() uses during the test
+    """
+    cache = AnalysisCache(str(tmp_path / "analysis_cache.sqlite3"))
+    monkeypatch.setattr("core.code_smells.ANALYSIS_CACHE", cache)
+    return cache
+
+
 def pytest_collection_modifyitems(config, items):
     """_summary_
 
@@ -14,13 +14,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # =========
 
 import ast
+import glob
+import json
 import logging
 from unittest import mock
 from unittest.mock import patch
+from concurrent.futures import ProcessPoolExecutor
 import pytest
 import math
 import re
 
+import numpy as np
+
 from utils.exceptions import FileEmptyError, CodeProcessingError
 from utils.utility import _read_file_contents
 from utils.utility import (
@@ -35,9 +40,53 @@ from core.constants import TEST_PATHS
 from core.refactor import _refactor_with_ast
 from core.method_length import _find_long_method
 from core.param_length import _find_long_parameter_list
-from core.duplicated_finder import _find_duplicated_code
-
-from core.code_smells import find_code_smells
+from core.duplicated_finder import (
+    _find_duplicated_code,
+    _remove_comments,
+    _split_into_blocks,
+    _tokenize_block,
+    _tokenize_blocks,
+    _tokenize_valid_blocks,
+    _iter_tokenized_blocks,
+    _iter_lines,
+    _generate_ngrams,
+    _jaccard_similarity,
+    _describe_records,
+)
+from core.fingerprint import (
+    _ngram_fingerprint,
+    _ngram_hashes,
+    _fingerprint_similarity,
+    _stack_fingerprints,
+    _row_similarities,
+)
+from core.lsh_index import _optimal_lsh_params, _lsh_recall
+from core.similarity_join import _similarity_join
+from core.simhash import SimHashIndex, _simhash, _popcount
+from core.clone_index import find_project_duplicates, _load_clone_index, _update_clone_index
+from core.suffix_clones import _suffix_array, _lcp_array, _maximal_repeats
+from core.winnowing import _winnow, _winnow_index, _winnow_regions, _find_winnow_matches
+from core.ast_hash import _ast_clone_classes, _function_clone_groups
+from core.dup_cache import DUPLICATE_CACHE, LRUCache
+import core.constants as constants
+import core.duplicated_finder as duplicated_finder
+import core.parallel_scoring as parallel_scoring
+from core.clone_classes import _clone_classes
+from core.block_index import BlockIndex
+import core.tfidf as tfidf
+from core.threshold_sweep import ThresholdSweep
+from core.hierarchical import _function_spans, _group_blocks, _similar_groups, _allowed_pairs, _hierarchical_pairs
+from core.duplicated_finder import _hierarchical_search, _find_jaccard_records
+from core.duplicated_finder import iter_duplicates
+from core.ast_segmenter import _ast_block_spans
+from core.duplicated_finder import _find_duplicate_records
+
+from core.code_smells import find_code_smells, find_code_smells_many
+from core.parsed_source import ParsedSource
+from core.function_metrics import _function_metrics, _long_methods, _long_parameter_lists
+from core.detectors import DETECTORS, register_detector, _run_detectors, _report_settings, _blocks
+from core.analysis_cache import AnalysisCache
+from core.code_metrics import fetch_code_metrics
 
 from core.halstead import (
     _extract_operators_and_operands,
@@ -48,6 +97,7 @@ from core.halstead import (
 from core.refactor import (
     _extract_functions,
     _find_duplicates,
+    _refactor_clone_groups,
     refactor_duplicates,
     _debug_dict,
 )
@@ -239,6 +289,868 @@ def test_find_duplicated_code(source_code: str, expected_non_empty: bool):
 # =============================================================================================================
 
 
+# ==================================================== LSH ====================================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("threshold", [0.5, 0.76, 0.9])
+def test_optimal_lsh_params(threshold: float):
+    bands, rows = _optimal_lsh_params(threshold, num_perm=128, target_recall=0.99)
+
+    assert bands * rows <= 128, "Signature is not long enough for the chosen bands/rows"
+    assert _lsh_recall(threshold, bands, rows) >= 0.99, "Chosen bands/rows miss the target recall"
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize(
+    "source_code, expected_non_empty", DUPLICATES, ids=generate_ids(DUPLICATES)
+)
+def test_lsh_matches_exhaustive(source_code: str, expected_non_empty: bool):
+    exhaustive = _find_duplicated_code(source_code, use_lsh=False)
+    lsh = _find_duplicated_code(source_code, use_lsh=True)
+
+    def keys(result):
+        return [(d["block1"]["index"], d["block2"]["index"]) for d in result]
+
+    assert keys(lsh) == keys(exhaustive), "LSH candidate stage missed or reordered duplicates"
+
+
+# =============================================================================================================
+
+
+# ============================================== FINGERPRINTS =================================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize(
+    "source_code, expected_non_empty", DUPLICATES, ids=generate_ids(DUPLICATES)
+)
+def test_fingerprints_match_ngram_sets(source_code: str, expected_non_empty: bool):
+    cleaned_code = _remove_comments(source_code)
+    blocks = [tokens for tokens, _, _ in _tokenize_valid_blocks(_split_into_blocks(cleaned_code))]
+    fingerprints = [_ngram_fingerprint(tokens) for tokens in blocks]
+    stacked = _stack_fingerprints(fingerprints)
+
+    for i in range(len(blocks)):
+        ngrams_i = _generate_ngrams(blocks[i])
+        assert fingerprints[i].size == len(ngrams_i), "Packed n-grams collided"
+
+        row = _row_similarities(stacked, i)
+        for j in range(i + 1, len(blocks)):
+            ngrams_j = _generate_ngrams(blocks[j])
+            union = ngrams_i | ngrams_j
+            expected = len(ngrams_i & ngrams_j) / len(union) if union else 0.0
+
+            assert _fingerprint_similarity(fingerprints[i], fingerprints[j]) == expected
+            assert row[j - i - 1] == expected
+
+
+def test_ngram_hashes_unigrams():
+    assert _jaccard_similarity(["a", "b", "c"], ["b", "c", "d"], ngram_size=1) == 0.5
+    assert _ngram_fingerprint(["a", "b", "a"], 1).size == 2
+    with pytest.raises(ValueError):
+        _ngram_hashes(["a", "b"], 0)
+
+
+def test_ngram_hashes_vocabulary_over_packing_base():
+    n = 8  # packing n ids into 64 bits leaves room for 2^(64 // 8) = 256 tokens
+    vocabulary = [f"wide_{k}" for k in range(2 ** (64 // n) + 44)]
+    _ngram_hashes(vocabulary, 1)
+    first = [vocabulary[0]] * (n - 2) + [vocabulary[1], vocabulary[0]]
+    second = [vocabulary[0]] * (n - 2) + [vocabulary[0], vocabulary[256]]
+
+    assert _jaccard_similarity(first, second, ngram_size=n) == 0.0
+    assert _ngram_fingerprint(vocabulary, n).size == len(_generate_ngrams(vocabulary, n))
+
+
+# =============================================================================================================
+
+
+# ============================================ SIMILARITY JOIN ================================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("threshold", [0.3, 0.76, 1.0])
+def test_similarity_join_is_exact(threshold: float):
+    cleaned_code = _remove_comments("\n".join(source_code for source_code, _ in DUPLICATES))
+    blocks = _tokenize_valid_blocks(_split_into_blocks(cleaned_code), cleaned_code)
+    fingerprints = [_ngram_fingerprint(tokens) for tokens, _, _ in blocks]
+    stacked = _stack_fingerprints(fingerprints)
+
+    expected = [
+        (i, j)
+        for i in range(len(fingerprints))
+        for j, sim in enumerate(_row_similarities(stacked, i), start=i + 1)
+        if sim >= threshold
+    ]
+    candidates, pruned = _similarity_join(fingerprints, threshold)
+    found = [(i, j) for i, j in candidates if _fingerprint_similarity(fingerprints[i], fingerprints[j]) >= threshold]
+
+    assert found == expected, "Filters pruned a pair over the threshold"
+    assert pruned["pairs"] == pruned["length"] + pruned["prefix"] + pruned["positional"] + pruned["candidates"]
+    assert pruned["candidates"] < pruned["pairs"]
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize(
+    "source_code, expected_non_empty", DUPLICATES, ids=generate_ids(DUPLICATES)
+)
+def test_join_matches_all_pairs(source_code: str, expected_non_empty: bool):
+    joined = _find_duplicated_code(source_code, use_lsh=False, use_cache=False)
+    assert joined == _find_duplicated_code(source_code, use_lsh=False, use_cache=False, use_join=False)
+
+
+# =============================================================================================================
+
+
+# ================================================= SIMHASH ===================================================
+def _planted_simhashes(seed: int = 4260) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 2**63, 2_000, dtype=np.uint64) * np.uint64(2) + rng.integers(0, 2, 2_000, dtype=np.uint64)
+    flips = [
+        np.bitwise_or.reduce(np.uint64(1) << rng.choice(64, size=k, replace=False).astype(np.uint64))
+        for k in rng.integers(1, 12, 300)
+    ]
+    return np.concatenate([base, base[:300] ^ np.asarray(flips, dtype=np.uint64)])
+
+
+def test_popcount():
+    values = np.random.default_rng(0).integers(0, 2**63, 500, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    assert _popcount(values).tolist() == [bin(int(v)).count("1") for v in values]
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("radius", [0, 3, 8])
+def test_simhash_index_matches_scan(radius: int):
+    fingerprints = _planted_simhashes()
+    index = SimHashIndex(fingerprints, radius=radius)
+
+    for query in fingerprints[::97].tolist() + fingerprints[-50:].tolist():
+        ids, distances = index.query(query, radius)
+        scanned_ids, scanned_distances = index.scan(query, radius)
+        assert ids.tolist() == scanned_ids.tolist() and distances.tolist() == scanned_distances.tolist()
+
+    expected = [
+        (i, i + 1 + offset)
+        for i in range(len(fingerprints))
+        for offset in np.flatnonzero(_popcount(fingerprints[i + 1 :] ^ fingerprints[i]) <= radius).tolist()
+    ]
+    assert index.pairs(radius) == expected
+
+
+@pytest.mark.duplicated_code
+def test_simhash_filter_only_keeps_exact_duplicates():
+    source_code = "\n".join(source_code for source_code, _ in DUPLICATES)
+    exact = _find_duplicated_code(source_code, use_cache=False)
+    filtered = _find_duplicated_code(source_code, use_cache=False, use_simhash=True)
+
+    assert filtered and all(dup in exact for dup in filtered)
+    assert _simhash(["VAR", "=", "NUM", "NEWLINE"] * 3) == _simhash(["VAR", "=", "NUM", "NEWLINE"] * 3)
+
+
+# =============================================================================================================
+
+
+# ================================================== CACHE ====================================================
+def test_lru_cache_eviction():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert cache.peek("a") == 1 and cache.peek("b", 0) == 0
+    cache.put("d", 4)  # peek() doesn't make "a" recently used
+    assert "a" not in cache and (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.duplicated_code
+def test_describing_duplicates_doesnt_count_cache_hits():
+    DUPLICATE_CACHE.clear()
+    table, records = _find_jaccard_records(COPIES)
+    stats = DUPLICATE_CACHE.stats()
+
+    described = _describe_records(table, records)
+
+    assert described and all(dup["block1"]["tokens"] for dup in described)
+    assert DUPLICATE_CACHE.stats() == stats
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("use_lsh", [False, True])
+def test_cached_duplicates_match_uncached(use_lsh: bool):
+    source_code = _read_file_contents(TEST_PATHS["29"])
+    DUPLICATE_CACHE.clear()
+
+    uncached = _find_duplicated_code(source_code, use_lsh=use_lsh, use_cache=False)
+    assert _find_duplicated_code(source_code, use_lsh=use_lsh) == uncached
+
+    stats = DUPLICATE_CACHE.stats()
+    assert _find_duplicated_code(source_code, use_lsh=use_lsh) == uncached
+    rerun = DUPLICATE_CACHE.stats()
+    assert rerun["blocks"]["misses"] == stats["blocks"]["misses"], "Unchanged blocks were tokenized again"
+    assert rerun["pairs"]["misses"] == stats["pairs"]["misses"], "Unchanged pairs were scored again"
+
+    edited = source_code.replace("total_cost = price_after_reduction + added_tax", "total_cost = added_tax")
+    assert _find_duplicated_code(edited, use_lsh=use_lsh) == _find_duplicated_code(
+        edited, use_lsh=use_lsh, use_cache=False
+    )
+    assert DUPLICATE_CACHE.stats()["blocks"]["misses"] == rerun["blocks"]["misses"] + 1
+
+
+@pytest.mark.duplicated_code
+def test_cache_follows_threshold(monkeypatch):
+    source_code = _read_file_contents(TEST_PATHS["29"])
+    _find_duplicated_code(source_code)
+
+    monkeypatch.setattr(duplicated_finder, "DUPS_THRESHOLD", 0.3)
+    lowered = _find_duplicated_code(source_code)
+
+    assert lowered == _find_duplicated_code(source_code, use_cache=False)
+    assert all(dup["threshold"] == 0.3 for dup in lowered)
+
+
+# =============================================================================================================
+
+
+# ============================================ PARALLEL SCORING ===============================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"use_lsh": False, "use_join": False, "use_cache": False},
+        {"use_lsh": False, "use_join": True, "use_cache": False},
+        {"use_lsh": True, "use_cache": False},
+        {"use_lsh": False, "use_join": False},
+        {"use_lsh": False, "use_join": True},
+    ],
+)
+def test_parallel_scoring_matches_serial(monkeypatch, options: dict):
+    source_code = "\n".join(source_code for source_code, _ in DUPLICATES)
+    DUPLICATE_CACHE.clear()
+    serial = _find_duplicated_code(source_code, workers=1, **options)
+
+    DUPLICATE_CACHE.clear()
+    monkeypatch.setattr(parallel_scoring, "DUPS_PARALLEL_MIN_PAIRS", 0)
+    assert _find_duplicated_code(source_code, workers=2, **options) == serial
+
+
+def test_row_tiles_cover_rows_in_order():
+    tiles = parallel_scoring._row_tiles(list(range(100)), 100, 8)
+    assert np.concatenate(tiles).tolist() == list(range(100))
+
+    pairs = [int((100 - 1 - tile).sum()) for tile in tiles]
+    assert max(pairs) <= 2 * min(pairs), "Tiles don't carry about the same number of pairs"
+
+
+# =============================================================================================================
+
+
+# ============================================= CLONE CLASSES =================================================
+COPIES = "\n".join(
+    f"def copy_{n}(values):\n    total = 0\n    for value in values:\n        if value > 0:\n"
+    f"            total += value * 2\n    return total\n"
+    for n in range(10)
+)
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("engine", ["jaccard", "ast"])
+def test_clone_classes_group_copies(engine: str):
+    duplicates = _find_duplicated_code(COPIES, engine=engine, use_cache=False) if engine == "jaccard" \
+        else _find_duplicated_code(COPIES, engine=engine, min_nodes=5)
+    assert len(duplicates) == 45
+
+    classes = _clone_classes(duplicates)
+    assert len(classes) == 1
+    assert classes[0]["pairs"] == 45
+    assert [m["line_number"] for m in classes[0]["members"]] == sorted(
+        {dup[side]["line_number"] for dup in duplicates for side in ("block1", "block2")}
+    )
+    assert "tokens" not in classes[0]["representative"]
+
+
+@pytest.mark.duplicated_code
+def test_clone_classes_are_connected_components():
+    source_code = _read_file_contents(TEST_PATHS["29"])
+    duplicates = _find_duplicated_code(source_code, use_cache=False)
+    classes = _clone_classes(duplicates)
+
+    class_of = {
+        (m["line_number"], m["end_line"]): c["clone_class"] for c in classes for m in c["members"]
+    }
+    for dup in duplicates:
+        ends = [(dup[side]["line_number"], dup[side]["end_line"]) for side in ("block1", "block2")]
+        assert class_of[ends[0]] == class_of[ends[1]]
+    assert sum(c["pairs"] for c in classes) == len(duplicates)
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize(
+    "source_code, expected_non_empty", DUPLICATES, ids=generate_ids(DUPLICATES)
+)
+def test_block_table_records_match_pairs(source_code: str, expected_non_empty: bool):
+    table, records = _find_duplicate_records(source_code, use_cache=False)
+    duplicates = _find_duplicated_code(source_code, use_cache=False)
+    assert len(records) == len(duplicates)
+
+    for record, dup in zip(records, duplicates):
+        assert record["similarity"] == dup["similarity"]
+        for side in ("block1", "block2"):
+            block_id, block = record[side], dup[side]
+            assert table.text(block_id) == block["text"]
+            assert table.span(block_id) == {"line_number": block["line_number"], "end_line": block["end_line"]}
+            assert table.token_counts[block_id] == len(block["tokens"])
+
+    assert all("tokens" not in dup["block1"] for dup in _find_duplicated_code(source_code, with_tokens=False))
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("engine", ["jaccard", "ast"])
+def test_clone_classes_from_records(engine: str):
+    options = {"use_cache": False} if engine == "jaccard" else {"min_nodes": 5}
+    table, records = _find_duplicate_records(COPIES, engine=engine, **options)
+    from_records = _clone_classes(records, table)
+    from_pairs = _clone_classes(_find_duplicated_code(COPIES, engine=engine, **options))
+
+    def spans(classes):
+        return [[(m["line_number"], m["end_line"]) for m in c["members"]] for c in classes]
+
+    assert spans(from_records) == spans(from_pairs)
+    assert from_records[0]["representative"]["text"] == from_pairs[0]["representative"]["text"]
+
+
+def test_generate_report_renders_clone_classes(mock_open_and_load):
+    classes = _clone_classes(_find_duplicated_code(COPIES, use_cache=False))
+    analysis = dict(MOCK_ANALYSIS, duplicated_code=classes)
+    with mock.patch("json.load", return_value=analysis), mock.patch(
+        "os.path.abspath", return_value="/abs"
+    ), mock.patch("os.path.dirname", return_value="/abs"):
+        _generate_readable_report("classes.json")
+
+    handle = mock_open_and_load()
+    written = "".join(call.args[0] for call in handle.write.call_args_list)
+    assert "Clone Class 1, **Copies**: `10`" in written
+    assert "Clone Class 2" not in written
+    first_line = classes[0]["representative"]["text"].strip().splitlines()[0]
+    assert written.count(first_line) == 1, "Every copy was rendered instead of one representative"
+
+
+# =============================================================================================================
+
+
+# ============================================== CLONE INDEX ==================================================
+@pytest.mark.duplicated_code
+def test_find_project_duplicates_cross_file(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.py").write_text(_read_file_contents(TEST_PATHS["23"]))
+    (project / "b.py").write_text(_read_file_contents(TEST_PATHS["23"]).replace("area", "surface"))
+    index_path = str(tmp_path / "index.json")
+
+    duplicates = find_project_duplicates(str(project), index_path=index_path)
+
+    assert duplicates, "Expected cross-file duplicates between two copies of the same file"
+    for dup in duplicates:
+        assert dup["block1"]["file"] != dup["block2"]["file"], "Same-file pair reported"
+        assert dup["similarity"] >= dup["threshold"]
+
+
+@pytest.mark.duplicated_code
+def test_clone_index_only_refingerprints_changed_files(tmp_path):
+    (tmp_path / "a.py").write_text(_read_file_contents(TEST_PATHS["21"]))
+    (tmp_path / "b.py").write_text(_read_file_contents(TEST_PATHS["22"]))
+    index_path = str(tmp_path / "index" / "index.json")
+
+    find_project_duplicates(str(tmp_path), index_path=index_path)
+
+    index = _load_clone_index(index_path)
+    assert _update_clone_index(str(tmp_path), index)["fingerprinted"] == 0
+
+    (tmp_path / "b.py").write_text(_read_file_contents(TEST_PATHS["24"]))
+    (tmp_path / "c.py").write_text(_read_file_contents(TEST_PATHS["29"]))
+    stats = _update_clone_index(str(tmp_path), index)
+    assert stats["fingerprinted"] == 2
+    assert stats["reused"] == 1
+
+
+@pytest.mark.duplicated_code
+def test_clone_index_starts_over_when_the_segmenter_changes(tmp_path):
+    (tmp_path / "a.py").write_text(_read_file_contents(TEST_PATHS["21"]))
+    index_path = str(tmp_path / "index" / "index.json")
+    find_project_duplicates(str(tmp_path), index_path=index_path)
+
+    with patch("core.clone_index.DUPS_SEGMENTER", "lines"):
+        index = _load_clone_index(index_path)
+        assert index["files"] == {} and index["segmenter"] == "lines"
+        assert _update_clone_index(str(tmp_path), index)["fingerprinted"] == 1
+
+    assert _load_clone_index(index_path)["files"], "Index of the current segmenter is kept"
+
+
+# =============================================================================================================
+
+
+# ============================================== BLOCK INDEX ==================================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("name", ["21", "23", "29"])
+def test_block_index_query_matches_brute_force(name: str):
+    source_code = _read_file_contents(TEST_PATHS[name])
+    index = BlockIndex(source_code)
+    fingerprints = [_ngram_fingerprint(_tokenize_block(block["text"])) for block in index.blocks]
+    assert len(index) > 0
+
+    for block in index.blocks:
+        query = _ngram_fingerprint(_tokenize_block(block["text"]))
+        scores = [(-_fingerprint_similarity(query, fp), m) for m, fp in enumerate(fingerprints)]
+        expected = [(m, -score) for score, m in sorted(scores) if score < 0][:3]
+
+        found = index.query(block["text"], k=3)
+        assert [(r["index"], r["similarity"]) for r in found] == pytest.approx(expected)
+        assert found[0]["similarity"] == 1.0
+
+
+@pytest.mark.duplicated_code
+def test_block_index_query_excludes_selection():
+    index = BlockIndex(COPIES)
+    first = index.blocks[0]
+
+    found = index.query(first["text"], k=100, exclude=(first["line_number"], first["end_line"]))
+    assert len(found) == len(index) - 1
+    assert all(r["line_number"] > first["end_line"] and r["similarity"] == 1.0 for r in found)
+    assert index.query("   # only a comment", k=3) == []
+
+
+# =============================================================================================================
+
+
+# ============================================= SUFFIX ENGINE =================================================
+SUFFIX_SEQUENCES = [
+    [3, 1, 2, 3, 1, 2, 0],
+    [5, 5, 5, 5, 5],
+    [1, 2, 3, 4, 1, 2, 3, 5, 9, 1, 2, 3, 4],
+    [0],
+]
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("sequence", SUFFIX_SEQUENCES)
+def test_suffix_and_lcp_arrays(sequence: list):
+    ids = np.asarray(sequence, dtype=np.int64)
+    sa = _suffix_array(ids).tolist()
+    lcp = _lcp_array(ids, np.asarray(sa)).tolist()
+
+    assert sa == sorted(range(len(sequence)), key=lambda i: sequence[i:])
+    for r in range(1, len(sa)):
+        a, b = sequence[sa[r - 1]:], sequence[sa[r]:]
+        common = 0
+        while common < min(len(a), len(b)) and a[common] == b[common]:
+            common += 1
+        assert lcp[r] == common
+
+
+@pytest.mark.duplicated_code
+def test_maximal_repeats():
+    ids = np.asarray(SUFFIX_SEQUENCES[2], dtype=np.int64)
+    repeats = _maximal_repeats(ids, min_len=3)
+
+    assert (4, [0, 9]) in repeats, "Longest repeat [1, 2, 3, 4] not found"
+    assert (3, [0, 4, 9]) in repeats, "Repeat [1, 2, 3] shared by all three copies not found"
+    assert all(length >= 3 for length, _ in repeats)
+
+
+@pytest.mark.duplicated_code
+def test_suffix_engine_selectable():
+    source_code = _read_file_contents(TEST_PATHS["29"])
+    result = _find_duplicated_code(source_code, engine="suffix")
+
+    assert result, "Expected the suffix engine to find the duplicated function"
+    for dup in result:
+        assert dup["clone_type"] in (1, 2)
+        assert dup["block1"]["tokens"] == dup["block2"]["tokens"]
+
+    with pytest.raises(ValueError):
+        _find_duplicated_code(source_code, engine="does_not_exist")
+
+
+# =============================================================================================================
+
+
+# ============================================= WINNOW ENGINE =================================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("seed", range(20))
+def test_winnowing_detection_guarantee(seed: int):
+    rng = np.random.default_rng(seed)
+    shared = rng.integers(0, 50, 30)
+
+    def around(run):
+        return np.concatenate([rng.integers(50, 1000, rng.integers(0, 80)), run, rng.integers(50, 1000, rng.integers(0, 80))])
+
+    streams = [around(shared), around(shared)]
+    regions = _winnow_regions(streams, _winnow_index(streams, k=12, guarantee=30), k=12, guarantee=30)
+    assert any(fa == 0 and fb == 1 and length >= 30 for fa, _, fb, _, length in regions)
+
+
+def test_winnow_keeps_a_hash_per_window():
+    hashes = np.random.default_rng(0).integers(0, 2**32, 200).astype(np.uint64)
+    selected = set(_winnow(hashes, 8).tolist())
+    assert all(selected & set(range(i, i + 8)) for i in range(200 - 8 + 1))
+
+
+@pytest.mark.duplicated_code
+def test_winnow_finds_clone_inside_larger_blocks():
+    clone = (
+        "    value_1 = compute(value_0, 1) * scale\n"
+        "    value_1 -= offset[scale] // limit(value_1, 2)\n"
+        "    value_2 = [part.strip() for part in str(value_1).split(',')]\n"
+        "    value_2.sort(key=len, reverse=True)"
+    )
+    first = "def report(data, scale):\n" + "\n".join(
+        f"    print('row', data[{n}], data.get('{n}'))" for n in range(12)
+    ) + "\n    value_0 = data\n" + clone + "\n    return value_2\n"
+    second = "def summary(items):\n    scale = len(items)\n    for item in items:\n        item.reset()\n" \
+        + "    value_0 = items\n" + clone + "\n    assert scale > 0\n    return [x.name for x in items if x]\n"
+
+    matches = _find_winnow_matches({"first.py": first, "second.py": second})
+    cross_file = [dup for dup in matches if dup["block1"]["file"] != dup["block2"]["file"]]
+    assert len(cross_file) == 1
+    dup = cross_file[0]
+    assert (dup["block1"]["file"], dup["block2"]["file"]) == ("first.py", "second.py")
+    assert dup["clone_type"] == 2 and dup["length"] >= 30
+    assert "compute(value_0, 1)" in dup["block1"]["text"] and "value_2.sort" in dup["block2"]["text"]
+
+    assert _find_duplicated_code(first + "\n" + second, engine="winnow")
+    assert not _find_duplicated_code(first + "\n" + second, use_cache=False), "Jaccard over whole blocks sees it now"
+
+
+# =============================================================================================================
+
+
+# ============================================== TFIDF ENGINE =================================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("tile_cells", [1, 50, 1 << 22])
+def test_tfidf_cosine_pairs_match_dense(tile_cells: int, monkeypatch):
+    monkeypatch.setattr(tfidf, "sparse", None)
+    rng = np.random.default_rng(4260)
+    ngram_hashes = [rng.integers(0, 40, rng.integers(0, 30)).astype(np.uint64) for _ in range(60)]
+
+    data, indices, indptr, columns = tfidf._tfidf_matrix(ngram_hashes)
+    dense = np.zeros((len(ngram_hashes), columns))
+    for row in range(len(ngram_hashes)):
+        dense[row, indices[indptr[row] : indptr[row + 1]]] = data[indptr[row] : indptr[row + 1]]
+    cosines = dense @ dense.T
+
+    pairs = tfidf._cosine_pairs(ngram_hashes, 0.3, tile_cells)
+    expected = [(i, j) for i in range(len(cosines)) for j in range(i + 1, len(cosines)) if cosines[i, j] >= 0.3]
+    assert [(i, j) for i, j, _ in pairs] == expected
+    assert [sim for _, _, sim in pairs] == pytest.approx([cosines[i, j] for i, j in expected])
+
+
+@pytest.mark.duplicated_code
+def test_tfidf_engine_groups_copies():
+    duplicates = _find_duplicated_code(COPIES, engine="tfidf", use_cache=False)
+    table, records = _find_duplicate_records(COPIES, engine="tfidf", use_cache=False)
+
+    assert len(duplicates) == len(records) == 45
+    assert all(dup["similarity"] == pytest.approx(1.0) for dup in duplicates)
+    assert [(r["block1"], r["block2"]) for r in records] == [
+        (d["block1"]["index"], d["block2"]["index"]) for d in duplicates
+    ]
+
+
+# =============================================================================================================
+
+
+# ============================================ THRESHOLD SWEEP ================================================
+SWEEP_SOURCE = "\n".join([_read_file_contents(TEST_PATHS["29"]), COPIES] + [code for code, _ in DUPLICATES])
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("threshold", [0.5, 0.63, 0.76, 0.9, 1.0])
+def test_threshold_sweep_matches_a_full_run(threshold: float):
+    sweep = ThresholdSweep.from_source(SWEEP_SOURCE, floor=0.5, use_cache=False)
+    table, records = _find_duplicate_records(SWEEP_SOURCE, threshold=threshold, use_cache=False)
+
+    assert sweep.count(threshold) == len(records)
+    assert sorted(sweep.pairs(threshold)) == sorted((r["block1"], r["block2"], r["similarity"]) for r in records)
+    classes = _clone_classes(records, table)
+    assert sweep.clone_classes(threshold) == len(classes)
+    assert sweep.cloned_blocks(threshold) == sum(len(c["members"]) for c in classes)
+
+
+@pytest.mark.duplicated_code
+def test_threshold_sweep_precision_table(tmp_path):
+    sweep = ThresholdSweep.from_source(SWEEP_SOURCE, floor=0.5, use_cache=False)
+    relevant = [(b, a) for a, b, _ in sweep.pairs(0.9)]
+
+    rows = {row["threshold"]: row for row in sweep.precision_table(relevant=relevant)}
+    assert rows[0.5]["pairs"] == len(sweep) and rows[0.5]["recall"] == 1.0
+    assert rows[0.9]["precision"] == rows[0.9]["recall"] == 1.0
+    assert rows[0.5]["precision"] == pytest.approx(len(relevant) / len(sweep))
+    assert all(row["precision"] is None for row in sweep.precision_table([0.6, 0.8]))
+
+    with pytest.raises(ValueError):
+        sweep.count(0.4)
+
+    path = sweep.export(str(tmp_path / "sweep" / "table.json"), relevant=relevant)
+    assert json.loads(open(path).read())["rows"] == list(rows.values())
+
+
+# =============================================================================================================
+
+
+# ========================================== HIERARCHICAL SEARCH ==============================================
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("bound", [0.0, 0.3])
+def test_hierarchical_search_matches_flat_search(bound: float):
+    _, flat = _find_jaccard_records(SWEEP_SOURCE, use_cache=False)
+    _, records, stats = _hierarchical_search(SWEEP_SOURCE, bound=bound, use_cache=False)
+
+    assert records == flat
+    assert stats["compared"] + stats["skipped"] == stats["block_pairs"]
+    assert (stats["skipped"] > 0) == (bound > 0)
+
+
+@pytest.mark.duplicated_code
+def test_hierarchical_groups_blocks_by_innermost_function():
+    source_code = (
+        "x = 1\n"
+        "def outer(a):\n"
+        "    def inner(b):\n"
+        "        return b\n"
+        "    return inner(a)\n"
+        "y = 2\n"
+    )
+    spans = _function_spans(source_code)
+    assert sorted(spans) == [("inner", 3, 4), ("outer", 2, 5)]
+    groups = _group_blocks([1, 2, 3, 5, 6], spans).tolist()
+    names = [spans[g][0] if g < len(spans) else None for g in groups]
+    assert names == [None, "outer", "inner", "outer", None]
+    assert _function_spans("def broken(:\n") == []
+
+
+@pytest.mark.duplicated_code
+def test_hierarchical_group_pairs_stay_sparse():
+    fingerprints = [np.array([1, 2, 3]), np.array([1, 2, 3]), np.array([1, 2, 4]), np.array([7, 8, 9]), np.array([7, 8])]
+    groups = np.array([0, 0, 5, 9, 9])
+    allowed, stats = _similar_groups(fingerprints, groups, bound=0.3)
+    pairs = _hierarchical_pairs(allowed, groups)
+
+    assert allowed == {(0, 5)}
+    assert pairs == [(0, 1), (0, 2), (1, 2), (3, 4)] and stats["compared"] == len(pairs)
+    assert _allowed_pairs(allowed, groups, [(0, 3), (1, 2), (3, 4)]) == [(1, 2), (3, 4)]
+
+
+# =============================================================================================================
+
+
+# ============================================ ITER DUPLICATES ================================================
+def _pair_spans(duplicates) -> list:
+    return sorted(
+        (d["block1"]["line_number"], d["block2"]["line_number"], round(d["similarity"], 9)) for d in duplicates
+    )
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize("use_simhash", [False, True])
+def test_iter_duplicates_matches_the_full_list(use_simhash: bool):
+    expected = _pair_spans(_find_duplicated_code(SWEEP_SOURCE, use_cache=False))
+    found = _pair_spans(iter_duplicates(SWEEP_SOURCE, use_simhash=use_simhash, use_cache=False))
+
+    if use_simhash:
+        assert found and set(found) <= set(expected)
+    else:
+        assert found == expected
+    assert len(list(iter_duplicates(SWEEP_SOURCE, limit=3))) == 3
+    assert list(iter_duplicates(SWEEP_SOURCE, limit=0)) == []
+
+
+@pytest.mark.duplicated_code
+def test_iter_duplicates_stops_reading_blocks_early(monkeypatch):
+    read = []
+    stream = duplicated_finder._iter_fingerprinted_blocks
+
+    def counted(*args, **kwargs):
+        for block in stream(*args, **kwargs):
+            read.append(block)
+            yield block
+
+    monkeypatch.setattr(duplicated_finder, "_iter_fingerprinted_blocks", counted)
+    source_code = COPIES + "\n" + _read_file_contents(TEST_PATHS["29"])
+
+    first = next(iter_duplicates(source_code, use_cache=False))
+    assert (first["block1"]["index"], first["block2"]["index"], first["similarity"]) == (0, 1, 1.0)
+    assert read[-1][3] == first["block2"]["line_number"]  # nothing read past the second copy
+    assert len(read) < len(_split_into_blocks(_remove_comments(source_code)))
+
+
+# =============================================================================================================
+
+
+# ============================================= AST SEGMENTER =================================================
+SEGMENTED = (
+    "@cached\n"
+    "def describe(\n"
+    "    value, width=10\n"
+    "):\n"
+    '    text = """\n'
+    "if this were code it would start a block\n"
+    '"""\n'
+    "    if value:\n"
+    "        width += 1\n"
+    "        text += 'x'\n"
+    "    elif width:\n"
+    "        width -= 1\n"
+    "        text += 'y'\n"
+    "    else:\n"
+    "        width = 0\n"
+    "        text = ''\n"
+    "    try:\n"
+    "        return text.center(width)\n"
+    "    except ValueError:\n"
+    "        pass\n"
+    "        return text\n"
+)
+
+
+@pytest.mark.duplicated_code
+def test_ast_segmenter_cuts_at_statements():
+    assert _ast_block_spans(SEGMENTED) == [(1, 7), (8, 10), (11, 13), (14, 16), (17, 18), (19, 21)]
+
+    blocks = _split_into_blocks(SEGMENTED, segmenter="ast")
+    assert [line for _, line in blocks] == [1, 8, 11, 14, 17, 19]
+    assert blocks[0][0].startswith("@cached\ndef describe(") and "if this were code" in blocks[0][0]
+    assert [line for _, line in _split_into_blocks(SEGMENTED, segmenter="lines")] != [1, 8, 11, 14, 17, 19]
+
+
+@pytest.mark.duplicated_code
+def test_ast_segmenter_falls_back_to_lines():
+    broken = "def broken(:\n    x = 1\n    y = 2\nfor i in range(3):\n    print(i)\n    print(i)\n"
+    assert _ast_block_spans(broken) is None
+    assert _split_into_blocks(broken, segmenter="ast") == _split_into_blocks(broken, segmenter="lines")
+
+
+# =============================================================================================================
+
+
+# ============================================= TOKENIZATION ==================================================
+EDGE_CASE_SOURCE = '''
+@decorator
+def f(a,
+    b):
+    for i in range(a):
+        if i % 2:
+            x = (i +
+                 b)
+        else:
+            x = [i]
+    try:
+        x = g(x); y = x
+    except ValueError:
+        y = None
+    return y
+'''
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize(
+    "source_code",
+    [_read_file_contents(path) for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "test*.py")))]
+    + [EDGE_CASE_SOURCE],
+)
+def test_file_tokenization_matches_per_block(source_code: str):
+    cleaned_code = _remove_comments(source_code)
+    blocks = _split_into_blocks(cleaned_code)
+
+    expected = [_tokenize_block(block) for block, _ in blocks]
+    assert _tokenize_blocks(cleaned_code, blocks) == expected
+
+    for chunk_lines in (1, 25):
+        streamed = _iter_tokenized_blocks(cleaned_code, iter(blocks), chunk_lines=chunk_lines)
+        assert [tokens for tokens, _, _ in streamed] == expected, f"Chunks of {chunk_lines} line/s changed the tokens"
+
+
+@pytest.mark.parametrize("text", ["", "\n", "a\nb", "a\r\nb\n\n", "a\rb\x0cc\u2028d\n", "x = 1"])
+def test_iter_lines_matches_splitlines(text: str):
+    assert list(_iter_lines(text)) == text.splitlines()
+
+
+# =============================================================================================================
+
+
+# =============================================== AST HASH ====================================================
+AST_CLONE_SOURCE = '''
+def total(items, rate):
+    result = 0
+    for item in items:
+        if item.price > 10:
+            result += item.price * rate
+    return result
+
+
+def total_copy(items, rate):
+    result = 0
+    for item in items:
+        if item.price > 10:
+            result += item.price * rate
+    return result
+
+
+def renamed(goods, factor):
+    acc = 0
+    for g in goods:
+        if g.price > 99:
+            acc += g.price * factor
+    return acc
+'''
+
+
+@pytest.mark.duplicated_code
+def test_ast_clone_classes():
+    classes = _ast_clone_classes(ast.parse(AST_CLONE_SOURCE), min_nodes=10)
+
+    assert len(classes) == 1, "Only the maximal (function level) class should be reported"
+    assert [node.name for node in classes[0]["members"]] == ["total", "total_copy", "renamed"]
+    assert classes[0]["clone_type"] == 2
+
+    loop = "for item in items:\n    if item.price > 10:\n        result += item.price * rate\n"
+    exact = _ast_clone_classes(ast.parse(loop + loop), min_nodes=10)
+    assert len(exact) == 1 and exact[0]["clone_type"] == 1
+
+
+@pytest.mark.duplicated_code
+def test_ast_engine_selectable():
+    result = _find_duplicated_code(_read_file_contents(TEST_PATHS["29"]), engine="ast")
+
+    assert result, "Expected the ast engine to find the duplicated function"
+    for dup in result:
+        assert dup["similarity"] == 1.0
+        assert dup["block1"]["tokens"] == dup["block2"]["tokens"]
+        assert dup["block1"]["end_line"] < dup["block2"]["line_number"]
+
+    assert _find_duplicated_code("def broken(:\n    pass\n", engine="ast") == []
+
+
+@pytest.mark.duplicated_code
+@pytest.mark.parametrize(
+    "source_code, expected_groups",
+    [
+        (AST_CLONE_SOURCE, [["total", "total_copy"]]),
+        ("def f(a, b):\n    return a - b\n\ndef g(a, b):\n    return b - a\n\ndef h(x, y):\n    return x - y\n", [["f", "h"]]),
+        (_read_file_contents(TEST_PATHS["29"]), [["calculate_final_price_a", "calculate_total_cost_b"]]),
+    ],
+)
+def test_function_clone_groups(source_code: str, expected_groups: list):
+    groups = _function_clone_groups(source_code)
+    assert groups == expected_groups
+
+    refactored = _refactor_clone_groups(source_code, groups)
+    tree = ast.parse(refactored)
+    helpers = [n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name.startswith("_common_logic_")]
+    assert len(helpers) == len(groups)
+
+
+# =============================================================================================================
+
+
 # =============================================== REFACTORING =================================================
 REFACTOR = [
     (_read_file_contents(TEST_PATHS["31"]), True),
@@ -440,6 +1352,19 @@ def test_debug_dict(source_code):
     assert isinstance(debug["duplicates"], list)
 
 
+def test_debug_dict_duplicates_keep_comparison_order():
+    source_code = (
+        "def a(x):\n    y = x * 2\n    z = y - 3\n    return z\n\n"
+        "def b(x):\n    y = x * 2\n    z = y - 3\n    return z + 0\n\n"
+        "def c(x):\n    return x + 1\n\n"
+        "def d(x):\n    return x + 1\n"
+    )
+    debug = _debug_dict(source_code, threshold=0.5)
+
+    assert [pair[:2] for pair in debug["duplicates"]] == [("a", "b"), ("c", "d")]
+    assert debug["duplicates"][0][2] < debug["duplicates"][1][2] == 1.0
+
+
 # =============================================================================================================
 
 
@@ -885,3 +1810,282 @@ def test_find_code_smells_success(source_code, expected_non_empty):
 
 
 # =============================================================================================================
+
+# ============================================ PARSED SOURCE ==================================================
+
+
+@pytest.mark.parametrize(
+    "text, line, column, is_parsed",
+    [
+        ("a = 1\nif a:\n    b = 2\n", 3, 4, True),
+        ("x = (1,\ny = 2\n", 2, 0, False),
+    ],
+    ids=["parses", "unclosed_bracket"],
+)
+def test_parsed_source_offsets_and_tree(text, line, column, is_parsed):
+    source = ParsedSource(text)
+
+    assert source.lines == text.splitlines()
+    assert source.line_offsets[-1] == len(text)
+    offset = source.offset(line, column)
+    assert text[offset:].startswith(text.splitlines()[line - 1][column:])
+    assert source.line_of(offset) == line
+
+    assert (source.tree is not None) == is_parsed
+    assert source.tree is source.tree
+
+
+def test_find_code_smells_reads_the_file_once():
+    with patch("core.parsed_source._read_file_contents", wraps=_read_file_contents) as read, patch(
+        "core.code_metrics._read_file_contents"
+    ) as metrics_read, patch("core.halstead._read_file_contents") as halstead_read:
+        smells, _ = find_code_smells(TEST_PATHS["9"])
+
+    assert read.call_count == 1
+    assert not metrics_read.called and not halstead_read.called
+    assert smells["code_metrics"] == fetch_code_metrics(TEST_PATHS["9"])
+    assert smells["halstead_metrics"] == fetch_halstead_metrics(TEST_PATHS["9"])
+
+
+@pytest.mark.parametrize("name", ["21", "23", "29"])
+def test_duplicate_finder_parses_the_file_once(name: str):
+    source_code = _read_file_contents(TEST_PATHS[name])
+    with patch("ast.parse", wraps=ast.parse) as parsed:
+        _find_duplicate_records(source_code, use_cache=False)
+        _find_duplicate_records(source_code)
+
+    assert parsed.call_count == 2, "Segmenter and tokenizer should share one parse per run"
+
+
+# =============================================================================================================
+
+# =========================================== FUNCTION METRICS ================================================
+
+NESTED_FUNCTIONS = """
+class Store:
+    def add(self, item, *items, quantity=1, **extra):
+        if item and quantity:
+            def check(value):
+                for part in value:
+                    if part or not part:
+                        continue
+                return value
+            return check(item)
+        return None
+
+async def fetch(session, url):
+    async with session.get(url) as response:
+        return await response.text()
+"""
+
+
+@pytest.mark.parametrize(
+    "qualname, params_count, complexity, length, is_async",
+    [
+        ("Store.add", 5, 3, 9, False),
+        ("Store.add.check", 1, 4, 5, False),
+        ("fetch", 2, 2, 3, True),
+    ],
+    ids=["method", "nested", "async"],
+)
+def test_function_metrics_visitor(qualname, params_count, complexity, length, is_async):
+    functions = {f["qualname"]: f for f in _function_metrics(ast.parse(NESTED_FUNCTIONS))}
+    function = functions[qualname]
+
+    assert function["params_count"] == params_count
+    assert function["complexity"] == complexity
+    assert function["length"] == function["end_line"] - function["start_line"] + 1 == length
+    assert function["is_async"] == is_async
+
+
+def test_function_metrics_smells_match_the_detector_shapes():
+    functions = _function_metrics(ast.parse(NESTED_FUNCTIONS))
+
+    assert [m["function"] for m in _long_methods(functions, threshold=4)] == ["add", "check"]
+    assert [p["function"] for p in _long_parameter_lists(functions, threshold=2)] == ["add"]
+    assert set(_long_methods(functions, threshold=4)[0]) == {"function", "start_line", "end_line", "length", "threshold"}
+    assert set(_long_parameter_lists(functions)[0]) == {"function", "position", "params_count", "threshold"}
+
+
+# =============================================================================================================
+
+# =============================================== DETECTORS ===================================================
+
+
+@pytest.fixture
+def plugin_detector():
+    @register_detector("todo_count", inputs=("source",))
+    def _todo_count(source):
+        return sum("TODO" in line for line in source.lines)
+
+    yield "todo_count"
+    DETECTORS.pop("todo_count")
+
+
+def test_detectors_registry_runs_plugins(plugin_detector):
+    source = ParsedSource("def f(a):\n    # TODO: b\n    return a  # TODO\n", "plugin.py")
+    results = _run_detectors(source)
+
+    assert list(results)[:6] == [
+        "long_parameter_list", "long_method", "duplicated_code", "duplicate_blocks", "code_metrics", "halstead_metrics"
+    ]
+    assert results[plugin_detector] == 2
+    assert list(_run_detectors(source, [plugin_detector], pool="serial")) == [plugin_detector]
+
+
+@pytest.mark.parametrize("pool", ["serial", "thread", "process"])
+def test_detectors_pools_agree(pool):
+    serial = _run_detectors(ParsedSource.from_file(TEST_PATHS["29"]), pool="serial")
+    pooled = _run_detectors(ParsedSource.from_file(TEST_PATHS["29"]), pool=pool, workers=2)
+
+    assert json.dumps(pooled, default=str) == json.dumps(serial, default=str)
+
+
+@pytest.mark.parametrize("pool, workers", [("serial", None), ("thread", 1), ("process", 1)])
+def test_detectors_pools_keep_the_duplicate_finder_serial(pool, workers):
+    settings = {**_report_settings(), "DUPS_ENGINE": "jaccard"}
+    with patch("core.detectors._find_duplicate_records", wraps=_find_duplicate_records) as records:
+        _blocks(_read_file_contents(TEST_PATHS["29"]), settings, pool)
+
+    assert records.call_args.kwargs.get("workers") == workers
+
+
+def test_detectors_reject_unknown_names_and_cycles():
+    source = ParsedSource("x = 1\n")
+    with pytest.raises(ValueError):
+        _run_detectors(source, ["no_such_detector"])
+    with pytest.raises(ValueError):
+        _run_detectors(source, pool="fibers")
+
+    register_detector("cycle_a", inputs=("cycle_b",))(lambda b: b)
+    register_detector("cycle_b", inputs=("cycle_a",))(lambda a: a)
+    try:
+        with pytest.raises(ValueError, match="cycle"):
+            _run_detectors(source, ["cycle_a"])
+    finally:
+        DETECTORS.pop("cycle_a"), DETECTORS.pop("cycle_b")
+
+
+# =============================================================================================================
+
+# ============================================ BATCH ANALYSIS =================================================
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_find_code_smells_many_ordered_with_failures(tmp_path, workers):
+    (tmp_path / "empty.py").write_text("")
+    paths = [TEST_PATHS["9"], str(tmp_path / "missing.py"), TEST_PATHS["29"], str(tmp_path / "empty.py")]
+
+    results = list(find_code_smells_many(paths, workers=workers, ordered=True))
+
+    assert [r["file"] for r in results] == paths
+    assert [r["error"] is None for r in results] == [True, False, True, False]
+    assert results[0]["code_smells"]["long_method"] == find_code_smells(TEST_PATHS["9"])[0]["long_method"]
+    assert all(r["code_smells"] is None and r["report"] is None for r in results if r["error"])
+
+
+def test_find_code_smells_many_largest_first():
+    paths = [TEST_PATHS["5"], TEST_PATHS["29"], TEST_PATHS["9"]]
+
+    results = [r["file"] for r in find_code_smells_many(paths, workers=1)]
+
+    assert results == sorted(paths, key=os.path.getsize, reverse=True)
+
+
+# =============================================================================================================
+
+# ============================================ ANALYSIS CACHE =================================================
+
+
+def _fill_analysis_cache(path: str, worker: int) -> int:
+    cache = AnalysisCache(path)
+    for n in range(20):
+        key = cache.key(f"x = {worker * 100 + n}\n")
+        cache.put(key, {"worker": worker, "n": n}, f"w{worker}.py")
+        assert cache.get(key)[0] == {"worker": worker, "n": n}
+    return worker
+
+
+def test_analysis_cache_keys_and_eviction(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"), max_bytes=60)
+    key = cache.key("x = 1\n")
+
+    assert cache.get(key) is None
+    assert key != cache.key("x = 2\n")
+    with patch("core.constants.PARAMS_THRESHOLD", 99):
+        assert key != cache.key("x = 1\n")
+    for target, value in [
+        ("core.duplicated_finder.DUPS_SEGMENTER", "lines"),
+        ("core.duplicated_finder.TFIDF_THRESHOLD", 0.5),
+        ("core.constants.WINNOW_K", 5),
+    ]:
+        with patch(target, value):
+            assert key != cache.key("x = 1\n"), target
+
+    for n in range(4):
+        cache.put(cache.key(f"x = {n}\n"), {"n": n, "pad": "." * 10}, report=f"r{n}.md")
+    assert cache.get(cache.key("x = 0\n")) is None
+    assert cache.get(cache.key("x = 3\n")) == ({"n": 3, "pad": "." * 10}, "r3.md")
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 60 and stats["entries"] == len(cache) == 2
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 2, 2)
+
+
+def test_analysis_cache_shared_by_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        assert sorted(executor.map(_fill_analysis_cache, [path] * 3, range(3))) == [0, 1, 2]
+
+    stats = AnalysisCache(path).stats()
+    assert stats["entries"] == 60 and stats["hits"] == 60
+
+
+def test_find_code_smells_answers_unchanged_files_from_the_cache(tmp_path):
+    with patch("core.code_smells.ANALYSIS_CACHE", AnalysisCache(str(tmp_path / "cache.sqlite3"))), patch(
+        "core.code_smells._run_detectors", wraps=_run_detectors
+    ) as run:
+        first, first_report = find_code_smells(TEST_PATHS["9"])
+        second, second_report = find_code_smells(TEST_PATHS["9"])
+        find_code_smells(TEST_PATHS["9"], use_cache=False)
+
+    assert run.call_count == 2
+    assert second_report == first_report
+    assert json.dumps(second, sort_keys=True) == json.dumps(first, sort_keys=True, default=str)
+
+
+@pytest.mark.parametrize(
+    "module, setting, value",
+    [(duplicated_finder, "DUPS_THRESHOLD", 0.3), (constants, "PARAMS_THRESHOLD", 1), (constants, "LENGTH_THRESHOLD", 2)],
+)
+def test_find_code_smells_misses_the_cache_after_a_threshold_changes(monkeypatch, module, setting, value):
+    with patch("core.code_smells._run_detectors", wraps=_run_detectors) as run, patch(
+        "core.detectors._find_duplicate_records", wraps=_find_duplicate_records
+    ) as records:
+        first, _ = find_code_smells(TEST_PATHS["29"])
+        monkeypatch.setattr(module, setting, value)
+        second, _ = find_code_smells(TEST_PATHS["29"])
+
+    assert run.call_count == 2 and records.call_count == 2
+    assert run.call_args.kwargs["settings"][setting] == value
+    if setting == "DUPS_THRESHOLD":
+        assert records.call_args.kwargs["threshold"] == 0.3
+    else:
+        assert json.dumps(second, sort_keys=True, default=str) != json.dumps(first, sort_keys=True, default=str)
+
+
+def test_find_code_smells_cache_keeps_reports_per_file(tmp_path):
+    source_code = _read_file_contents(TEST_PATHS["9"])
+    (tmp_path / "alpha.py").write_text(source_code)
+    (tmp_path / "beta.py").write_text(source_code)
+
+    with patch("core.code_smells.ANALYSIS_CACHE", AnalysisCache(str(tmp_path / "cache.sqlite3"))):
+        _, alpha_report = find_code_smells(str(tmp_path / "alpha.py"))
+        _, beta_report = find_code_smells(str(tmp_path / "beta.py"))
+        _, alpha_again = find_code_smells(str(tmp_path / "alpha.py"))
+
+    assert "alpha" in alpha_report and "beta" in beta_report
+    assert alpha_again == alpha_report
+
+
+# =============================================================================================================
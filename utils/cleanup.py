@@ -24,6 +24,7 @@ CLEANUP_PATHS = {
     "refactored": os.path.join(BASE_DIR, "refactored"),
     "report": os.path.join(BASE_DIR, "report"),
     "plots": os.path.join(BASE_DIR, "plots"),
+    "index": os.path.join(BASE_DIR, "index"),
 }
 
 
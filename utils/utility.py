@@ -120,6 +120,41 @@ def get_halstead_metric_description(metric):
     return descriptions.get(metric, "No description available")
 
 
+def _write_clone_classes(out, clone_classes: list) -> None:
+    """_summary_
+
+    Note:
+        One code block per class (its representative) and one line per member, so the report
+        grows with the number of clones, @see core.clone_classes._clone_classes()
+
+    Args:
+        out (TextIO): open report file
+        clone_classes (list): clone classes from the analysis json
+    """
+    for idx, item in enumerate(clone_classes, 1):
+        similarity = item["similarity"]
+        if similarity["min"] == similarity["max"]:
+            score = f"`{similarity['min']:.2f}`"
+        else:
+            score = f"`{similarity['min']:.2f}` - `{similarity['max']:.2f}`"
+        out.write(
+            f"##### Clone Class {idx}, **Copies**: `{len(item['members'])}`, **Similarity**: {score}\n"
+        )
+
+        representative = item["representative"]
+        out.write(f" - **Representative** `(Lines {representative['line_number']}-{representative['end_line']})`:\n")
+        out.write("```\n")
+        for line in textwrap.dedent(representative["text"]).strip().splitlines():
+            out.write(f"        {line}\n")
+        out.write("```\n")
+
+        out.write(" - **Copies**:\n")
+        for member in item["members"]:
+            where = f"{member['file']}, " if "file" in member else ""
+            out.write(f"    * `{where}Lines {member['line_number']}-{member['end_line']}`\n")
+        out.write("\n")
+
+
 def _generate_readable_report(code_analysis_dict_path: dict) -> str:
     """_summary_
 
@@ -223,6 +258,8 @@ def _generate_readable_report(code_analysis_dict_path: dict) -> str:
         items = analysis_dict.get("duplicated_code", [])
         if len(items) == 0:
             out.write("  - *No duplicated code was found.*\n\n")
+        elif "members" in items[0]:
+            _write_clone_classes(out, items)
         else:
             for idx, item in enumerate(items, 1):
                 out.write(